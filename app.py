@@ -1,16 +1,27 @@
 import streamlit as st
 import pandas as pd
 import gspread
-from google.oauth2.service_account import Credentials
 import os
 from dotenv import load_dotenv
 import openai
-from datetime import datetime, date # Import date for st.date_input
+from datetime import datetime, date, timedelta # Import date for st.date_input
 import plotly.express as px
 import plotly.graph_objects as go
 import time
 import re
 import indicators # Our new indicators module
+import sheets_loader
+import sheets_quota
+import data_sources
+import snapshot_cache
+import shared_snapshot
+import sheet_schema
+import sheet_writes
+import scorecard
+import staffing
+import kpi_history
+import fake_gspread
+import perf
 import strategic_targets # For referencing targets in display
 
 # Load environment variables
@@ -85,6 +96,7 @@ st.markdown("""
         .metric-card.good { border-left: 5px solid #48BB78; } 
         .metric-card.warning { border-left: 5px solid #ECC94B; } 
         .metric-card.danger { border-left: 5px solid #F56565; } 
+        .metric-card-trend { margin-top: 6px; }
 
         /* Section headers */
         .section-header {
@@ -201,12 +213,12 @@ st.markdown("""
 
 # --- Session State Initialization ---
 def init_session_state():
+    # Sheet data, indicators and the AI context live in the process-wide snapshot registry;
+    # a session only holds a lease on the version it is currently showing
     if 'data_loaded' not in st.session_state:
         st.session_state.data_loaded = False
-    if 'all_data' not in st.session_state:
-        st.session_state.all_data = {}
-    if 'indicators' not in st.session_state:
-        st.session_state.indicators = {}
+    if 'snapshot_lease' not in st.session_state:
+        st.session_state.snapshot_lease = None
     if 'openai_client' not in st.session_state:
         try:
             st.session_state.openai_client = openai.OpenAI(api_key=get_env_var('OPENAI_API_KEY'))
@@ -245,93 +257,259 @@ def get_google_credentials_file():
     return os.getenv("GOOGLE_SHEETS_CREDENTIALS_FILE", "credentials.json")
 
 # --- Data Loading and Processing ---
-@st.cache_resource(ttl=300) 
-def setup_google_sheets_cached():
-    credentials_file = get_google_credentials_file()
-    sheet_name = get_env_var('GOOGLE_SHEET_NAME')
-    if not credentials_file or not os.path.exists(credentials_file):
-        st.error(f"Credentials file not found: {credentials_file}")
+# How long a user-triggered load waits for the Sheets connection; with data already on screen nothing waits
+SHEETS_CONNECT_WAIT_SECONDS = 20
+
+def get_google_sheet(wait_seconds=SHEETS_CONNECT_WAIT_SECONDS, priority=sheets_quota.PRIORITY_INTERACTIVE):
+    # The connection lives in the process-wide data source: authorized once, token refreshed before expiry,
+    # reconnects retried with backoff on a background thread. Returns None while it is unavailable.
+    # Calls made through the returned spreadsheet take their turn in the shared quota at `priority`.
+    source = get_data_source()
+    if source.kind != 'gsheets':
         return None
-    if not sheet_name:
-        st.error("GOOGLE_SHEET_NAME not configured in .env or secrets")
+    if not source.is_configured():
+        credentials_file = source.credentials_file
+        if not credentials_file or not os.path.exists(credentials_file):
+            st.error(f"Credentials file not found: {credentials_file}")
+        else:
+            st.error("GOOGLE_SHEET_NAME not configured in .env or secrets")
         return None
-    scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-    credentials = Credentials.from_service_account_file(credentials_file, scopes=scopes)
-    
-    max_retries = 3
-    retry_delay = 5
-    for attempt in range(max_retries):
-        try:
-            gc = gspread.authorize(credentials)
-            sheet = gc.open(sheet_name)
-            sheet.get_worksheet(0) 
-            return sheet
-        except Exception as e:
-            if attempt < max_retries - 1:
-                st.warning(f"GSheets connection attempt {attempt + 1} failed. Retrying in {retry_delay}s... Error: {e}")
-                time.sleep(retry_delay)
-            else:
-                st.error(f"Error accessing spreadsheet after {max_retries} attempts: {e}")
-                return None
-    return None
+    spreadsheet = source.connection.get(timeout=wait_seconds)
+    return source.quota.wrap(spreadsheet, priority) if spreadsheet is not None else None
+
+# Snapshots younger than this are served from disk without starting a background refresh
+SNAPSHOT_REVALIDATE_SECONDS = 300
+# Background reload schedule; pages keep rendering the current snapshot while it runs
+DEFAULT_AUTO_REFRESH_SECONDS = 300
+# How often an open page checks for a newer published snapshot
+SNAPSHOT_POLL_SECONDS = 30
+
+@st.cache_data(ttl=300)
+def load_all_sheets_batched_cached(_sheet_resource, worksheet_names, value_render=sheets_loader.FORMATTED):
+    # Errors are raised (and therefore not cached) so load_all_data can fall back to per-sheet loading
+    return sheets_loader.fetch_all_batched(_sheet_resource, list(worksheet_names), value_render=value_render)
+
+def get_value_render():
+    # SHEETS_VALUE_RENDER=unformatted fetches raw numbers and serial dates; display strings stay the default
+    if str(get_env_var('SHEETS_VALUE_RENDER', 'formatted')).lower() == 'unformatted':
+        return sheets_loader.UNFORMATTED
+    return sheets_loader.FORMATTED
+
+def get_load_worker_count():
+    try:
+        return max(1, int(get_env_var('SHEETS_LOAD_WORKERS', sheets_loader.DEFAULT_LOAD_WORKERS)))
+    except (TypeError, ValueError):
+        return sheets_loader.DEFAULT_LOAD_WORKERS
 
-@st.cache_data(ttl=300) 
-def load_sheet_data_cached(_sheet_resource, worksheet_name): 
-    if _sheet_resource is None: return pd.DataFrame()
+def get_requests_per_minute(key):
     try:
-        worksheet = _sheet_resource.worksheet(worksheet_name)
-        all_values = worksheet.get_all_values()
-        if not all_values: return pd.DataFrame()
-        
-        df = pd.DataFrame(all_values[1:], columns=all_values[0])
-        df.columns = df.columns.str.strip()
-        df = df.replace('', pd.NA).dropna(how='all')
-        return df
-    except Exception as e:
-        st.warning(f"Error loading worksheet '{worksheet_name}': {e}")
-        return pd.DataFrame()
+        return max(1, int(get_env_var(key, sheets_quota.DEFAULT_REQUESTS_PER_MINUTE)))
+    except (TypeError, ValueError):
+        return sheets_quota.DEFAULT_REQUESTS_PER_MINUTE
+
+def load_all_sheets_concurrently(sheet, worksheet_names, progress_bar, loaded_data):
+    # Worker threads only talk to gspread; results and the progress bar are updated here as each sheet lands
+    start = time.perf_counter()
+    sheet_seconds = {}
+    rate_limited = []
+    for done, (name, df, error, seconds) in enumerate(
+            sheets_loader.iter_fetch_concurrent(sheet, worksheet_names, max_workers=get_load_worker_count(),
+                                                value_render=get_value_render()), start=1):
+        if error is not None and sheets_quota.is_rate_limited(error):
+            rate_limited.append(name)
+        elif error is not None:
+            st.warning(f"Error loading worksheet '{name}': {error}")
+        loaded_data[name] = df
+        sheet_seconds[name] = seconds
+        progress_bar.progress(done / len(worksheet_names), text=f"Loaded {name} ({done}/{len(worksheet_names)})...")
+    if rate_limited:
+        # Counted by the quota scheduler (see the Sheets API Quota panel); one notice instead of one per sheet
+        st.info(f"Google Sheets quota reached; {len(rate_limited)} sheet(s) will load on the next refresh: {', '.join(rate_limited)}")
+    return {
+        'mode': 'concurrent',
+        'api_calls': 2 * len(worksheet_names),
+        'total_seconds': time.perf_counter() - start,
+        'slowest_sheet_seconds': max(sheet_seconds.values(), default=0),
+        'rows': {name: len(loaded_data[name]) for name in worksheet_names},
+    }
+
+@st.cache_resource
+def get_data_source():
+    # Backend is chosen by DATA_SOURCE (gsheets | local | sqlite); pages and indicators only ever see the DataFrames
+    return data_sources.create_data_source(
+        get_env_var('DATA_SOURCE', 'gsheets'),
+        path=get_env_var('DATA_SOURCE_PATH'),
+        credentials_file=get_google_credentials_file(),
+        sheet_name=get_env_var('GOOGLE_SHEET_NAME'),
+        max_workers=get_load_worker_count(),
+        value_render=get_value_render(),
+        reads_per_minute=get_requests_per_minute('SHEETS_READS_PER_MINUTE'),
+        writes_per_minute=get_requests_per_minute('SHEETS_WRITES_PER_MINUTE'),
+        open_fn=get_fake_sheets_opener(),
+    )
+
+def get_env_float(key, default=0.0):
+    try:
+        return max(0.0, float(get_env_var(key, default)))
+    except (TypeError, ValueError):
+        return default
+
+@st.cache_resource
+def get_fake_sheets_faults():
+    # Latency and failure injection for the fake Sheets backend (FAKE_SHEETS_DIR); None when it is not in use
+    if not get_env_var('FAKE_SHEETS_DIR'):
+        return None
+    return fake_gspread.FaultInjector(
+        latency=get_env_float('FAKE_SHEETS_LATENCY_MS') / 1000,
+        jitter=get_env_float('FAKE_SHEETS_JITTER_MS') / 1000,
+        rate_limit_rate=get_env_float('FAKE_SHEETS_429_RATE'),
+        error_rate=get_env_float('FAKE_SHEETS_ERROR_RATE'),
+    )
+
+def get_fake_sheets_opener():
+    # FAKE_SHEETS_DIR points the Google Sheets source at a directory of CSVs instead of the real Sheet (no credentials needed)
+    fake_dir = get_env_var('FAKE_SHEETS_DIR')
+    return fake_gspread.directory_opener(fake_dir, faults=get_fake_sheets_faults()) if fake_dir else None
+
+def get_snapshot_dir():
+    return get_env_var('DATA_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data_snapshot'))
+
+def get_kpi_history_path():
+    return get_env_var('KPI_HISTORY_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.kpi_history.sqlite'))
+
+@st.cache_resource
+def get_kpi_history():
+    return kpi_history.KpiHistory(get_kpi_history_path())
+
+@st.cache_resource
+def get_snapshot_registry():
+    # One per process: every session leases the current version instead of keeping its own copy.
+    # Each published version's indicators are appended to the KPI history.
+    return shared_snapshot.SnapshotRegistry(history=get_kpi_history())
+
+@st.cache_resource
+def get_snapshot_refresher():
+    return snapshot_cache.SnapshotRefresher(get_snapshot_dir(), get_snapshot_registry())
+
+def get_snapshot():
+    lease = st.session_state.get('snapshot_lease')
+    return lease.snapshot if lease else shared_snapshot.EMPTY_SNAPSHOT
+
+def sync_session_snapshot():
+    # Move this session onto the current shared version and release its hold on the previous one
+    registry = get_snapshot_registry()
+    current = registry.current()
+    old_lease = st.session_state.get('snapshot_lease')
+    if current is None or (old_lease and old_lease.snapshot.version == current.version):
+        return old_lease is not None
+    st.session_state.snapshot_lease = registry.acquire()
+    st.session_state.data_loaded = True
+    if old_lease:
+        old_lease.release()
+    return True
+
+def publish_snapshot(data, meta, kpis=None, as_of=None):
+    get_snapshot_registry().publish(data, meta, kpis=kpis, as_of=as_of)
+    sync_session_snapshot()
+
+def get_refresh_fn():
+    # None when the source is not configured well enough to load in the background
+    source = get_data_source()
+    if isinstance(source, data_sources.GoogleSheetsSource) and not source.is_configured():
+        return None
+    return source.refresh
+
+def start_background_refresh():
+    refresh_fn = get_refresh_fn()
+    return get_snapshot_refresher().start(refresh_fn) if refresh_fn else False
+
+def get_auto_refresh_seconds():
+    # DATA_AUTO_REFRESH_SECONDS=0 turns the scheduled refresh off
+    try:
+        return max(0, int(get_env_var('DATA_AUTO_REFRESH_SECONDS', DEFAULT_AUTO_REFRESH_SECONDS)))
+    except (TypeError, ValueError):
+        return DEFAULT_AUTO_REFRESH_SECONDS
+
+def ensure_auto_refresh():
+    # One scheduler thread per process (the refresher is a cache_resource); later calls are no-ops
+    interval, refresh_fn = get_auto_refresh_seconds(), get_refresh_fn()
+    if interval and refresh_fn:
+        get_snapshot_refresher().schedule(refresh_fn, interval)
+
+def revalidate_if_stale(meta):
+    age = snapshot_cache.snapshot_age_seconds(meta)
+    if age is None or age > SNAPSHOT_REVALIDATE_SECONDS:
+        start_background_refresh()
+
+def load_from_disk_snapshot():
+    data, meta = snapshot_cache.load_snapshot(get_snapshot_dir())
+    # Ignore a snapshot written by a different data source (e.g. after switching DATA_SOURCE)
+    if data is None or meta.get('source') != get_data_source().describe():
+        return False
+    # Parquet keeps the typed dtypes; this only parses snapshots written before typed loading existed
+    publish_snapshot(sheet_schema.type_sheets(data), meta)
+    revalidate_if_stale(meta)
+    return True
+
+def load_sheets_with_progress(sheet, worksheet_names):
+    progress_bar = st.progress(0, text="Loading data...")
+    with perf.timer('fetch', source='gsheets', mode='interactive'):
+        try:
+            loaded_data, load_report = load_all_sheets_batched_cached(sheet, tuple(worksheet_names), get_value_render())
+            progress_bar.progress(1.0, text="Loaded all worksheets in one batch.")
+        except Exception as e:
+            print(f"Warning: batched load failed, falling back to per-sheet loading: {e}")
+            get_data_source().connection.invalidate(e)
+            loaded_data = {}
+            load_report = load_all_sheets_concurrently(sheet, worksheet_names, progress_bar, loaded_data)
+    progress_bar.empty()
+    return sheet_schema.type_sheets({name: loaded_data[name] for name in worksheet_names}), load_report
+
+def keep_last_good_snapshot():
+    # A failed reload (e.g. the Refresh button while Sheets is down) keeps showing the data this session already has
+    st.session_state.data_loaded = st.session_state.get('snapshot_lease') is not None
+    if st.session_state.data_loaded:
+        st.info("Showing the last loaded data; it will update once Google Sheets is reachable again.")
 
 def load_all_data():
     if not st.session_state.data_loaded:
-        sheet = setup_google_sheets_cached()
-        if sheet:
-            worksheet_names = [
-                'Project Inventory', 'Project Risks', 'Pipeline', 'Team Utilization',
-                'Talent Gaps', 'Operational Gaps', 'Executive Activity',
-                'Scenario Model Inputs', 'Do Nothing Scenario', 'Proposed Scenario',
-                'Scenario Comparison', 'MappingTable', 'Project Observations'
-            ]
-            progress_bar = st.progress(0, text="Loading data...")
-            for i, name in enumerate(worksheet_names):
-                st.session_state.all_data[name] = load_sheet_data_cached(sheet, name)
-                progress_bar.progress((i + 1) / len(worksheet_names), text=f"Loading {name}...")
-            
-            st.session_state.indicators = indicators.get_all_indicators(st.session_state.all_data)
-            st.session_state.data_loaded = True
-            progress_bar.empty()
-            
-            data_context_parts = []
-            key_sheets_max_rows = {
-                'Project Inventory': 50, 'Pipeline': 50, 'Project Risks': 30
-            }
-            default_max_rows = 15
-
-            for name, df_sheet in st.session_state.all_data.items():
-                if not df_sheet.empty:
-                    current_max_rows = key_sheets_max_rows.get(name, default_max_rows)
-                    col_info = f"Sheet: {name}\nColumns: {', '.join(df_sheet.columns)}\n"
-                    if len(df_sheet) <= current_max_rows:
-                        data_context_parts.append(col_info + df_sheet.to_string(index=False) + "\n")
-                    else:
-                        data_context_parts.append(col_info + df_sheet.head(current_max_rows).to_string(index=False) + f"\n... (showing top {current_max_rows} of {len(df_sheet)} rows)\n")
-            st.session_state.data_context_string = "\n".join(data_context_parts)
-            
-            if not st.session_state.get('initial_load_complete', False): 
-                st.sidebar.success("Data loaded successfully!")
-                st.session_state.initial_load_complete = True
+        if not st.session_state.pop('skip_disk_snapshot', False):
+            # Another session (or a background refresh) already published data: just lease it
+            if sync_session_snapshot():
+                revalidate_if_stale(get_snapshot().meta)
+                return
+            # Otherwise serve the last snapshot from disk straight away; it is revalidated in the background
+            if load_from_disk_snapshot():
+                return
+        source = get_data_source()
+        worksheet_names = sheets_loader.WORKSHEET_NAMES
+        if source.kind == 'gsheets':
+            sheet = get_google_sheet()
+            if not sheet:
+                st.error(f"Failed to connect to Google Sheets ({source.connection.status()}). Dashboard may not function correctly.")
+                keep_last_good_snapshot()
+                return
+            loaded_data, load_report = load_sheets_with_progress(sheet, worksheet_names)
         else:
-            st.error("Failed to connect to Google Sheets. Dashboard may not function correctly.")
-            st.session_state.data_loaded = False
+            with st.spinner(f"Loading data from {source.describe()}..."):
+                try:
+                    loaded_data, load_report = source.load_all(worksheet_names)
+                except Exception as e:
+                    st.error(f"Failed to load data from {source.describe()}: {e}")
+                    keep_last_good_snapshot()
+                    return
+
+        extra_meta = {**source.snapshot_meta(), 'load_report': load_report}
+        try:
+            meta = snapshot_cache.save_snapshot(loaded_data, get_snapshot_dir(), extra_meta=extra_meta)
+        except Exception as e:
+            print(f"Warning: could not write data snapshot: {e}")
+            meta = {**extra_meta, 'hash': snapshot_cache.content_hash(loaded_data), 'saved_at': datetime.now().isoformat(timespec='seconds')}
+        publish_snapshot(loaded_data, meta)
+        
+        if not st.session_state.get('initial_load_complete', False): 
+            st.sidebar.success("Data loaded successfully!")
+            st.session_state.initial_load_complete = True
 
 # --- Helper Functions for Display ---
 def format_currency(value, default_na="N/A"):
@@ -351,19 +529,165 @@ def get_delta_color_class(value, is_higher_better=True):
     if is_higher_better: return "positive" if value > 0 else "negative"
     else: return "negative" if value > 0 else "positive"
 
-def render_metric_card(title, value, delta=None, delta_label=None, card_class=""):
+# KPI sparklines on the home cards: the last KPI_TREND_DAYS of history, downsampled to SPARKLINE_POINTS points
+KPI_TREND_DAYS = 90
+SPARKLINE_POINTS = 30
+HOME_TREND_METRICS = [
+    'total_revenue', 'pipeline_coverage_ratio', 'green_project_ratio', 'avg_customer_nps', 'avg_employee_pulse_score',
+    'active_pipeline_value', 'avg_deal_cycle_time_days', 'recent_meaningful_checkins_count', 'high_severity_risk_count',
+    'avg_delivery_utilization_pct',
+]
+
+def get_kpi_trends():
+    # History only grows when a snapshot is published, so one query per version serves every session and rerun
+    snapshot = get_snapshot()
+    return snapshot.derive(('kpi_trends',), lambda: get_kpi_history().trends(
+        HOME_TREND_METRICS, start=datetime.now() - timedelta(days=KPI_TREND_DAYS), points=SPARKLINE_POINTS
+    ))
+
+def sparkline_svg(values, width=120, height=28, is_higher_better=True):
+    if len(values) < 2: return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    points = " ".join(
+        f"{i * width / (len(values) - 1):.1f},{height - 2 - (v - low) / span * (height - 4):.1f}" for i, v in enumerate(values)
+    )
+    change = values[-1] - values[0]
+    color = "#A0AEC0" if change == 0 else "#38A169" if (change > 0) == is_higher_better else "#E53E3E"
+    return (f"<svg width='{width}' height='{height}' viewBox='0 0 {width} {height}'>"
+            f"<polyline fill='none' stroke='{color}' stroke-width='2' points='{points}'/></svg>")
+
+def render_metric_card(title, value, delta=None, delta_label=None, card_class="", trend=None, is_higher_better=True):
     delta_html = ""
     if delta is not None and delta_label:
         delta_color_class = "" 
         delta_html = f"<div class='metric-card-delta {delta_color_class}'>{delta} {delta_label}</div>"
+    trend_svg = sparkline_svg(trend or [], is_higher_better=is_higher_better)
+    trend_html = f"<div class='metric-card-trend'>{trend_svg}</div>" if trend_svg else ""
     st.markdown(f"""
         <div class="metric-card {card_class}">
             <div class="metric-card-title">{title}</div>
             <div class="metric-card-value">{value}</div>
             {delta_html}
+            {trend_html}
         </div>
     """, unsafe_allow_html=True)
 
+def render_data_freshness():
+    meta = get_snapshot().meta
+    age = snapshot_cache.snapshot_age_seconds(meta)
+    if age is not None:
+        saved_at = datetime.fromisoformat(meta['saved_at'])
+        age_text = f"{int(age // 60)} min ago" if age >= 60 else "just now"
+        st.sidebar.caption(f"🕒 Data as of {saved_at:%b %d %H:%M} ({age_text})")
+    source = get_data_source()
+    if source.kind == 'gsheets' and not source.connection.is_connected and source.connection.failures:
+        st.sidebar.caption(f"🔌 Google Sheets {source.connection.status()}")
+    refresher = get_snapshot_refresher()
+    if refresher.is_running:
+        st.sidebar.caption("🔄 Refreshing from Google Sheets in the background...")
+    elif refresher.last_error is not None:
+        st.sidebar.caption(f"⚠️ Background refresh failed, showing last saved data: {refresher.last_error}")
+    elif refresher.next_run_at:
+        st.sidebar.caption(f"⏲️ Next automatic refresh at {datetime.fromtimestamp(refresher.next_run_at):%H:%M}")
+
+@st.fragment(run_every=SNAPSHOT_POLL_SECONDS)
+def watch_for_new_snapshot():
+    # Reruns the app when the background refresh has published a newer version, so open pages update without
+    # a click. Skipped on Manage Data, where a rerun onto a new version would reset edits in progress.
+    if st.session_state.current_page == "📝 Manage Data":
+        return
+    current = get_snapshot_registry().current()
+    lease = st.session_state.get('snapshot_lease')
+    if current is not None and lease is not None and current.version != lease.snapshot.version:
+        st.rerun(scope="app")
+
+def render_load_report():
+    report = get_snapshot().meta.get('load_report')
+    if not report: return
+    with st.sidebar.expander("⏱️ Data Load Report"):
+        registry_stats = get_snapshot_registry().stats()
+        st.caption(f"Shared snapshot v{registry_stats['current_version']} · live versions (sessions): {registry_stats['live_versions']}")
+        st.write(f"Mode: **{report.get('mode')}** · API calls: **{report.get('api_calls')}** · Fetch time: **{report.get('total_seconds', 0):.2f}s**")
+        st.caption(f"Values: {report.get('value_render', sheets_loader.FORMATTED)}")
+        rows = report.get('rows', {})
+        if rows:
+            st.dataframe(pd.DataFrame({'Worksheet': list(rows.keys()), 'Rows': list(rows.values())}), use_container_width=True, hide_index=True)
+        render_value_render_comparison()
+
+def render_sheets_quota_panel():
+    source = get_data_source()
+    if source.kind != 'gsheets':
+        return
+    stats = source.quota.stats()
+    with st.sidebar.expander("📈 Sheets API Quota"):
+        limits, tokens = stats['limits_per_minute'], stats['tokens_available']
+        st.caption(f"Limits per minute: {limits['read']} reads · {limits['write']} writes · "
+                   f"tokens left: {tokens['read']} read / {tokens['write']} write")
+        st.write(f"Calls in the last minute: **{stats['calls_last_minute']}** · 429s: **{stats['rate_limited']}** · "
+                 f"Time waiting for quota: **{stats['wait_seconds']:.1f}s**")
+        st.caption(f"Received {stats['bytes_received'] / 1024:,.0f} KB · sent {stats['bytes_sent'] / 1024:,.1f} KB")
+        if stats['paused_seconds_left']:
+            st.caption(f"⏸️ Paused after a 429 for another {stats['paused_seconds_left']:.0f}s")
+        faults = get_fake_sheets_faults() if source.is_fake else None
+        if faults is not None:
+            fault_stats = faults.stats()
+            injected = ", ".join(f"{status} × {count}" for status, count in sorted(fault_stats['injected'].items())) or "none"
+            st.caption(f"🧪 Fake Sheets backend · injected errors: {injected} · added latency {fault_stats['slept_seconds']:.1f}s")
+        waiting = {f"{bucket}/{priority}": count for bucket, by_priority in stats['waiting'].items() for priority, count in by_priority.items()}
+        if waiting:
+            st.caption("Waiting: " + ", ".join(f"{key} × {count}" for key, count in waiting.items()))
+        if stats['calls_by_priority']:
+            st.caption("By priority: " + ", ".join(f"{name} {count}" for name, count in stats['calls_by_priority'].items()))
+        operations = sorted(set(stats['calls']) | set(stats['errors']))
+        if operations:
+            st.dataframe(pd.DataFrame([
+                {'Call': op, 'Count': stats['calls'].get(op, 0), 'Errors': stats['errors'].get(op, 0)} for op in operations
+            ]), use_container_width=True, hide_index=True)
+
+@st.cache_resource
+def configure_perf_logging():
+    # PERF_LOG=0 turns off the 'Perf: {json}' log lines; timings are still kept for the panel
+    perf.TIMINGS.log = str(get_env_var('PERF_LOG', '1')).lower() not in ('0', 'false', 'no', 'off')
+    return perf.TIMINGS
+
+def render_performance_panel():
+    # Opt-in with SHOW_PERF_PANEL=1; timings cover every session and background refresh in this process
+    if str(get_env_var('SHOW_PERF_PANEL', '0')).lower() not in ('1', 'true', 'yes', 'on'):
+        return
+    rows = perf.summary()
+    with st.sidebar.expander("🐢 Performance"):
+        if not rows:
+            st.caption("No timings recorded yet.")
+            return
+        st.caption(f"Last run and p50/p95 over the last {perf.TIMINGS.window} runs per stage, slowest first.")
+        st.dataframe(pd.DataFrame([{
+            'Stage': row['stage'], 'Page': row['page'] or '', 'Runs': row['runs'],
+            'Last (ms)': row['last'] * 1000, 'p50 (ms)': row['p50'] * 1000, 'p95 (ms)': row['p95'] * 1000,
+            'Snapshot': row['snapshot'] or '',
+        } for row in rows]).style.format({'Last (ms)': '{:,.0f}', 'p50 (ms)': '{:,.0f}', 'p95 (ms)': '{:,.0f}'}),
+            use_container_width=True, hide_index=True)
+        if st.button("Reset timings", key="perf_reset"):
+            perf.TIMINGS.clear()
+
+def render_value_render_comparison():
+    if get_data_source().kind != 'gsheets':
+        return
+    # Costs two batch reads, so it only runs on request
+    if st.button("Compare formatted vs unformatted fetch", key="compare_value_renders"):
+        sheet = get_google_sheet()
+        try:
+            st.session_state.value_render_comparison = sheets_loader.compare_value_renders(sheet, sheets_loader.WORKSHEET_NAMES)
+        except Exception as e:
+            st.warning(f"Fetch mode comparison failed: {e}")
+    reports = st.session_state.get('value_render_comparison')
+    if reports:
+        st.dataframe(pd.DataFrame([
+            {'Values': value_render, 'API (s)': round(r['api_seconds'], 2), 'Parse + typing (s)': round(r['parse_seconds'], 2),
+             'Total (s)': round(r['total_seconds'], 2)}
+            for value_render, r in reports.items()
+        ]), use_container_width=True, hide_index=True)
+
 # --- AI Assistant Functions ---
 def escape_markdown_for_st(text):
     if not isinstance(text, str): return text
@@ -398,24 +722,25 @@ def render_ai_assistant():
         with st.sidebar.chat_message("assistant"):
             message_placeholder = st.empty()
             with st.spinner("Thinking..."):
-                direct_answer = answer_critical_question_custom(prompt, st.session_state.indicators)
+                direct_answer = answer_critical_question_custom(prompt, get_snapshot().indicators)
                 
                 if direct_answer:
                     response_text = direct_answer
                 elif st.session_state.openai_client:
                     full_prompt = f"""Based on the following healthcare delivery data snapshot:
-                    {st.session_state.get("data_context_string", "No data context available.")}
+                    {get_snapshot().data_context_string}
                     Question: {prompt}
                     Please provide a clear, concise answer. If the data is unavailable, say so.
                     """
                     try:
-                        completion = st.session_state.openai_client.chat.completions.create(
-                            model="gpt-4o",
-                            messages=[
-                                {"role": "system", "content": "You are a helpful healthcare delivery analytics assistant."},
-                                {"role": "user", "content": full_prompt}
-                            ]
-                        )
+                        with perf.timer('openai', snapshot=get_snapshot().meta.get('hash'), page=st.session_state.current_page):
+                            completion = st.session_state.openai_client.chat.completions.create(
+                                model="gpt-4o",
+                                messages=[
+                                    {"role": "system", "content": "You are a helpful healthcare delivery analytics assistant."},
+                                    {"role": "user", "content": full_prompt}
+                                ]
+                            )
                         response_text = completion.choices[0].message.content
                     except Exception as e:
                         response_text = f"Error querying OpenAI: {str(e)}"
@@ -426,52 +751,127 @@ def render_ai_assistant():
             st.session_state.ai_chat_history.append({"role": "assistant", "content": response_text})
 
 # --- GSheet Update Helper ---
-def update_gsheet_row(worksheet_name, identifier_col_name, identifier_value, update_data_dict):
+def apply_rows_update(worksheet_name, identifier_col_name, rows_written):
+    # Write-through: patch the loaded snapshot and recompute only the indicators that read this worksheet,
+    # instead of clearing every cache and reloading all 13 sheets after a save.
+    # rows_written is {identifier value: {column: value written to the Sheet}}
+    snapshot = get_snapshot()
+    df = snapshot.data.get(worksheet_name)
+    if df is None or identifier_col_name not in df.columns:
+        return
+    identifiers = df[identifier_col_name].map(sheet_writes.to_sheet_value)
+
+    # Copy-on-write: the current DataFrame is shared with other sessions
+    patched_df = df.copy()
+    patched = False
+    for identifier_value, written_values in rows_written.items():
+        matches = df.index[identifiers == sheet_writes.to_sheet_value(identifier_value)]
+        if len(matches) == 0:
+            continue
+        for col_name, value in written_values.items():
+            if col_name in patched_df.columns:
+                # Writes are strings; drop the column back to object so it can hold them, then re-type it below
+                if patched_df[col_name].dtype != object:
+                    patched_df[col_name] = patched_df[col_name].astype(object)
+                patched_df.at[matches[0], col_name] = value if value != '' else pd.NA
+                patched = True
+    if not patched:
+        return
+    new_data = dict(snapshot.data)
+    new_data[worksheet_name] = sheet_schema.type_dataframe(worksheet_name, patched_df)
+
+    current_meta = dict(snapshot.meta)
+    # Dropping the sheet's fingerprint makes the next background refresh re-read just this tab,
+    # which also picks up anything the sheet's own formulas recalculated (e.g. scores)
+    fingerprints = {name: fp for name, fp in current_meta.get('fingerprints', {}).items() if name != worksheet_name}
+    new_meta = {
+        **current_meta,
+        'hash': snapshot_cache.content_hash(new_data),
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+        'fingerprints': fingerprints,
+    }
+    # Only indicators reading the edited columns are recomputed; sums, counts and means are adjusted in place
+    as_of = indicators.as_of_date()
+    with perf.timer('indicators', snapshot=new_meta['hash'], mode='write', changed_sheets=1):
+        new_indicators = indicators.recompute_indicators(
+            new_data, snapshot.indicators, [worksheet_name], previous_data=snapshot.data,
+            kpis_date=snapshot.kpis_as_of, as_of=as_of,
+        )
+    # Published as a new shared version, so every session sees the edit on its next rerun
+    publish_snapshot(new_data, new_meta, kpis=new_indicators, as_of=as_of)
+
+    load_all_sheets_batched_cached.clear()
+    start_background_refresh()
+
+def get_row_index(worksheet_name, identifier_col_name):
+    # Built once per snapshot version and shared by all sessions; a reload after rows are inserted or
+    # deleted publishes a new version, so the index is rebuilt from the new row positions
+    snapshot = get_snapshot()
+    return snapshot.derive(('row_index', worksheet_name, identifier_col_name), lambda: sheet_writes.RowIndex.from_frame(
+        worksheet_name, snapshot.data.get(worksheet_name), identifier_col_name
+    ))
+
+def locate_rows(sheet, worksheet_name, identifier_col_name, identifiers):
+    # The snapshot's row positions are only candidates; sheet_writes checks them against the Sheet before writing
+    return sheet_writes.locate_rows(
+        sheet, worksheet_name, identifier_col_name, identifiers, row_index=get_row_index(worksheet_name, identifier_col_name)
+    )
+
+def write_rows_to_gsheet(worksheet_name, identifier_col_name, rows):
+    """Writes {identifier: {column: value}} with one values batch update. Returns True if anything was written."""
+    if not get_data_source().supports_writes:
+        st.error(f"Editing is only available with the Google Sheets data source (currently using {get_data_source().describe()}).")
+        return False
     try:
-        sheet = setup_google_sheets_cached()
+        # Saves go ahead of loads and background refreshes waiting on the same quota
+        sheet = get_google_sheet(priority=sheets_quota.PRIORITY_WRITE)
         if not sheet:
             st.error("Failed to connect to Google Sheets for update.")
             return False
-        
-        worksheet = sheet.worksheet(worksheet_name)
-        header = worksheet.row_values(1) 
-        
-        if identifier_col_name not in header:
+
+        rows = {
+            sheet_writes.to_sheet_value(identifier): {col: str(value) for col, value in values.items()}
+            for identifier, values in rows.items()
+        }
+        row_numbers, columns = locate_rows(sheet, worksheet_name, identifier_col_name, list(rows))
+        if identifier_col_name not in columns:
             st.error(f"Identifier column '{identifier_col_name}' not found in sheet '{worksheet_name}'. Update failed.")
             return False
-            
-        cell = worksheet.find(identifier_value, in_column=header.index(identifier_col_name) + 1)
-        if not cell:
-            st.error(f"Could not find '{identifier_value}' in column '{identifier_col_name}' of sheet '{worksheet_name}'.")
-            return False
-        
-        row_index = cell.row
-        
-        cells_to_update = []
-        for col_name, new_value in update_data_dict.items():
-            if col_name in header:
-                col_index = header.index(col_name) + 1
-                cells_to_update.append(gspread.Cell(row_index, col_index, str(new_value))) 
+
+        payload, missing = sheet_writes.build_batch_update(worksheet_name, columns, row_numbers, rows)
+        for item in missing:
+            if item in rows:
+                st.error(f"Could not find '{item}' in column '{identifier_col_name}' of sheet '{worksheet_name}'.")
             else:
-                st.warning(f"Column '{col_name}' not found in sheet '{worksheet_name}'. Skipping update for this field.")
-        
-        if cells_to_update:
-            worksheet.update_cells(cells_to_update, value_input_option='USER_ENTERED')
-            return True
-        st.info("No valid fields to update were provided.") 
-        return False 
+                st.warning(f"Column '{item}' not found in sheet '{worksheet_name}'. Skipping update for this field.")
+        if not payload:
+            st.info("No valid fields to update were provided.")
+            return False
+
+        sheet.values_batch_update({'valueInputOption': 'USER_ENTERED', 'data': payload})
+        written = {
+            identifier: {col: value for col, value in values.items() if col in columns}
+            for identifier, values in rows.items() if identifier in row_numbers
+        }
+        apply_rows_update(worksheet_name, identifier_col_name, written)
+        return True
 
     except gspread.exceptions.APIError as e:
+        get_data_source().connection.invalidate(e)
         st.error(f"Google Sheets API Error updating '{worksheet_name}': {e}")
         return False
     except Exception as e:
         st.error(f"An unexpected error occurred updating Google Sheet '{worksheet_name}': {e}")
         return False
 
+def update_gsheet_row(worksheet_name, identifier_col_name, identifier_value, update_data_dict):
+    return write_rows_to_gsheet(worksheet_name, identifier_col_name, {identifier_value: update_data_dict})
+
 # --- Page Rendering Functions ---
 def render_home_dashboard():
     st.title("🏠 Executive Dashboard")
-    kpis = st.session_state.indicators
+    kpis = get_snapshot().indicators
+    trends = get_kpi_trends()
 
     st.markdown("<div class='section-header'>Overall Health Snapshot</div>", unsafe_allow_html=True)
     cols = st.columns(4)
@@ -479,30 +879,30 @@ def render_home_dashboard():
         render_metric_card("Total Revenue", format_currency(kpis.get('total_revenue')), 
                            delta=format_percentage(kpis.get('revenue_vs_target_pct')), 
                            delta_label="of target", 
-                           card_class="good" if kpis.get('revenue_vs_target_pct', 0) >= 100 else "warning")
+                           card_class="good" if kpis.get('revenue_vs_target_pct', 0) >= 100 else "warning", trend=trends.get('total_revenue'))
     with cols[1]:
         render_metric_card("Pipeline Coverage", format_number(kpis.get('pipeline_coverage_ratio'), 1) + "x",
                            delta=format_percentage(kpis.get('pipeline_coverage_vs_target_pct')), 
                            delta_label="of target",
-                           card_class="good" if kpis.get('pipeline_coverage_vs_target_pct',0) >=100 else "warning")
+                           card_class="good" if kpis.get('pipeline_coverage_vs_target_pct',0) >=100 else "warning", trend=trends.get('pipeline_coverage_ratio'))
     with cols[2]:
         render_metric_card("Green Project Ratio", format_percentage(kpis.get('green_project_ratio', 0) * 100), 
                            delta=format_percentage(kpis.get('green_project_ratio_vs_target_pct')), 
                            delta_label="of target",
-                           card_class="good" if kpis.get('green_project_ratio_vs_target_pct',0) >=100 else "danger")
+                           card_class="good" if kpis.get('green_project_ratio_vs_target_pct',0) >=100 else "danger", trend=trends.get('green_project_ratio'))
     with cols[3]:
         render_metric_card("Avg. Customer NPS", format_number(kpis.get('avg_customer_nps'), 1),
                            delta=format_percentage(kpis.get('customer_nps_vs_target_pct')),
                            delta_label="of target",
-                           card_class="good" if kpis.get('customer_nps_vs_target_pct',0) >=100 else "warning")
+                           card_class="good" if kpis.get('customer_nps_vs_target_pct',0) >=100 else "warning", trend=trends.get('avg_customer_nps'))
 
     st.markdown("<div class='section-header'>📄 Daily Executive Digest</div>", unsafe_allow_html=True)
     if 'daily_digest_content' not in st.session_state or st.button("🔄 Regenerate Daily Digest"):
         with st.spinner("Generating Daily Executive Digest..."):
             st.session_state.daily_digest_content = indicators.get_daily_digest_content(
-                st.session_state.all_data,
+                get_snapshot().data,
                 st.session_state.openai_client,
-                st.session_state.get("data_context_string", "No data context available.")
+                get_snapshot().data_context_string
             )
     if 'daily_digest_content' in st.session_state:
         digest_content = st.session_state.daily_digest_content
@@ -514,45 +914,45 @@ def render_home_dashboard():
     with lag_cols[0]:
         render_metric_card("FY Revenue", format_currency(kpis.get('total_revenue')), 
                            f"{format_currency(strategic_targets.REVENUE_TARGET)} target",
-                           card_class="good" if kpis.get('revenue_vs_target_pct', 0) >= 100 else "warning")
+                           card_class="good" if kpis.get('revenue_vs_target_pct', 0) >= 100 else "warning", trend=trends.get('total_revenue'))
     with lag_cols[1]:
         render_metric_card("Customer NPS (Avg)", format_number(kpis.get('avg_customer_nps'),1),
                            f"{strategic_targets.CUSTOMER_NPS_TARGET} target",
-                           card_class="good" if kpis.get('customer_nps_vs_target_pct',0) >=100 else "warning")
+                           card_class="good" if kpis.get('customer_nps_vs_target_pct',0) >=100 else "warning", trend=trends.get('avg_customer_nps'))
     with lag_cols[2]:
         render_metric_card("Employee Pulse (Avg)", format_number(kpis.get('avg_employee_pulse_score'),1),
                            f"{strategic_targets.EMPLOYEE_PULSE_TARGET} target",
-                           card_class="good" if kpis.get('employee_pulse_vs_target_pct',0) >=100 else "warning")
+                           card_class="good" if kpis.get('employee_pulse_vs_target_pct',0) >=100 else "warning", trend=trends.get('avg_employee_pulse_score'))
 
     st.markdown("<div class='section-header'>📈 Leading Indicators</div>", unsafe_allow_html=True)
     lead_cols1 = st.columns(3)
     with lead_cols1[0]:
         render_metric_card("Active Pipeline Value", format_currency(kpis.get('active_pipeline_value')),
                            f"{format_number(kpis.get('pipeline_coverage_ratio'),1)}x coverage",
-                           card_class="good" if kpis.get('pipeline_coverage_vs_target_pct',0) >=100 else "warning")
+                           card_class="good" if kpis.get('pipeline_coverage_vs_target_pct',0) >=100 else "warning", trend=trends.get('active_pipeline_value'))
     with lead_cols1[1]:
         render_metric_card("Avg. Deal Cycle", f"{format_number(kpis.get('avg_deal_cycle_time_days'))} days",
-                           f"Median: {format_number(kpis.get('median_deal_cycle_time_days'))} days")
+                           f"Median: {format_number(kpis.get('median_deal_cycle_time_days'))} days", trend=trends.get('avg_deal_cycle_time_days'), is_higher_better=False)
     with lead_cols1[2]:
          render_metric_card("Green Project Ratio", format_percentage(kpis.get('green_project_ratio', 0) * 100),
                            f"{format_percentage(strategic_targets.GREEN_PROJECT_TARGET*100)} target",
-                           card_class="good" if kpis.get('green_project_ratio_vs_target_pct',0) >=100 else "danger")
+                           card_class="good" if kpis.get('green_project_ratio_vs_target_pct',0) >=100 else "danger", trend=trends.get('green_project_ratio'))
     
     lead_cols2 = st.columns(3)
     with lead_cols2[0]:
         render_metric_card("Recent Sponsor Check-ins", f"{format_number(kpis.get('recent_meaningful_checkins_count'))} ({format_percentage(kpis.get('recent_meaningful_checkins_pct'))})",
-                            f"{kpis.get('overdue_sponsor_checkin_count')} overdue")
+                            f"{kpis.get('overdue_sponsor_checkin_count')} overdue", trend=trends.get('recent_meaningful_checkins_count'))
     with lead_cols2[1]:
         render_metric_card("High Severity Risks", f"{format_number(kpis.get('high_severity_risk_count'))}",
-                           f"{format_currency(kpis.get('high_severity_risk_impact'))} impact")
+                           f"{format_currency(kpis.get('high_severity_risk_impact'))} impact", trend=trends.get('high_severity_risk_count'), is_higher_better=False)
     with lead_cols2[2]:
         render_metric_card("Avg. Delivery Utilization", format_percentage(kpis.get('avg_delivery_utilization_pct')),
-                           f"{kpis.get('under_utilized_delivery_count')} under-utilized")
+                           f"{kpis.get('under_utilized_delivery_count')} under-utilized", trend=trends.get('avg_delivery_utilization_pct'))
 
 def render_projects_page():
     st.title("📊 Projects Deep Dive")
-    kpis = st.session_state.indicators
-    project_df_original = st.session_state.all_data.get('Project Inventory', pd.DataFrame())
+    kpis = get_snapshot().indicators
+    project_df_original = get_snapshot().data.get('Project Inventory', pd.DataFrame())
 
     st.markdown("<div class='section-header'>Project Health Overview</div>", unsafe_allow_html=True)
     cols = st.columns(4)
@@ -641,8 +1041,8 @@ def render_projects_page():
 
 def render_pipeline_page():
     st.title("📈 Pipeline Deep Dive")
-    kpis = st.session_state.indicators
-    pipeline_df_original = st.session_state.all_data.get('Pipeline', pd.DataFrame())
+    kpis = get_snapshot().indicators
+    pipeline_df_original = get_snapshot().data.get('Pipeline', pd.DataFrame())
 
     st.markdown("<div class='section-header'>Pipeline Health Overview</div>", unsafe_allow_html=True)
     cols = st.columns(4)
@@ -715,8 +1115,8 @@ def render_pipeline_page():
 
 def render_risks_page():
     st.title("⚠️ Risks Deep Dive")
-    kpis = st.session_state.indicators
-    risk_df_original = st.session_state.all_data.get('Project Risks', pd.DataFrame())
+    kpis = get_snapshot().indicators
+    risk_df_original = get_snapshot().data.get('Project Risks', pd.DataFrame())
     st.markdown("<div class='section-header'>Risk Overview</div>", unsafe_allow_html=True)
     cols = st.columns(3)
     with cols[0]: st.metric("Total Risk Impact", format_currency(kpis.get('total_risk_impact')))
@@ -736,36 +1136,40 @@ def render_risks_page():
 
 def render_team_ops_page():
     st.title("👥 Team & Operations")
-    kpis = st.session_state.indicators
+    kpis = get_snapshot().indicators
     tab_util, tab_gaps, tab_exec = st.tabs(["📊 Team Utilization & Pulse", "🛠️ Talent & Operational Gaps", "💼 Executive Activity"])
     with tab_util:
         st.markdown("<div class='section-header'>Team Utilization</div>", unsafe_allow_html=True)
         cols_util = st.columns(2)
         with cols_util[0]: st.metric("Avg. Executive Utilization", format_percentage(kpis.get('avg_exec_utilization_pct')), f"{kpis.get('over_utilized_execs_count')} execs >70%")
         with cols_util[1]: st.metric("Avg. Delivery Utilization", format_percentage(kpis.get('avg_delivery_utilization_pct')), f"{kpis.get('under_utilized_delivery_count')} under (<70%), {kpis.get('over_utilized_delivery_count')} over (>100%)")
-        util_df_original = st.session_state.all_data.get('Team Utilization', pd.DataFrame())
+        util_df_original = get_snapshot().data.get('Team Utilization', pd.DataFrame())
         if not util_df_original.empty and 'Employee Name' in util_df_original.columns and 'Utilization (%)' in util_df_original.columns and 'Role' in util_df_original.columns:
             util_df_c = util_df_original.copy()
             util_df_c['Utilization (%)'] = indicators.safe_to_numeric(util_df_c['Utilization (%)'])
             fig_util = px.bar(util_df_c.sort_values('Utilization (%)', ascending=False), x='Employee Name', y='Utilization (%)', color='Role', title='Team Member Utilization', text_auto=True)
             fig_util.update_layout(xaxis_tickangle=-45, height=500); st.plotly_chart(fig_util, use_container_width=True)
         else: st.info("Team utilization data or required columns not available for chart.")
+        assignments = get_staff_assignments()
+        if not assignments.empty:
+            with st.expander("Project Assignments per Team Member"):
+                st.dataframe(staffing.staff_load(assignments), use_container_width=True, hide_index=True)
         st.markdown("<div class='section-header'>Employee Pulse</div>", unsafe_allow_html=True)
         st.metric("Average Employee Pulse Score", format_number(kpis.get('avg_employee_pulse_score'),1), f"{format_percentage(kpis.get('employee_pulse_vs_target_pct'))} of target")
     with tab_gaps:
         st.markdown("<div class='section-header'>Talent Gaps</div>", unsafe_allow_html=True)
-        talent_gaps_df = st.session_state.all_data.get('Talent Gaps', pd.DataFrame())
+        talent_gaps_df = get_snapshot().data.get('Talent Gaps', pd.DataFrame())
         if not talent_gaps_df.empty: st.dataframe(talent_gaps_df, use_container_width=True)
         else: st.info("No talent gap data available.")
         st.markdown("<div class='section-header'>Operational Gaps</div>", unsafe_allow_html=True)
-        operational_gaps_df = st.session_state.all_data.get('Operational Gaps', pd.DataFrame())
+        operational_gaps_df = get_snapshot().data.get('Operational Gaps', pd.DataFrame())
         if not operational_gaps_df.empty: st.dataframe(operational_gaps_df, use_container_width=True)
         else: st.info("No operational gap data available.")
     with tab_exec:
         st.markdown("<div class='section-header'>Executive Activity & Strategic Cost</div>", unsafe_allow_html=True)
         st.metric("Total Strategic Cost (from Exec Activity)", format_currency(kpis.get('total_strategic_cost')))
         st.metric("Total Strategic Activities Logged", format_number(kpis.get('total_strategic_activities_count')))
-        exec_activity_df_original = st.session_state.all_data.get('Executive Activity', pd.DataFrame())
+        exec_activity_df_original = get_snapshot().data.get('Executive Activity', pd.DataFrame())
         if not exec_activity_df_original.empty: st.dataframe(exec_activity_df_original, use_container_width=True)
         else: st.info("No executive activity data available.")
 
@@ -774,18 +1178,18 @@ def render_scenario_modeling_page():
     scenario_tabs_map = {"Inputs": 'Scenario Model Inputs', "Do Nothing": 'Do Nothing Scenario', "Proposed": 'Proposed Scenario', "Comparison": 'Scenario Comparison'}
     selected_tab_name = st.selectbox("Select Scenario View", list(scenario_tabs_map.keys()))
     df_name = scenario_tabs_map[selected_tab_name]
-    df = st.session_state.all_data.get(df_name, pd.DataFrame())
+    df = get_snapshot().data.get(df_name, pd.DataFrame())
     st.subheader(f"{selected_tab_name} Data")
     if not df.empty: st.dataframe(df, use_container_width=True)
     else: st.info(f"No data available for '{df_name}'.")
 
 def render_data_explorer_page():
     st.title("🔍 Data Explorer")
-    worksheet_names = list(st.session_state.all_data.keys())
+    worksheet_names = list(get_snapshot().data.keys())
     if not worksheet_names: st.warning("No data loaded yet. Please wait or try refreshing."); return
     selected_view = st.selectbox("Select Worksheet to View", worksheet_names)
-    if selected_view in st.session_state.all_data:
-        df = st.session_state.all_data[selected_view]
+    if selected_view in get_snapshot().data:
+        df = get_snapshot().data[selected_view]
         if not df.empty:
             st.subheader(f"Raw Data: {selected_view}")
             if selected_view == 'Project Inventory' and 'Status (R/Y/G)' in df.columns:
@@ -801,13 +1205,37 @@ def render_data_explorer_page():
             else: st.dataframe(df, use_container_width=True)
             csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(label=f"Download {selected_view} as CSV", data=csv, file_name=f'{selected_view.lower().replace(" ", "_")}.csv', mime='text/csv')
+            render_scorecard_check(selected_view)
         else: st.info(f"Worksheet '{selected_view}' is empty or failed to load.")
 
+def get_scorecard_results():
+    # Scored once per snapshot version from its MappingTable and shared by every session
+    snapshot = get_snapshot()
+    return snapshot.derive(('scorecard',), lambda: scorecard.score_all(snapshot.data))
+
+def render_scorecard_check(worksheet_name):
+    if worksheet_name not in scorecard.SCORECARDS: return
+    result = get_scorecard_results().get(worksheet_name)
+    with st.expander("🧮 Scorecard check (recomputed from MappingTable)"):
+        if result is None:
+            st.info("MappingTable is not loaded or has no rows for this sheet, so scores cannot be recomputed.")
+            return
+        card = scorecard.SCORECARDS[worksheet_name]
+        mismatches = scorecard.mismatch_summary(result)
+        if mismatches:
+            st.warning("Computed scores differ from the sheet: " + ", ".join(f"{col} ({count} rows)" for col, count in mismatches.items()))
+        else:
+            st.success("Every score in the sheet matches the MappingTable.")
+        band_counts = result['Band'].value_counts()
+        st.caption(f"{card['health_col']} bands: " + " · ".join(f"{band}: {band_counts.get(band, 0)}" for band in list(card['bands']) + ['N/A']))
+        rows = result[result['Mismatch'] != ''] if mismatches else result
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
 # --- Page for Data Management ---
 def render_manage_data_page():
     st.title("📝 Manage Data")
 
-    entity_type_options = ["Project", "Pipeline Opportunity"]
+    entity_type_options = ["Project", "Pipeline Opportunity", "Bulk Edit"]
     # Determine default index for radio based on session state, ensure it's valid
     try:
         entity_type_index = entity_type_options.index(st.session_state.manage_data_entity_type)
@@ -831,10 +1259,48 @@ def render_manage_data_page():
         render_manage_project_form()
     elif entity_type == "Pipeline Opportunity":
         render_manage_pipeline_form()
+    elif entity_type == "Bulk Edit":
+        render_bulk_edit_grid()
+
+def render_bulk_edit_grid():
+    st.subheader("Bulk Edit")
+    worksheet_name = st.radio("Worksheet", list(sheet_writes.BULK_EDIT_SHEETS), horizontal=True, key="bulk_edit_worksheet")
+    identifier_col, editable_cols = sheet_writes.BULK_EDIT_SHEETS[worksheet_name]
+    df = get_snapshot().data.get(worksheet_name, pd.DataFrame())
+    if df.empty or identifier_col not in df.columns:
+        st.warning(f"{worksheet_name} data or '{identifier_col}' column not loaded. Cannot bulk edit.")
+        return
+
+    editable_cols = [col for col in editable_cols if col in df.columns]
+    grid_df = df[[identifier_col] + editable_cols]
+    st.caption("Edit any number of cells, review the changes below, then save them all in one update.")
+    # Keyed on the snapshot version so the grid resets once a save (or a refresh) publishes new data
+    edited_df = st.data_editor(
+        grid_df, num_rows="fixed", disabled=[identifier_col], use_container_width=True, hide_index=True,
+        key=f"bulk_edit_grid_{worksheet_name}_{get_snapshot().version}"
+    )
+
+    changes, skipped = sheet_writes.diff_rows(grid_df, edited_df, identifier_col, editable_cols)
+    if skipped:
+        st.warning(f"Not saved because '{identifier_col}' is blank or duplicated: {', '.join(map(str, skipped))}")
+    if not changes:
+        st.info("No changes yet.")
+        return
+
+    rows = sheet_writes.changes_by_row(changes)
+    st.write(f"#### {len(changes)} changed cell(s) in {len(rows)} row(s)")
+    st.dataframe(pd.DataFrame(changes).rename(columns={
+        'identifier': identifier_col, 'column': 'Column', 'old': 'Current Value', 'new': 'New Value'
+    }), use_container_width=True, hide_index=True)
+    if st.button(f"💾 Save {len(changes)} change(s) to Google Sheet", key="bulk_edit_save"):
+        with st.spinner(f"Updating {len(rows)} row(s) in {worksheet_name}..."):
+            if write_rows_to_gsheet(worksheet_name, identifier_col, rows):
+                st.success(f"Updated {len(rows)} row(s) in '{worksheet_name}'.")
+                st.rerun()
 
 def render_manage_project_form():
     st.subheader("Update Project Details")
-    project_df = st.session_state.all_data.get('Project Inventory', pd.DataFrame())
+    project_df = get_snapshot().data.get('Project Inventory', pd.DataFrame())
 
     if project_df.empty or 'Project Name' not in project_df.columns:
         st.warning("Project Inventory data or 'Project Name' column not loaded. Cannot manage project data.")
@@ -904,14 +1370,12 @@ def render_manage_project_form():
                     success = update_gsheet_row('Project Inventory', 'Project Name', selected_project_name, update_payload)
                     if success:
                         st.success(f"Project '{selected_project_name}' updated successfully!")
-                        st.session_state.data_loaded = False; st.cache_data.clear(); st.cache_resource.clear()
-                        st.session_state.initial_load_complete = False
                         st.rerun()
     else: st.info("Select a project to update its details.")
 
 def render_manage_pipeline_form():
     st.subheader("Update Pipeline Opportunity Details")
-    pipeline_df = st.session_state.all_data.get('Pipeline', pd.DataFrame())
+    pipeline_df = get_snapshot().data.get('Pipeline', pd.DataFrame())
 
     if pipeline_df.empty or 'Account' not in pipeline_df.columns:
         st.warning("Pipeline data or 'Account' column not loaded. Cannot manage pipeline data.")
@@ -1001,8 +1465,6 @@ def render_manage_pipeline_form():
                     success = update_gsheet_row('Pipeline', 'Account', selected_account_name, update_payload_cleaned)
                     if success:
                         st.success(f"Pipeline opportunity for '{selected_account_name}' updated successfully!")
-                        st.session_state.data_loaded = False; st.cache_data.clear(); st.cache_resource.clear()
-                        st.session_state.initial_load_complete = False
                         st.rerun()
     else: st.info("Select a pipeline opportunity (by Account) to update its details.")
 
@@ -1011,7 +1473,7 @@ def render_scenario_playground_page():
     st.markdown("Interactively adjust scenario assumptions and see the impact in real time.")
 
     # --- Load scenario inputs ---
-    inputs_df = st.session_state.all_data.get('Scenario Model Inputs', pd.DataFrame())
+    inputs_df = get_snapshot().data.get('Scenario Model Inputs', pd.DataFrame())
     if inputs_df.empty or not {'Assumption', 'Value'}.issubset(inputs_df.columns):
         st.warning("No scenario inputs found or missing required columns.")
         return
@@ -1140,13 +1602,14 @@ def render_scenario_playground_page():
         with st.spinner("Thinking..."):
             context = f"Scenario Inputs:\n{proposed_inputs}\n\nScenario Results:\n{results_df.to_string(index=False)}"
             try:
-                completion = st.session_state.openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a strategic scenario modeling assistant for healthcare delivery. Help the user analyze tradeoffs, opportunity cost, and scenario impacts."},
-                        {"role": "user", "content": f"{context}\n\nQuestion: {scenario_question}"}
-                    ]
-                )
+                with perf.timer('openai', snapshot=get_snapshot().meta.get('hash'), page=st.session_state.current_page):
+                    completion = st.session_state.openai_client.chat.completions.create(
+                        model="gpt-4o",
+                        messages=[
+                            {"role": "system", "content": "You are a strategic scenario modeling assistant for healthcare delivery. Help the user analyze tradeoffs, opportunity cost, and scenario impacts."},
+                            {"role": "user", "content": f"{context}\n\nQuestion: {scenario_question}"}
+                        ]
+                    )
                 response_text = completion.choices[0].message.content
             except Exception as e:
                 response_text = f"Error querying OpenAI: {str(e)}"
@@ -1156,13 +1619,14 @@ def render_scenario_playground_page():
 
 def render_whale_hunting_page():
     st.title("🐳 Whale Hunting: Top Strategic Pursuits")
-    pipeline_df = st.session_state.all_data.get('Pipeline', pd.DataFrame())
+    pipeline_df = get_snapshot().data.get('Pipeline', pd.DataFrame())
 
     if pipeline_df.empty:
         st.warning("Pipeline data not loaded. Cannot display whale hunting information.")
         return
 
-    # Ensure correct data types
+    # Ensure correct data types (on a copy; the loaded snapshot is shared with other sessions)
+    pipeline_df = pipeline_df.copy()
     pipeline_df['Percieved Annual AMO'] = indicators.safe_to_numeric(pipeline_df['Percieved Annual AMO'])
     pipeline_df['Open Pipeline_Active Work'] = indicators.safe_to_numeric(pipeline_df.get('Open Pipeline_Active Work', pd.Series(dtype=float)))
     pipeline_df['Pipeline Score'] = indicators.safe_to_numeric(pipeline_df.get('Pipeline Score', pd.Series(dtype=float)))
@@ -1225,11 +1689,20 @@ def render_whale_hunting_page():
                 st.session_state.current_page = "📝 Manage Data"
                 st.rerun()
 
+def get_staff_assignments():
+    # One row per (team member, project), split from 'Project Assignments' once per snapshot version
+    snapshot = get_snapshot()
+    return snapshot.derive(('staff_assignments',), lambda: staffing.assignment_table(snapshot.data.get('Team Utilization')))
+
+def get_project_staffing():
+    snapshot = get_snapshot()
+    return snapshot.derive(('project_staffing',), lambda: staffing.project_staffing(get_staff_assignments()))
+
 def render_staffing_health_page():
     st.title("🧑‍💻 Project Staffing Health")
     
-    project_df = st.session_state.all_data.get('Project Inventory', pd.DataFrame())
-    util_df = st.session_state.all_data.get('Team Utilization', pd.DataFrame())
+    project_df = get_snapshot().data.get('Project Inventory', pd.DataFrame())
+    util_df = get_snapshot().data.get('Team Utilization', pd.DataFrame())
 
     if project_df.empty:
         st.warning("Project Inventory data not loaded. Cannot display staffing health.")
@@ -1244,7 +1717,6 @@ def render_staffing_health_page():
     if 'Project End Date' not in project_df_c.columns:
         st.error("'Project End Date' column missing from Project Inventory. Cannot determine active projects.")
         return
-    project_df_c['Project End Date'] = pd.to_datetime(project_df_c['Project End Date'], errors='coerce')
     current_date = pd.to_datetime(date.today())
     active_projects_df = project_df_c[
         (project_df_c['Project End Date'].isna()) | (project_df_c['Project End Date'] >= current_date)
@@ -1255,70 +1727,39 @@ def render_staffing_health_page():
         return
 
     # --- 2. Prepare Utilization Data ---
-    util_df_c = util_df.copy()
-    if not util_df_c.empty:
-        if 'Utilization (%)' in util_df_c.columns:
-            util_df_c['Utilization (%)'] = indicators.safe_to_numeric(util_df_c['Utilization (%)'])
-        else:
-            util_df_c['Utilization (%)'] = 0 # Default if missing
+    if not util_df.empty:
+        if 'Utilization (%)' not in util_df.columns:
             st.warning("'Utilization (%)' column missing in Team Utilization.")
-
-        if 'Latest Pulse Score' in util_df_c.columns:
-            util_df_c['Latest Pulse Score'] = indicators.safe_to_numeric(util_df_c['Latest Pulse Score'])
-        else:
-            util_df_c['Latest Pulse Score'] = 0 # Default if missing
+        if 'Latest Pulse Score' not in util_df.columns:
             st.warning("'Latest Pulse Score' column missing in Team Utilization.")
-        
-        if 'Project Assignments' not in util_df_c.columns:
+        if 'Project Assignments' not in util_df.columns:
             st.warning("'Project Assignments' column missing in Team Utilization. Cannot link staff to projects.")
-            util_df_c = pd.DataFrame() # Effectively disable staff lookups
-        else:
-             util_df_c['Project Assignments'] = util_df_c['Project Assignments'].astype(str).fillna('')
 
-    staffing_health_data = []
     required_project_cols = ['Project Name', 'Client', 'Status (R/Y/G)', 'Team Resourcing', 'Project End Date']
     if not all(col in active_projects_df.columns for col in required_project_cols):
         st.error(f"One or more required columns ({required_project_cols}) are missing from Project Inventory.")
         return
 
     # --- 3. Combine Data for Each Active Project ---
-    for index, project_row in active_projects_df.iterrows():
-        project_name = project_row['Project Name']
-        assigned_team_members = []
-        team_utilizations = []
-        team_pulse_scores = []
-
-        if not util_df_c.empty and 'Employee Name' in util_df_c.columns:
-            for _, staff_row in util_df_c.iterrows():
-                # Split by comma, strip whitespace from each project name
-                assigned_projects = [p.strip() for p in staff_row.get('Project Assignments', '').split(',')]
-                if project_name in assigned_projects:
-                    assigned_team_members.append(staff_row['Employee Name'])
-                    if 'Utilization (%)' in staff_row and pd.notna(staff_row['Utilization (%)']):
-                        team_utilizations.append(staff_row['Utilization (%)'])
-                    if 'Latest Pulse Score' in staff_row and pd.notna(staff_row['Latest Pulse Score']):
-                        team_pulse_scores.append(staff_row['Latest Pulse Score'])
-        
-        avg_utilization = sum(team_utilizations) / len(team_utilizations) if team_utilizations else 0
-        avg_pulse = sum(team_pulse_scores) / len(team_pulse_scores) if team_pulse_scores else 0
-
-        staffing_health_data.append({
-            'Project Name': project_name,
-            'Client': project_row['Client'],
-            'Status (R/Y/G)': project_row['Status (R/Y/G)'],
-            'Team Resourcing': project_row['Team Resourcing'],
-            'Assigned Team Size': len(assigned_team_members),
-            'Assigned Team Members': ", ".join(assigned_team_members) if assigned_team_members else 'N/A',
-            'Avg. Team Utilization %': avg_utilization,
-            'Avg. Team Pulse Score': avg_pulse,
-            'Project End Date': project_row['Project End Date'].strftime('%Y-%m-%d') if pd.notna(project_row['Project End Date']) else 'N/A'
-        })
-
-    if not staffing_health_data:
+    # Team figures per project come from the snapshot's staff-to-project table (built once per version)
+    team = staffing.staffing_for_projects(active_projects_df['Project Name'], get_project_staffing())
+    staffing_health_data = pd.DataFrame({
+        'Project Name': active_projects_df['Project Name'].to_numpy(),
+        'Client': active_projects_df['Client'].to_numpy(),
+        'Status (R/Y/G)': active_projects_df['Status (R/Y/G)'].to_numpy(),
+        'Team Resourcing': active_projects_df['Team Resourcing'].to_numpy(),
+        'Assigned Team Size': team['Assigned Team Size'].to_numpy(),
+        'Assigned Team Members': team['Assigned Team Members'].to_numpy(),
+        'Avg. Team Utilization %': team['Avg. Team Utilization %'].to_numpy(),
+        'Avg. Team Pulse Score': team['Avg. Team Pulse Score'].to_numpy(),
+        'Project End Date': active_projects_df['Project End Date'].dt.strftime('%Y-%m-%d').fillna('N/A').to_numpy(),
+    })
+
+    if staffing_health_data.empty:
         st.info("No staffing health data to display for active projects.")
         return
 
-    display_df = pd.DataFrame(staffing_health_data)
+    display_df = staffing_health_data
     
     # --- 4. Display Data with Styling and Filters ---
     st.subheader("Active Projects Staffing Overview")
@@ -1371,6 +1812,36 @@ def render_staffing_health_page():
     else:
         st.info("No projects match the selected filter criteria.")
 
+    render_forward_capacity(project_df)
+
+def render_forward_capacity(project_df):
+    st.subheader("Forward Capacity")
+    assignments = get_staff_assignments()
+    if assignments.empty:
+        st.info("No staff-to-project assignments available for a capacity view.")
+        return
+    weeks = st.slider("Weeks ahead:", 4, staffing.MAX_CAPACITY_WEEKS, staffing.DEFAULT_CAPACITY_WEEKS)
+    # Cheap enough (thousands of people x 52 weeks in well under a second) to rebuild on every rerun
+    plan = staffing.capacity_plan(assignments, project_df, weeks=weeks)
+    st.caption("Each person's current utilization is split evenly over their assigned projects running this week; "
+               "projects starting later add the same share, so overlaps show up as over 100%.")
+    over_allocated, unstaffed = plan.over_allocated(), plan.unstaffed()
+    cols = st.columns(2)
+    with cols[0]: st.metric(f"People Over {staffing.OVER_ALLOCATION_PCT}%", len(over_allocated), f"of {len(plan.people)} assigned")
+    with cols[1]: st.metric("Weeks With Unstaffed Projects", len(unstaffed), f"of {weeks}", delta_color="off")
+
+    if not over_allocated.empty:
+        st.markdown("**Over-allocated team members**")
+        st.dataframe(over_allocated, use_container_width=True, hide_index=True)
+        heatmap = plan.allocation_frame(rows=(plan.allocation > staffing.OVER_ALLOCATION_PCT).any(axis=1))
+        fig = px.imshow(heatmap, aspect='auto', color_continuous_scale='RdYlGn_r', zmin=0, zmax=150,
+                        labels={'x': 'Week of', 'y': 'Team member', 'color': 'Allocation %'}, title='Weekly Allocation (over-allocated people)')
+        fig.update_layout(height=max(300, 22 * len(heatmap)))
+        st.plotly_chart(fig, use_container_width=True)
+    if not unstaffed.empty:
+        st.markdown("**Weeks where running projects have nobody assigned**")
+        st.dataframe(unstaffed, use_container_width=True, hide_index=True)
+
 # --- Main Application ---
 PAGES = {
     "🏠 Home": render_home_dashboard,
@@ -1388,6 +1859,7 @@ PAGES = {
 
 def main():
     init_session_state()
+    configure_perf_logging()
     
     st.sidebar.image("https://mma.prnewswire.com/media/1677414/Hakkoda_Logo.jpg?p=facebook", width=200)
     st.sidebar.title("Healthcare Delivery OS")
@@ -1404,23 +1876,44 @@ def main():
 
     if not st.session_state.data_loaded :
         load_all_data() 
+    else:
+        sync_session_snapshot()
     
     if st.sidebar.button("🔄 Refresh Data"):
-        st.session_state.data_loaded = False 
-        st.cache_data.clear() 
-        st.cache_resource.clear() 
-        st.session_state.initial_load_complete = False 
-        load_all_data() 
-        st.rerun()
-
+        # Only the fetch cache is dropped: the shared snapshot registry and refresher must outlive a single session's refresh
+        load_all_sheets_batched_cached.clear()
+        if st.session_state.data_loaded and get_refresh_fn():
+            # Queued behind a refresh that is already running, if there is one
+            start_background_refresh()
+            # The page keeps showing the current snapshot; the new one is picked up when it is published
+            st.sidebar.info("Refreshing in the background; the page updates when the new data is ready.")
+        else:
+            st.session_state.data_loaded = False 
+            st.session_state.skip_disk_snapshot = True
+            st.session_state.initial_load_complete = False 
+            load_all_data() 
+            st.rerun()
+
+    if st.session_state.data_loaded:
+        ensure_auto_refresh()
+        with st.sidebar:
+            watch_for_new_snapshot()
+
+    render_data_freshness()
+    render_load_report()
+    render_sheets_quota_panel()
     render_ai_assistant()
     
-    if st.session_state.data_loaded and st.session_state.indicators:
+    if st.session_state.data_loaded and get_snapshot().indicators:
         page_function = PAGES.get(st.session_state.current_page) 
-        if page_function: page_function()
-        else: st.error("Selected page not found. Defaulting to Home."); render_home_dashboard() 
+        with perf.timer('render', snapshot=get_snapshot().meta.get('hash'), page=st.session_state.current_page):
+            if page_function: page_function()
+            else: st.error("Selected page not found. Defaulting to Home."); render_home_dashboard() 
     elif not st.session_state.data_loaded: st.warning("Data is loading or connection failed. Please wait or check console for errors.")
     else: st.warning("Indicators are not yet calculated. Please wait or refresh data.")
 
+    # Last, so the panel includes this run's page render
+    render_performance_panel()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Score banding (PROJECT_SCORE_BANDS / PIPELINE_SCORE_BANDS style dicts of {band: (low, high)}).
+
+A band dict is compiled once into sorted low edges and their matching high edges; a whole array of scores is then
+classified with one binary search (np.searchsorted) instead of checking every band for every score. The rules are
+the ones the dashboard has always used: ranges are inclusive at both ends, and a score that falls in a gap between
+bands (e.g. 84.995 between 'Strong' (70, 84.99) and 'Excellent' (85, 100)), outside every band, or is blank is 'N/A'.
+"""
+import numpy as np
+import pandas as pd
+
+NA_BAND = 'N/A'
+
+_compiled = {}
+
+
+class CompiledBands:
+    def __init__(self, bands):
+        # Labels keep the dict order (that is the order counts and pcts are reported in)
+        self.labels = list(bands)
+        order = sorted(range(len(self.labels)), key=lambda i: bands[self.labels[i]][0])
+        self.lows = np.array([bands[self.labels[i]][0] for i in order], dtype=float)
+        self.highs = np.array([bands[self.labels[i]][1] for i in order], dtype=float)
+        # Position in sorted-edge order -> position in self.labels
+        self.label_index = np.array(order, dtype=np.intp)
+        if np.any(self.highs[:-1] >= self.lows[1:]):
+            raise ValueError(f"Score bands overlap: {bands}")
+
+    def classify(self, values):
+        """Band index (into self.labels) for every value, -1 for 'N/A'."""
+        values = np.asarray(values, dtype=float)
+        if not self.labels:
+            return np.full(values.shape, -1, dtype=np.intp)
+        # Last band whose low edge is <= the value; NaN sorts past every edge and then fails the high check
+        position = np.searchsorted(self.lows, values, side='right') - 1
+        candidate = np.maximum(position, 0)
+        inside = (position >= 0) & (values <= self.highs[candidate])
+        return np.where(inside, self.label_index[candidate], -1)
+
+
+def compile_bands(bands):
+    """CompiledBands for a band dict, cached by its contents."""
+    key = tuple(bands.items())
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = _compiled[key] = CompiledBands(bands)
+    return compiled
+
+
+def _as_float_array(scores):
+    if isinstance(scores, (pd.Series, pd.Index)):
+        return pd.to_numeric(scores, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(scores, dtype=float)
+
+
+def band_labels(scores, bands):
+    """Band label for every score, as a Series aligned with `scores` ('N/A' outside every band)."""
+    compiled = compile_bands(bands)
+    codes = compiled.classify(_as_float_array(scores))
+    labels = np.array(compiled.labels + [NA_BAND], dtype=object)
+    return pd.Series(labels[codes], index=getattr(scores, 'index', None), dtype=object)
+
+
+def _distribution(counts, labels):
+    band_counts = {label: int(count) for label, count in zip(labels, counts[:-1])}
+    band_counts[NA_BAND] = int(counts[-1])
+    total_valid = int(counts[:-1].sum())
+    band_pct = {label: (count / total_valid * 100 if total_valid > 0 else 0) for label, count in zip(labels, counts[:-1])}
+    return band_counts, band_pct
+
+
+def band_distribution(scores, bands):
+    """(counts per band including 'N/A', percentage per band of the scores that fall in a band)."""
+    return band_distributions({None: scores}, bands)[None]
+
+
+def band_distributions(columns, bands):
+    """
+    band_distribution for several score columns at once ({name: scores} or a DataFrame), with a single
+    classification pass over all of them: {name: (counts, pcts)}.
+    """
+    compiled = compile_bands(bands)
+    names = list(columns.keys())
+    arrays = [_as_float_array(columns[name]) for name in names]
+    if not names:
+        return {}
+    codes = compiled.classify(np.concatenate(arrays))
+    # Offset each column's codes into its own block of len(labels) + 1 counters (the last one is 'N/A')
+    width = len(compiled.labels) + 1
+    column_index = np.repeat(np.arange(len(names)), [len(array) for array in arrays])
+    slots = column_index * width + np.where(codes >= 0, codes, width - 1)
+    counts = np.bincount(slots, minlength=len(names) * width).reshape(len(names), width)
+    return {name: _distribution(counts[i], compiled.labels) for i, name in enumerate(names)}
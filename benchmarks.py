@@ -0,0 +1,180 @@
+"""
+Benchmarks for the dashboard's hot paths on synthetic workbooks (see synthetic_data.py).
+
+    python benchmarks.py                                  # sizes 10, 1000, 100000; results in .benchmarks/latest.json
+    python benchmarks.py --sizes 10 1000000               # up to 1M rows per tab
+    python benchmarks.py --save-baseline                  # also store the run as .benchmarks/baseline.json
+    python benchmarks.py --baseline .benchmarks/baseline.json --tolerance 0.25
+
+Each benchmark is timed `repeat` times per size and the best time is kept. With a baseline, any benchmark that
+got slower by more than the tolerance (and by more than MIN_REGRESSION_SECONDS, so tiny sizes don't flap) is
+reported as a regression and the script exits with status 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import perf
+import scorecard
+import sheet_schema
+import sheets_loader
+import staffing
+import synthetic_data
+
+DEFAULT_SIZES = [10, 1000, 100000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.005
+RESULTS_DIR = '.benchmarks'
+
+
+# --- Hot paths; each takes the prepared workbook and returns nothing ---
+
+def bench_parse_values(workbook):
+    # What a formatted load does per tab: values list -> DataFrame -> typed columns
+    for name, values in workbook['values'].items():
+        sheet_schema.type_dataframe(name, sheets_loader.values_to_dataframe(values, name))
+
+def bench_get_all_indicators(workbook):
+    indicators.get_all_indicators(workbook['typed'])
+
+def bench_staffing_join(workbook):
+    # render_staffing_health_page: assignment table, per-project aggregation, lookup for active projects
+    typed = workbook['typed']
+    project_df = typed['Project Inventory']
+    end_date = project_df['Project End Date']
+    active = project_df[end_date.isna() | (end_date >= pd.Timestamp.today().normalize())]
+    table = staffing.project_staffing(staffing.assignment_table(typed['Team Utilization']))
+    staffing.staffing_for_projects(active['Project Name'], table)
+
+def bench_capacity_plan(workbook):
+    typed = workbook['typed']
+    staffing.capacity_plan(staffing.assignment_table(typed['Team Utilization']), typed['Project Inventory'], weeks=staffing.MAX_CAPACITY_WEEKS)
+
+def bench_upcoming_key_dates(workbook):
+    indicators.get_upcoming_key_dates(workbook['typed'])
+
+def bench_scorecard(workbook):
+    scorecard.score_all(workbook['typed'])
+
+
+BENCHMARKS = {
+    'parse_values': bench_parse_values,
+    'get_all_indicators': bench_get_all_indicators,
+    'staffing_join': bench_staffing_join,
+    'capacity_plan': bench_capacity_plan,
+    'upcoming_key_dates': bench_upcoming_key_dates,
+    'scorecard': bench_scorecard,
+}
+
+
+def prepare_workbook(rows, seed=0):
+    data = synthetic_data.generate_workbook(rows, seed=seed)
+    return {
+        'values': {name: synthetic_data.to_values(df) for name, df in data.items()},
+        'typed': sheet_schema.type_sheets(data),
+    }
+
+
+def time_call(fn, workbook, repeat):
+    timings = []
+    for _ in range(repeat):
+        # The indicators print Info/Warning lines; keep them out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(workbook)
+            timings.append(time.perf_counter() - start)
+    return {'best': min(timings), 'median': statistics.median(timings)}
+
+
+def run(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, names=None, seed=0, log=print):
+    """{'meta': {...}, 'results': {benchmark: {size: {'best': s, 'median': s}}}}"""
+    names = list(names or BENCHMARKS)
+    results = {name: {} for name in names}
+    for size in sizes:
+        log(f"Info: Generating synthetic workbook with {size:,} rows per tab...")
+        workbook = prepare_workbook(size, seed=seed)
+        for name in names:
+            results[name][str(size)] = time_call(BENCHMARKS[name], workbook, repeat)
+            log(f"  {name:<20} {size:>9,} rows  {results[name][str(size)]['best'] * 1000:10.1f} ms")
+        del workbook
+    return {
+        'meta': {
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressions as (benchmark, size, baseline seconds, current seconds); only benchmark/size pairs in both."""
+    regressions = []
+    for name, sizes in current['results'].items():
+        for size, timing in sizes.items():
+            before = baseline.get('results', {}).get(name, {}).get(size)
+            if before is None:
+                continue
+            if timing['best'] > before['best'] * (1 + tolerance) and timing['best'] - before['best'] > MIN_REGRESSION_SECONDS:
+                regressions.append((name, size, before['best'], timing['best']))
+    return regressions
+
+
+def save(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the dashboard's hot paths on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='rows per tab (10 to 1000000)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    parser.add_argument('--baseline', help='compare against this results file')
+    parser.add_argument('--save-baseline', action='store_true', help=f'also write the results to {RESULTS_DIR}/baseline.json')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed slowdown before reporting (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+    # The stage timers stay on (their cost is part of what is measured), but their log lines would drown the report
+    perf.TIMINGS.log = False
+
+    results = run(args.sizes, args.repeat, args.only, args.seed)
+    save(results, args.output)
+    print(f"Info: Results written to {args.output}")
+    if args.save_baseline:
+        save(results, os.path.join(RESULTS_DIR, 'baseline.json'))
+        print(f"Info: Baseline written to {os.path.join(RESULTS_DIR, 'baseline.json')}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, size, before, after in regressions:
+            print(f"Warning: {name} at {int(size):,} rows regressed: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({after / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"Info: No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Data-source layer. Every backend returns the same {worksheet name: DataFrame} dict the pages and
+indicators already consume, so nothing downstream needs to know where the data came from.
+Every load is typed with sheet_schema before it is returned, so downstream code never re-parses columns.
+
+Selected with DATA_SOURCE (gsheets | local | sqlite) and DATA_SOURCE_PATH:
+    gsheets  live Google Sheet (GOOGLE_SHEET_NAME + service account credentials), or with FAKE_SHEETS_DIR a
+             file-backed fake of the Sheets API (fake_gspread.py) with optional latency and error injection
+    local    a directory with one <worksheet name>.parquet/.csv/.xlsx per tab, or a single .xlsx workbook
+    sqlite   a SQLite database with one table per worksheet, named after the worksheet
+"""
+import abc
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import perf
+import sheet_schema
+import sheets_client
+import sheets_loader
+import sheets_quota
+
+DATA_SOURCE_KINDS = ('gsheets', 'local', 'sqlite')
+LOCAL_FILE_EXTENSIONS = ('.parquet', '.csv', '.xlsx')
+
+# Google Sheets refreshes only re-download tabs whose fingerprint changed, except for a full reload this often
+FULL_RELOAD_SECONDS = 30 * 60
+# How long a background load waits for the Sheets connection before giving up until the next refresh
+SHEETS_CONNECT_TIMEOUT = 30
+
+
+def normalize_dataframe(df):
+    """Same clean-up as the Sheets loader: stripped headers, blank cells as NA, fully empty rows dropped."""
+    df = df.copy()
+    df.columns = df.columns.astype(str).str.strip()
+    df = df.replace('', pd.NA).dropna(how='all')
+    return df
+
+
+def _load_report(mode, data, start, **extra):
+    return {
+        'mode': mode,
+        'total_seconds': time.perf_counter() - start,
+        'rows': {name: len(df) for name, df in data.items()},
+        **extra,
+    }
+
+
+class DataSource(abc.ABC):
+    kind = None
+    # Only Google Sheets accepts edits from the Manage Data page
+    supports_writes = False
+
+    @abc.abstractmethod
+    def load_all(self, worksheet_names=None):
+        """Returns (data, report) for every worksheet; missing worksheets come back as empty DataFrames."""
+
+    def refresh(self, previous_data=None, previous_meta=None):
+        """Used by the background refresher. Returns (data, extra snapshot meta)."""
+        data, report = self.load_all()
+        return data, {**self.snapshot_meta(), 'load_report': report}
+
+    def describe(self):
+        return self.kind
+
+    def snapshot_meta(self):
+        # Stored with each on-disk snapshot so a snapshot from another source is never served
+        return {'source': self.describe()}
+
+
+class GoogleSheetsSource(DataSource):
+    kind = 'gsheets'
+    supports_writes = True
+
+    def __init__(self, credentials_file, sheet_name, max_workers=sheets_loader.DEFAULT_LOAD_WORKERS,
+                 value_render=sheets_loader.FORMATTED, reads_per_minute=sheets_quota.DEFAULT_REQUESTS_PER_MINUTE,
+                 writes_per_minute=sheets_quota.DEFAULT_REQUESTS_PER_MINUTE, open_fn=None):
+        self.credentials_file = credentials_file
+        self.sheet_name = sheet_name
+        # open_fn replaces the service-account open, e.g. fake_gspread.directory_opener for offline runs
+        self.open_fn = open_fn or sheets_client.open_with_service_account
+        self.max_workers = max_workers
+        self.value_render = value_render
+        # Every Sheets call from this process (loads, background refreshes, saves) shares one quota
+        self.quota = sheets_quota.QuotaScheduler(reads_per_minute, writes_per_minute)
+        # Authorized once for the life of the process; reconnects back off on its own thread
+        self.connection = sheets_client.SheetsConnection(credentials_file, sheet_name, open_fn=self._open)
+
+    def _open(self, credentials_file, sheet_name):
+        return self.quota.call(
+            'open', sheets_quota.READ, sheets_quota.PRIORITY_INTERACTIVE, self.open_fn,
+            credentials_file, sheet_name, cost=sheets_quota.OPEN_SPREADSHEET_COST
+        )
+
+    @property
+    def is_fake(self):
+        return self.open_fn is not sheets_client.open_with_service_account
+
+    def is_configured(self):
+        """False when the real Sheet cannot be opened for lack of a sheet name or credentials file."""
+        if self.is_fake:
+            return True
+        return bool(self.sheet_name and self.credentials_file and os.path.exists(self.credentials_file))
+
+    def spreadsheet(self, timeout=SHEETS_CONNECT_TIMEOUT, priority=sheets_quota.PRIORITY_INTERACTIVE):
+        """The connected spreadsheet, wrapped so its calls go through the quota scheduler at `priority`."""
+        spreadsheet = self.connection.get(timeout=timeout)
+        if spreadsheet is None:
+            raise ConnectionError(f"Google Sheets is not reachable ({self.connection.status()})")
+        return self.quota.wrap(spreadsheet, priority)
+
+    def _call(self, fn, *args, priority=sheets_quota.PRIORITY_INTERACTIVE, **kwargs):
+        try:
+            return fn(self.spreadsheet(priority=priority), *args, **kwargs)
+        except Exception as e:
+            self.connection.invalidate(e)
+            raise
+
+    def load_all(self, worksheet_names=None):
+        with perf.timer('fetch', source=self.kind):
+            data, report = self._call(
+                sheets_loader.fetch_all, worksheet_names, max_workers=self.max_workers, value_render=self.value_render
+            )
+        return sheet_schema.type_sheets(data), report
+
+    def refresh(self, previous_data=None, previous_meta=None):
+        previous_meta = previous_meta or {}
+        full_reload_at = previous_meta.get('full_reload_at')
+        now = datetime.now()
+        # Fingerprints can miss edits outside the fingerprint range, so every tab is re-read in full now and then
+        if not full_reload_at or (now - datetime.fromisoformat(full_reload_at)).total_seconds() > FULL_RELOAD_SECONDS:
+            previous_data, full_reload_at = None, now.isoformat(timespec='seconds')
+        with perf.timer('fetch', source=self.kind, mode='refresh'):
+            data, fingerprints, report = self._call(
+                sheets_loader.fetch_changed, previous_data, previous_meta.get('fingerprints'),
+                max_workers=self.max_workers, value_render=self.value_render, priority=sheets_quota.PRIORITY_BACKGROUND
+            )
+        # Reused tabs are already typed, so only the re-downloaded ones are parsed
+        data = sheet_schema.type_sheets(data)
+        return data, {**self.snapshot_meta(), 'load_report': report, 'fingerprints': fingerprints, 'full_reload_at': full_reload_at}
+
+    def describe(self):
+        if self.is_fake:
+            return f"fake Google Sheet '{self.sheet_name or 'offline'}'"
+        return f"Google Sheet '{self.sheet_name}'"
+
+
+class LocalFilesSource(DataSource):
+    kind = 'local'
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read_sheet(self, name):
+        for ext in LOCAL_FILE_EXTENSIONS:
+            file_path = os.path.join(self.path, name + ext)
+            if not os.path.exists(file_path):
+                continue
+            if ext == '.parquet':
+                return pd.read_parquet(file_path)
+            if ext == '.csv':
+                return pd.read_csv(file_path, dtype=str, keep_default_na=False)
+            return pd.read_excel(file_path, dtype=str, keep_default_na=False)
+        print(f"Warning: no file found for worksheet '{name}' in {self.path}.")
+        return pd.DataFrame()
+
+    def load_all(self, worksheet_names=None):
+        worksheet_names = list(worksheet_names or sheets_loader.WORKSHEET_NAMES)
+        start = time.perf_counter()
+        with perf.timer('fetch', source=self.kind):
+            if os.path.isfile(self.path):
+                # Single workbook, one tab per worksheet (reading xlsx needs openpyxl installed)
+                workbook = pd.read_excel(self.path, sheet_name=None, dtype=str, keep_default_na=False)
+                raw = {name: workbook.get(name, pd.DataFrame()) for name in worksheet_names}
+                for name in worksheet_names:
+                    if name not in workbook:
+                        print(f"Warning: worksheet '{name}' not found in {self.path}.")
+            else:
+                raw = {name: self._read_sheet(name) for name in worksheet_names}
+        data = sheet_schema.type_sheets({name: normalize_dataframe(df) for name, df in raw.items()})
+        return data, _load_report('local files', data, start)
+
+    def write_all(self, data, file_format='parquet'):
+        """Writes a loaded snapshot out as one file per worksheet, e.g. to work offline from a copy of the Sheet."""
+        os.makedirs(self.path, exist_ok=True)
+        for name, df in data.items():
+            file_path = os.path.join(self.path, f"{name}.{file_format}")
+            if file_format == 'csv':
+                df.to_csv(file_path, index=False)
+            else:
+                df.to_parquet(file_path, index=False)
+
+    def describe(self):
+        return f"local files in {self.path}"
+
+
+class SQLiteSource(DataSource):
+    kind = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+
+    def load_all(self, worksheet_names=None):
+        worksheet_names = list(worksheet_names or sheets_loader.WORKSHEET_NAMES)
+        start = time.perf_counter()
+        data = {}
+        with perf.timer('fetch', source=self.kind), sqlite3.connect(self.path) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for name in worksheet_names:
+                if name not in tables:
+                    print(f"Warning: table for worksheet '{name}' not found in {self.path}.")
+                    data[name] = pd.DataFrame()
+                    continue
+                quoted_name = name.replace('"', '""')
+                data[name] = normalize_dataframe(pd.read_sql_query(f'SELECT * FROM "{quoted_name}"', conn))
+        data = sheet_schema.type_sheets(data)
+        return data, _load_report('sqlite', data, start)
+
+    def write_all(self, data):
+        with sqlite3.connect(self.path) as conn:
+            for name, df in data.items():
+                df.to_sql(name, conn, if_exists='replace', index=False)
+
+    def describe(self):
+        return f"SQLite database {self.path}"
+
+
+def create_data_source(kind, path=None, credentials_file=None, sheet_name=None,
+                       max_workers=sheets_loader.DEFAULT_LOAD_WORKERS, value_render=sheets_loader.FORMATTED,
+                       reads_per_minute=sheets_quota.DEFAULT_REQUESTS_PER_MINUTE,
+                       writes_per_minute=sheets_quota.DEFAULT_REQUESTS_PER_MINUTE, open_fn=None):
+    kind = (kind or 'gsheets').lower()
+    if kind == 'gsheets':
+        return GoogleSheetsSource(credentials_file, sheet_name, max_workers=max_workers, value_render=value_render,
+                                  reads_per_minute=reads_per_minute, writes_per_minute=writes_per_minute, open_fn=open_fn)
+    if kind in ('local', 'sqlite') and not path:
+        raise ValueError(f"DATA_SOURCE_PATH must be set for the '{kind}' data source")
+    if kind == 'local':
+        return LocalFilesSource(path)
+    if kind == 'sqlite':
+        return SQLiteSource(path)
+    raise ValueError(f"Unknown DATA_SOURCE '{kind}'; expected one of {', '.join(DATA_SOURCE_KINDS)}")
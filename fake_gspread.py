@@ -0,0 +1,367 @@
+"""
+Stand-in for the parts of gspread's Spreadsheet/Worksheet API the dashboard uses, so loading and write paths can
+be exercised offline. Every API-equivalent call is counted in `calls`.
+
+    spreadsheet = FakeSpreadsheet({'Pipeline': [['Account', 'Pipeline Score'], ['Acme', '72']]})
+    data, fingerprints, report = sheets_loader.fetch_changed(spreadsheet)
+
+Backed by a directory of '<worksheet name>.csv' files (the layout the 'local' data source reads), edits are
+written back to the files, so the app can run end to end against it without credentials:
+
+    python fake_gspread.py create ./fake_sheet --rows 1000        # synthetic workbook, see synthetic_data.py
+    FAKE_SHEETS_DIR=./fake_sheet FAKE_SHEETS_LATENCY_MS=300 FAKE_SHEETS_429_RATE=0.05 streamlit run app.py
+
+A FaultInjector adds per-call latency and fails a share of calls with 429 (rate limited) or 503 (transient)
+errors shaped like gspread's APIError (`error.response.status_code`), so quota handling, reconnect backoff and
+retries see what they would see from the real API.
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+
+RATE_LIMITED = 429
+UNAVAILABLE = 503
+ERROR_MESSAGES = {
+    RATE_LIMITED: 'Quota exceeded for quota metric \'Read requests\' (fake)',
+    UNAVAILABLE: 'The service is currently unavailable. (fake)',
+}
+
+
+class WorksheetNotFound(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=''):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return {'error': {'code': self.status_code, 'message': self.text}}
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread.exceptions.APIError: `response.status_code` and `code`."""
+
+    def __init__(self, status_code, message=None):
+        message = message or ERROR_MESSAGES.get(status_code, 'Fake API error')
+        super().__init__(f"APIError: [{status_code}]: {message}")
+        self.response = FakeResponse(status_code, message)
+        self.code = status_code
+
+
+class Cell:
+    """Same fields as gspread.Cell (1-based row/col)."""
+
+    def __init__(self, row, col, value=''):
+        self.row = row
+        self.col = col
+        self.value = value
+
+    def __repr__(self):
+        return f"<Cell R{self.row}C{self.col} {self.value!r}>"
+
+
+class FaultInjector:
+    """
+    Applied before every fake API call: sleeps `latency` seconds (+ up to `jitter`), then fails the call with a 429
+    with probability `rate_limit_rate` or a 503 with probability `error_rate`. fail_next() queues failures for the
+    next calls regardless of the rates. Injected failures are counted in `injected`.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit_rate=0.0, error_rate=0.0, seed=None, sleep=time.sleep):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.injected = Counter()
+        self.slept_seconds = 0.0
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self._queued = []
+        self._lock = threading.Lock()
+
+    def fail_next(self, count=1, status_code=RATE_LIMITED):
+        with self._lock:
+            self._queued.extend([status_code] * count)
+
+    def before_call(self, operation):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            self.slept_seconds += delay
+            if self._queued:
+                status = self._queued.pop(0)
+            else:
+                roll = self._random.random()
+                status = RATE_LIMITED if roll < self.rate_limit_rate else UNAVAILABLE if roll < self.rate_limit_rate + self.error_rate else None
+            if status is not None:
+                self.injected[status] += 1
+        # Outside the lock, so concurrent calls overlap like requests in flight
+        if delay > 0:
+            self._sleep(delay)
+        if status is not None:
+            raise FakeAPIError(status, f"{ERROR_MESSAGES.get(status, 'Fake API error')} during {operation}")
+
+    def stats(self):
+        with self._lock:
+            return {'injected': dict(self.injected), 'slept_seconds': self.slept_seconds}
+
+
+def column_index(letters):
+    """'A' -> 0, 'AB' -> 27"""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index - 1
+
+
+def parse_range(range_name):
+    """Splits "'Sheet'!A:B" into (sheet title, 'A:B'); a bare "'Sheet'" covers the whole sheet."""
+    match = re.match(r"^'((?:[^']|'')*)'(?:!(.*))?$", range_name) or re.match(r"^([^!]*)(?:!(.*))?$", range_name)
+    return match.group(1).replace("''", "'"), match.group(2)
+
+
+def parse_cell(a1_cell):
+    """'B7' -> (7, 2); either part may be missing, e.g. 'B' -> (None, 2), '7' -> (7, None)."""
+    match = re.match(r'^([A-Za-z]*)(\d*)$', a1_cell)
+    letters, digits = match.groups()
+    return (int(digits) if digits else None), (column_index(letters) + 1 if letters else None)
+
+
+def slice_values(values, a1):
+    """Supports whole columns ('A:C'), whole rows ('1:1') and cell ranges ('B7', 'A2:C5')."""
+    if not a1:
+        return [list(row) for row in values]
+    start, _, end = a1.partition(':')
+    end = end or start
+    if start.isdigit():
+        return [list(row) for row in values[int(start) - 1:int(end)]]
+    (first_row, _), (last_row, _) = parse_cell(start), parse_cell(end)
+    if first_row is not None:
+        values = values[first_row - 1:last_row]
+        start, end = start.rstrip('0123456789'), end.rstrip('0123456789')
+    first, last = column_index(start), column_index(end)
+    rows = [list(row[first:last + 1]) for row in values]
+    # Like the real API, drop trailing rows that are empty in the requested columns
+    while rows and not any(cell != '' for cell in rows[-1]):
+        rows.pop()
+    return rows
+
+
+def _trim_trailing(values):
+    values = list(values)
+    while values and values[-1] == '':
+        values.pop()
+    return values
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, values):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.values = [list(row) for row in values]
+
+    def _api(self, operation):
+        self.spreadsheet._api(operation)
+        return self.spreadsheet._lock
+
+    def get_all_values(self, **kwargs):
+        # Render options are accepted but cells come back as stored; store numbers to imitate UNFORMATTED_VALUE
+        with self._api('get_all_values'):
+            width = max((len(row) for row in self.values), default=0)
+            return [row + [''] * (width - len(row)) for row in self.values]
+
+    def row_values(self, row, **kwargs):
+        with self._api('row_values'):
+            # Like the API, trailing empty cells are trimmed
+            return _trim_trailing(self.values[row - 1] if row <= len(self.values) else [])
+
+    def col_values(self, col, **kwargs):
+        with self._api('col_values'):
+            return _trim_trailing(row[col - 1] if col <= len(row) else '' for row in self.values)
+
+    def find(self, query, in_row=None, in_column=None, case_sensitive=True):
+        """First matching Cell (row by row), or None like gspread 6. `query` may be a compiled regex."""
+        with self._api('find'):
+            for r, row in enumerate(self.values, start=1):
+                if in_row is not None and r != in_row:
+                    continue
+                for c, value in enumerate(row, start=1):
+                    if in_column is not None and c != in_column:
+                        continue
+                    if isinstance(query, re.Pattern):
+                        matched = query.search(str(value)) is not None
+                    elif case_sensitive:
+                        matched = str(value) == str(query)
+                    else:
+                        matched = str(value).lower() == str(query).lower()
+                    if matched:
+                        return Cell(r, c, value)
+            return None
+
+    def batch_get(self, ranges, **kwargs):
+        """One list of rows per A1 range on this worksheet ('A1:C5', 'B:B', ...)."""
+        with self._api('batch_get'):
+            return [slice_values(self.values, a1) for a1 in ranges]
+
+    def update_cells(self, cell_list, **kwargs):
+        with self._api('update_cells'):
+            for cell in cell_list:
+                self.spreadsheet._set(self.title, cell.row, cell.col, cell.value)
+            self.spreadsheet._persist(self.title)
+        return {'updatedCells': len(cell_list)}
+
+    def batch_update(self, data, **kwargs):
+        """Accepts single-cell A1 ranges ('B7'), which is what sheet_writes.build_batch_update produces."""
+        with self._api('batch_update'):
+            for item in data:
+                row, col = parse_cell(item['range'])
+                self.spreadsheet._set(self.title, row, col, item['values'][0][0])
+            self.spreadsheet._persist(self.title)
+        return {'totalUpdatedCells': len(data)}
+
+
+class FakeSpreadsheet:
+    """
+    sheets: {title: list of rows}. With `path`, every edit is written back to '<path>/<title>.csv'.
+    faults: optional FaultInjector applied to every call.
+    """
+
+    def __init__(self, sheets, faults=None, path=None):
+        self.calls = Counter()
+        self.faults = faults
+        self.path = path
+        # Values are shared by concurrent loads and writes; the lock also keeps file rewrites whole
+        self._lock = threading.RLock()
+        self._worksheets = {title: FakeWorksheet(self, title, values) for title, values in sheets.items()}
+
+    @classmethod
+    def from_directory(cls, path, faults=None):
+        """Opens a directory of '<worksheet name>.csv' files (cells read as strings, header in row 1)."""
+        sheets = {}
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith('.csv'):
+                with open(os.path.join(path, file_name), newline='', encoding='utf-8') as f:
+                    sheets[file_name[:-len('.csv')]] = list(csv.reader(f))
+        return cls(sheets, faults=faults, path=path)
+
+    def _api(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.faults is not None:
+            self.faults.before_call(operation)
+
+    def worksheet(self, title):
+        self._api('worksheet')
+        if title not in self._worksheets:
+            raise WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def get_worksheet(self, index):
+        self._api('get_worksheet')
+        return list(self._worksheets.values())[index]
+
+    def worksheets(self):
+        self._api('worksheets')
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        self._api('values_batch_get')
+        value_ranges = []
+        with self._lock:
+            for range_name in ranges:
+                title, a1 = parse_range(range_name)
+                if title not in self._worksheets:
+                    raise WorksheetNotFound(title)
+                values = slice_values(self._worksheets[title].values, a1)
+                value_ranges.append({'range': range_name, 'majorDimension': 'ROWS', 'values': values})
+        return {'valueRanges': value_ranges}
+
+    def values_batch_update(self, body):
+        """Single-cell ranges only ("'Sheet'!B7"), as produced by sheet_writes.build_batch_update."""
+        self._api('values_batch_update')
+        edited = set()
+        with self._lock:
+            for item in body.get('data', []):
+                title, a1 = parse_range(item['range'])
+                if title not in self._worksheets:
+                    raise WorksheetNotFound(title)
+                row, col = parse_cell(a1)
+                self._set(title, row, col, item['values'][0][0])
+                edited.add(title)
+            for title in edited:
+                self._persist(title)
+        return {'totalUpdatedCells': len(body.get('data', []))}
+
+    def set_cell(self, title, row, col, value):
+        """Edits a cell directly (1-based row/col), as if someone changed it in the Sheets UI. Not counted as a call."""
+        with self._lock:
+            self._set(title, row, col, value)
+            self._persist(title)
+
+    def _set(self, title, row, col, value):
+        values = self._worksheets[title].values
+        while len(values) < row:
+            values.append([])
+        while len(values[row - 1]) < col:
+            values[row - 1].append('')
+        values[row - 1][col - 1] = value
+
+    def _persist(self, title):
+        if self.path is not None:
+            write_csv(os.path.join(self.path, f"{title}.csv"), self._worksheets[title].values)
+
+
+def write_csv(file_path, rows):
+    # Written next to the target and swapped in, so a reader never sees half a file
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+    os.replace(tmp_path, file_path)
+
+
+def write_directory(path, sheets):
+    """Writes {title: rows} as the '<title>.csv' files FakeSpreadsheet.from_directory opens."""
+    os.makedirs(path, exist_ok=True)
+    for title, rows in sheets.items():
+        write_csv(os.path.join(path, f"{title}.csv"), rows)
+
+
+def directory_opener(path, faults=None):
+    """
+    Replacement for sheets_client.open_with_service_account: (credentials_file, sheet_name) -> (spreadsheet, None).
+    The open itself goes through `faults`, so connection retries and backoff can be exercised too.
+    """
+    def open_fake(credentials_file, sheet_name):
+        if faults is not None:
+            faults.before_call('open')
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Fake Sheets directory not found: {path}")
+        return FakeSpreadsheet.from_directory(path, faults=faults), None
+    return open_fake
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage a file-backed fake Google Sheet.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help='write a synthetic workbook (one CSV per worksheet) to a directory')
+    create.add_argument('path')
+    create.add_argument('--rows', type=int, default=1000, help='rows per worksheet')
+    create.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Only needed to create a workbook; opening one needs nothing beyond the standard library
+    import synthetic_data
+    workbook = synthetic_data.generate_workbook(args.rows, seed=args.seed)
+    write_directory(args.path, {name: synthetic_data.to_values(df) for name, df in workbook.items()})
+    print(f"Info: Wrote {len(workbook)} worksheets with {args.rows:,} rows each to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,12 @@
+import numbers
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 import re
+import banding
+import sheet_schema
 from strategic_targets import (
     REVENUE_TARGET, REVENUE_STRETCH_GOAL,
     GREEN_PROJECT_TARGET, EMPLOYEE_PULSE_TARGET, PIPELINE_COVERAGE_TARGET,
@@ -15,279 +21,338 @@ def safe_to_numeric(series, Ttype=float, remove_chars=r'[$,%()A-Za-z]'):
     if not isinstance(series, pd.Series):
         series = pd.Series(series)
     
+    # Columns typed by sheet_schema are already numeric; blanks still count as 0 like they do for strings
     if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_object_dtype(series):
-        return series.astype(Ttype)
+        return series.fillna(0).astype(Ttype)
 
     cleaned_series = series.astype(str).str.replace(remove_chars, '', regex=True).str.strip()
     cleaned_series = cleaned_series.replace('', '0') 
     return pd.to_numeric(cleaned_series, errors='coerce').fillna(0).astype(Ttype)
 
 
-def band_score(score, bands):
-    if pd.isna(score):
-        return 'N/A'
-    for band, (low, high) in bands.items():
-        if low <= score <= high:
-            return band
-    return 'N/A' 
-
-
-def score_band_distribution(scores, bands):
-    band_counts = {band: 0 for band in bands}
-    band_counts['N/A'] = 0 
-    valid_scores = 0
-    for s in scores:
-        band = band_score(s, bands)
-        if band in band_counts:
-            band_counts[band] += 1
-        if band != 'N/A':
-            valid_scores +=1
-            
-    total_valid = valid_scores
-    band_pct = {band: (count / total_valid * 100 if total_valid > 0 else 0) for band, count in band_counts.items() if band != 'N/A'}
-    return band_counts, band_pct
+# --- Shared derived columns ---
+# The indicator groups read the same cleaned columns (numeric revenue, normalized status, parsed dates, the
+# active-project mask, ...). Each is a node in DERIVED_COLUMNS, computed at most once per IndicatorInputs and
+# shared by every group that reads it, instead of every group copying and re-cleaning its own frame.
+DERIVED_COLUMNS = {}
 
-# --- Main Indicator Functions ---
+def derived(name):
+    def register(fn):
+        DERIVED_COLUMNS[name] = fn
+        return fn
+    return register
 
-def get_general_and_project_kpis(data, kpis=None):
-    if kpis is None:
-        kpis = {}
-    project_df = data.get('Project Inventory')
-    
-    project_name_col = 'Project Name' 
 
-    if project_df is not None and not project_df.empty:
-        project_df = project_df.copy()
-        
-        # Ensure critical columns exist or handle gracefully
-        if 'Revenue' in project_df.columns:
-            project_df['Revenue'] = safe_to_numeric(project_df['Revenue'])
-        else:
-            project_df['Revenue'] = 0 # Default if column missing
-            print("Warning: 'Revenue' column missing in Project Inventory.")
-
-        if 'Status (R/Y/G)' in project_df.columns:
-            project_df['Status (R/Y/G)'] = project_df['Status (R/Y/G)'].astype(str).str.strip().str.upper()
-        else:
-            project_df['Status (R/Y/G)'] = 'UNKNOWN' # Default if column missing
-            print("Warning: 'Status (R/Y/G)' column missing in Project Inventory.")
+def as_of_date(as_of=None):
+    """The day time-dependent indicators are evaluated on (midnight), today by default."""
+    return pd.Timestamp(as_of).normalize() if as_of is not None else pd.to_datetime('today').normalize()
 
-        kpis['total_projects'] = len(project_df)
-        
-        red_projects = project_df[project_df['Status (R/Y/G)'] == 'R']
-        kpis['red_projects_count'] = len(red_projects)
-        kpis['red_project_revenue'] = red_projects['Revenue'].sum()
-        
-        yellow_projects = project_df[project_df['Status (R/Y/G)'] == 'Y']
-        kpis['yellow_projects_count'] = len(yellow_projects)
-        
-        green_projects = project_df[project_df['Status (R/Y/G)'] == 'G']
-        kpis['green_projects_count'] = len(green_projects)
-        
-        total_revenue = project_df['Revenue'].sum()
-        kpis['total_revenue'] = total_revenue
-        kpis['revenue_vs_target_pct'] = (total_revenue / REVENUE_TARGET * 100) if REVENUE_TARGET else 0
-        kpis['revenue_vs_stretch_pct'] = (total_revenue / REVENUE_STRETCH_GOAL * 100) if REVENUE_STRETCH_GOAL else 0
-        
-        has_project_name_col = project_name_col in project_df.columns
-
-        if 'Project Health Score' in project_df.columns:
-            scores = safe_to_numeric(project_df['Project Health Score']).dropna()
-            kpis['avg_project_health_score'] = scores.mean() if not scores.empty else 0
-            kpis['median_project_health_score'] = scores.median() if not scores.empty else 0
-            _, band_pct = score_band_distribution(scores, PROJECT_SCORE_BANDS)
-            kpis['project_health_score_bands_pct'] = band_pct
-            if not scores.empty and has_project_name_col:
-                kpis['top_project_by_health_score'] = project_df.loc[scores.idxmax(), project_name_col]
-                kpis['bottom_project_by_health_score'] = project_df.loc[scores.idxmin(), project_name_col]
-            else:
-                kpis['top_project_by_health_score'] = "N/A"
-                kpis['bottom_project_by_health_score'] = "N/A"
-                if not has_project_name_col and not scores.empty:
-                    print(f"Warning: Column '{project_name_col}' not found in Project Inventory for top/bottom health score.")
-        else:
-            kpis.update({'avg_project_health_score': 0, 'median_project_health_score': 0, 'project_health_score_bands_pct': {}, 'top_project_by_health_score': "N/A", 'bottom_project_by_health_score': "N/A"})
-            print("Warning: 'Project Health Score' column missing in Project Inventory.")
-            
-        if 'Total Project Score' in project_df.columns:
-            total_scores = safe_to_numeric(project_df['Total Project Score']).dropna()
-            kpis['avg_total_project_score'] = total_scores.mean() if not total_scores.empty else 0
-            kpis['median_total_project_score'] = total_scores.median() if not total_scores.empty else 0
-            _, band_pct_total = score_band_distribution(total_scores, PROJECT_SCORE_BANDS)
-            kpis['total_project_score_bands_pct'] = band_pct_total
-            if not total_scores.empty and has_project_name_col:
-                kpis['top_project_by_total_score'] = project_df.loc[total_scores.idxmax(), project_name_col]
-                kpis['bottom_project_by_total_score'] = project_df.loc[total_scores.idxmin(), project_name_col]
-            else:
-                kpis['top_project_by_total_score'] = "N/A"
-                kpis['bottom_project_by_total_score'] = "N/A"
-                if not has_project_name_col and not total_scores.empty:
-                     print(f"Warning: Column '{project_name_col}' not found in Project Inventory for top/bottom total score.")
-        else:
-            kpis.update({'avg_total_project_score': 0, 'median_total_project_score': 0, 'total_project_score_bands_pct': {}, 'top_project_by_total_score': "N/A", 'bottom_project_by_total_score': "N/A"})
-            print("Warning: 'Total Project Score' column missing in Project Inventory.")
-    else: # project_df is None or empty
-        kpis.update({
-            'total_projects': 0, 'red_projects_count': 0, 'red_project_revenue': 0,
-            'yellow_projects_count': 0, 'green_projects_count': 0, 'total_revenue': 0,
-            'revenue_vs_target_pct': 0, 'revenue_vs_stretch_pct': 0,
-            'avg_project_health_score': 0, 'median_project_health_score': 0,
-            'project_health_score_bands_pct': {}, 'top_project_by_health_score': "N/A", 'bottom_project_by_health_score': "N/A",
-            'avg_total_project_score': 0, 'median_total_project_score': 0,
-            'total_project_score_bands_pct': {}, 'top_project_by_total_score': "N/A", 'bottom_project_by_total_score': "N/A"
-        })
-    return kpis
 
-def get_pipeline_and_risk_kpis(data, kpis=None):
-    if kpis is None:
-        kpis = {}
-    pipeline_df = data.get('Pipeline')
-    risk_df = data.get('Project Risks')
-
-    pipeline_account_col = 'Account' # Adjusted to 'Account'
-
-    if pipeline_df is not None and not pipeline_df.empty:
-        pipeline_df = pipeline_df.copy()
-
-        if 'Open Pipeline_Active Work' in pipeline_df.columns:
-            pipeline_df['Open Pipeline_Active Work'] = safe_to_numeric(pipeline_df['Open Pipeline_Active Work'])
-        else:
-            pipeline_df['Open Pipeline_Active Work'] = 0
-            print("Warning: 'Open Pipeline_Active Work' column missing in Pipeline.")
-        
-        if 'Percieved Annual AMO' in pipeline_df.columns:
-            pipeline_df['Percieved Annual AMO'] = safe_to_numeric(pipeline_df['Percieved Annual AMO'])
-        else:
-            pipeline_df['Percieved Annual AMO'] = 0
-            print("Warning: 'Percieved Annual AMO' column missing in Pipeline.")
-
-
-        kpis['active_pipeline_value'] = pipeline_df['Open Pipeline_Active Work'].sum()
-        kpis['total_potential_pipeline_value'] = pipeline_df['Percieved Annual AMO'].sum()
-        
-        kpis['pipeline_coverage_ratio'] = (kpis['active_pipeline_value'] / REVENUE_TARGET) if REVENUE_TARGET else 0
-        kpis['pipeline_coverage_vs_target_pct'] = (kpis['pipeline_coverage_ratio'] / PIPELINE_COVERAGE_TARGET * 100) if PIPELINE_COVERAGE_TARGET else 0
-        
-        has_pipeline_account_col = pipeline_account_col in pipeline_df.columns
-
-        if 'Pipeline Score' in pipeline_df.columns:
-            scores = safe_to_numeric(pipeline_df['Pipeline Score']).dropna()
-            kpis['avg_pipeline_score'] = scores.mean() if not scores.empty else 0
-            kpis['median_pipeline_score'] = scores.median() if not scores.empty else 0
-            _, band_pct = score_band_distribution(scores, PIPELINE_SCORE_BANDS)
-            kpis['pipeline_score_bands_pct'] = band_pct
-            if not scores.empty and has_pipeline_account_col:
-                 kpis['top_pipeline_by_score'] = pipeline_df.loc[scores.idxmax(), pipeline_account_col]
-                 kpis['bottom_pipeline_by_score'] = pipeline_df.loc[scores.idxmin(), pipeline_account_col]
-            else:
-                 kpis['top_pipeline_by_score'] = "N/A"
-                 kpis['bottom_pipeline_by_score'] = "N/A"
-                 if not has_pipeline_account_col and not scores.empty:
-                     print(f"Warning: Column '{pipeline_account_col}' not found in Pipeline data for top/bottom score calculation.")
-        else:
-            kpis.update({'avg_pipeline_score': 0, 'median_pipeline_score': 0, 'pipeline_score_bands_pct': {}, 'top_pipeline_by_score': "N/A", 'bottom_pipeline_by_score': "N/A"})
-            print("Warning: 'Pipeline Score' column missing in Pipeline.")
-
-        if 'Total Deal Score' in pipeline_df.columns:
-            total_scores = safe_to_numeric(pipeline_df['Total Deal Score']).dropna()
-            kpis['avg_total_deal_score'] = total_scores.mean() if not total_scores.empty else 0
-            kpis['median_total_deal_score'] = total_scores.median() if not total_scores.empty else 0
-            _, band_pct_total = score_band_distribution(total_scores, PIPELINE_SCORE_BANDS)
-            kpis['total_deal_score_bands_pct'] = band_pct_total
-            if not total_scores.empty and has_pipeline_account_col:
-                 kpis['top_pipeline_by_total_score'] = pipeline_df.loc[total_scores.idxmax(), pipeline_account_col]
-                 kpis['bottom_pipeline_by_total_score'] = pipeline_df.loc[total_scores.idxmin(), pipeline_account_col]
-            else:
-                 kpis['top_pipeline_by_total_score'] = "N/A"
-                 kpis['bottom_pipeline_by_total_score'] = "N/A"
-                 if not has_pipeline_account_col and not total_scores.empty: 
-                     print(f"Warning: Column '{pipeline_account_col}' not found in Pipeline data for top/bottom total score calculation.")
-        else:
-            kpis.update({'avg_total_deal_score': 0, 'median_total_deal_score': 0, 'total_deal_score_bands_pct': {}, 'top_pipeline_by_total_score': "N/A", 'bottom_pipeline_by_total_score': "N/A"})
-            print("Warning: 'Total Deal Score' column missing in Pipeline.")
-    else: # pipeline_df is None or empty
-        kpis.update({
-            'active_pipeline_value': 0, 'total_potential_pipeline_value': 0,
-            'pipeline_coverage_ratio': 0, 'pipeline_coverage_vs_target_pct': 0,
-            'avg_pipeline_score': 0, 'median_pipeline_score': 0, 'pipeline_score_bands_pct': {},
-            'top_pipeline_by_score': "N/A", 'bottom_pipeline_by_score': "N/A",
-            'avg_total_deal_score': 0, 'median_total_deal_score': 0, 'total_deal_score_bands_pct': {},
-            'top_pipeline_by_total_score': "N/A", 'bottom_pipeline_by_total_score': "N/A"
-        })
+class IndicatorInputs:
+    """
+    Lazily computed derived columns for one set of sheets; inputs['project_revenue'] computes it on first use.
+    as_of is the day indicators that count days (check-in windows, overdue projects) are evaluated on.
+    """
 
-    # Risk Metrics
-    if risk_df is not None and not risk_df.empty:
-        risk_df = risk_df.copy()
-        if 'Impact ($)' in risk_df.columns:
-            risk_df['Impact ($)'] = safe_to_numeric(risk_df['Impact ($)'])
-        else:
-            risk_df['Impact ($)'] = 0
-            print("Warning: 'Impact ($)' column missing in Project Risks.")
-        
-        if 'Severity' in risk_df.columns:
-            risk_df['Severity'] = risk_df['Severity'].astype(str).fillna('').str.lower()
-        else:
-            risk_df['Severity'] = 'unknown'
-            print("Warning: 'Severity' column missing in Project Risks.")
+    def __init__(self, data, as_of=None):
+        self.data = data
+        self.as_of = as_of_date(as_of)
+        self._values = {}
+
+    def frame(self, worksheet_name):
+        df = self.data.get(worksheet_name)
+        return df if df is not None and not df.empty else None
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            self._values[name] = DERIVED_COLUMNS[name](self)
+        return self._values[name]
+
+
+def _numeric_column(inputs, worksheet_name, col, warn=True):
+    df = inputs.frame(worksheet_name)
+    if col in df.columns:
+        return safe_to_numeric(df[col])
+    if warn:
+        print(f"Warning: '{col}' column missing in {worksheet_name}.")
+    return pd.Series(0.0, index=df.index)
+
+@derived('project_revenue')
+def _project_revenue(inputs):
+    return _numeric_column(inputs, 'Project Inventory', 'Revenue')
+
+@derived('project_status')
+def _project_status(inputs):
+    df = inputs.frame('Project Inventory')
+    if 'Status (R/Y/G)' not in df.columns:
+        print("Warning: 'Status (R/Y/G)' column missing in Project Inventory.")
+        return pd.Series('UNKNOWN', index=df.index)
+    return df['Status (R/Y/G)'].astype(str).str.strip().str.upper()
+
+@derived('project_health_scores')
+def _project_health_scores(inputs):
+    return safe_to_numeric(inputs.frame('Project Inventory')['Project Health Score']).dropna()
+
+@derived('project_total_scores')
+def _project_total_scores(inputs):
+    return safe_to_numeric(inputs.frame('Project Inventory')['Total Project Score']).dropna()
+
+@derived('project_enps')
+def _project_enps(inputs):
+    return safe_to_numeric(inputs.frame('Project Inventory')['eNPS']).dropna()
+
+@derived('project_end_date')
+def _project_end_date(inputs):
+    # Typed at load; parse_date is a no-op then
+    return sheet_schema.parse_date(inputs.frame('Project Inventory')['Project End Date'])
+
+@derived('active_project_mask')
+def _active_project_mask(inputs):
+    end_date = inputs['project_end_date']
+    return end_date.isna() | (end_date >= inputs.as_of)
+
+@derived('pipeline_open_value')
+def _pipeline_open_value(inputs):
+    return _numeric_column(inputs, 'Pipeline', 'Open Pipeline_Active Work')
+
+@derived('pipeline_amo')
+def _pipeline_amo(inputs):
+    return _numeric_column(inputs, 'Pipeline', 'Percieved Annual AMO')
+
+@derived('pipeline_scores')
+def _pipeline_scores(inputs):
+    return safe_to_numeric(inputs.frame('Pipeline')['Pipeline Score']).dropna()
+
+@derived('pipeline_total_scores')
+def _pipeline_total_scores(inputs):
+    return safe_to_numeric(inputs.frame('Pipeline')['Total Deal Score']).dropna()
+
+@derived('deal_cycle_days')
+def _deal_cycle_days(inputs):
+    # Days from creation to close for deals with both dates (negative values kept; callers filter)
+    df = inputs.frame('Pipeline')
+    won = df['Opportunity Created Date'].notna() & df['Closed Won Date'].notna()
+    return (df.loc[won, 'Closed Won Date'] - df.loc[won, 'Opportunity Created Date']).dt.days
+
+@derived('risk_impact')
+def _risk_impact(inputs):
+    return _numeric_column(inputs, 'Project Risks', 'Impact ($)')
+
+@derived('risk_severity')
+def _risk_severity(inputs):
+    df = inputs.frame('Project Risks')
+    if 'Severity' not in df.columns:
+        print("Warning: 'Severity' column missing in Project Risks.")
+        return pd.Series('unknown', index=df.index)
+    return df['Severity'].astype(str).str.lower()
+
+@derived('pulse_scores')
+def _pulse_scores(inputs):
+    return safe_to_numeric(inputs.frame('Team Utilization')['Latest Pulse Score']).dropna()
+
+@derived('utilization')
+def _utilization(inputs):
+    return safe_to_numeric(inputs.frame('Team Utilization')['Utilization (%)'])
+
+@derived('is_exec_role')
+def _is_exec_role(inputs):
+    return inputs.frame('Team Utilization')['Role'].astype(str).str.contains('Executive', case=False, na=False)
+
+@derived('strategic_cost')
+def _strategic_cost(inputs):
+    return safe_to_numeric(inputs.frame('Executive Activity')['Strategic Cost ($)'])
+
+
+def _date_values(dates):
+    return dates.to_numpy(dtype='datetime64[ns]')
+
+def _count_before(values, dates):
+    """Number of values < each date (values without NaT)."""
+    return np.searchsorted(np.sort(values), dates, side='left')
+
+def _count_at_or_before(values, dates):
+    return np.searchsorted(np.sort(values), dates, side='right')
+
+def _count_at_or_after(values, dates):
+    return len(values) - _count_before(values, dates)
+
+def _score_band_pcts(inputs, df, score_nodes, bands):
+    """{score column: band pcts} for the score columns present in df, banded together in one pass."""
+    columns = {col: inputs[node] for col, node in score_nodes.items() if df is not None and col in df.columns}
+    return {col: band_pct for col, (_, band_pct) in banding.band_distributions(columns, bands).items()}
+
+def _score_kpis(df, scores, name_col, band_pct):
+    """(avg, median, band pcts, top name, bottom name) for a score column, 0 / 'N/A' when empty."""
+    if scores.empty:
+        return 0, 0, band_pct, "N/A", "N/A"
+    if name_col not in df.columns:
+        return scores.mean(), scores.median(), band_pct, "N/A", "N/A"
+    return scores.mean(), scores.median(), band_pct, df.loc[scores.idxmax(), name_col], df.loc[scores.idxmin(), name_col]
 
+# --- Main Indicator Functions ---
+# Each indicator fills a fixed set of kpis keys from an IndicatorInputs, including the 0 / "N/A" defaults when
+# its sheet or columns are missing. Indicators with a delta function can also be updated in place from the
+# before/after values of edited rows (see recompute_indicators).
 
-        high_risks = risk_df[risk_df['Severity'] == 'high']
-        kpis['high_severity_risk_count'] = len(high_risks)
-        kpis['high_severity_risk_impact'] = high_risks['Impact ($)'].sum()
-        kpis['total_risk_impact'] = risk_df['Impact ($)'].sum()
-        kpis['high_risk_impact_as_pct_of_total'] = (kpis['high_severity_risk_impact'] / kpis['total_risk_impact'] * 100) if kpis['total_risk_impact'] else 0
-    else: # risk_df is None or empty
+def project_status_kpis(inputs, kpis):
+    project_df = inputs.frame('Project Inventory')
+    if project_df is None:
         kpis.update({
-            'high_severity_risk_count': 0, 'high_severity_risk_impact': 0,
-            'total_risk_impact': 0, 'high_risk_impact_as_pct_of_total': 0
+            'total_projects': 0, 'red_projects_count': 0, 'red_project_revenue': 0,
+            'yellow_projects_count': 0, 'green_projects_count': 0, 'total_revenue': 0,
+            'revenue_vs_target_pct': 0, 'revenue_vs_stretch_pct': 0,
         })
-    return kpis
-
-def get_satisfaction_and_efficiency_kpis(data, kpis=None):
-    if kpis is None:
-        kpis = {}
-    project_df = data.get('Project Inventory')
-    pipeline_df = data.get('Pipeline')
-    util_df = data.get('Team Utilization')
-    exec_activity_df = data.get('Executive Activity')
-    
+        return
+    kpis.update({'total_projects': len(project_df), 'red_projects_count': 0, 'red_project_revenue': 0,
+                 'yellow_projects_count': 0, 'green_projects_count': 0, 'total_revenue': 0})
+    _project_status_delta(kpis, None, inputs)
+
+def _project_status_delta(kpis, before, after):
+    for sign, inputs in ((-1, before), (1, after)):
+        if inputs is None:
+            continue
+        revenue, status = inputs['project_revenue'], inputs['project_status']
+        red_mask = status == 'R'
+        kpis['red_projects_count'] += sign * int(red_mask.sum())
+        kpis['red_project_revenue'] += sign * revenue[red_mask].sum()
+        kpis['yellow_projects_count'] += sign * int((status == 'Y').sum())
+        kpis['green_projects_count'] += sign * int((status == 'G').sum())
+        kpis['total_revenue'] += sign * revenue.sum()
+    total_revenue = kpis['total_revenue']
+    kpis['revenue_vs_target_pct'] = (total_revenue / REVENUE_TARGET * 100) if REVENUE_TARGET else 0
+    kpis['revenue_vs_stretch_pct'] = (total_revenue / REVENUE_STRETCH_GOAL * 100) if REVENUE_STRETCH_GOAL else 0
+
+def project_score_kpis(inputs, kpis):
+    project_df = inputs.frame('Project Inventory')
     project_name_col = 'Project Name'
-
-    # Customer NPS (eNPS from Project Inventory)
-    if project_df is not None and not project_df.empty and 'eNPS' in project_df.columns:
-        enps_scores = safe_to_numeric(project_df['eNPS']).dropna()
+    has_project_name_col = project_df is not None and project_name_col in project_df.columns
+    band_pcts = _score_band_pcts(inputs, project_df, {'Project Health Score': 'project_health_scores', 'Total Project Score': 'project_total_scores'}, PROJECT_SCORE_BANDS)
+
+    if project_df is not None and 'Project Health Score' in project_df.columns:
+        scores = inputs['project_health_scores']
+        (kpis['avg_project_health_score'], kpis['median_project_health_score'], kpis['project_health_score_bands_pct'],
+         kpis['top_project_by_health_score'], kpis['bottom_project_by_health_score']) = _score_kpis(project_df, scores, project_name_col, band_pcts['Project Health Score'])
+        if not has_project_name_col and not scores.empty:
+            print(f"Warning: Column '{project_name_col}' not found in Project Inventory for top/bottom health score.")
+    else:
+        kpis.update({'avg_project_health_score': 0, 'median_project_health_score': 0, 'project_health_score_bands_pct': {}, 'top_project_by_health_score': "N/A", 'bottom_project_by_health_score': "N/A"})
+        if project_df is not None: print("Warning: 'Project Health Score' column missing in Project Inventory.")
+
+    if project_df is not None and 'Total Project Score' in project_df.columns:
+        total_scores = inputs['project_total_scores']
+        (kpis['avg_total_project_score'], kpis['median_total_project_score'], kpis['total_project_score_bands_pct'],
+         kpis['top_project_by_total_score'], kpis['bottom_project_by_total_score']) = _score_kpis(project_df, total_scores, project_name_col, band_pcts['Total Project Score'])
+        if not has_project_name_col and not total_scores.empty:
+            print(f"Warning: Column '{project_name_col}' not found in Project Inventory for top/bottom total score.")
+    else:
+        kpis.update({'avg_total_project_score': 0, 'median_total_project_score': 0, 'total_project_score_bands_pct': {}, 'top_project_by_total_score': "N/A", 'bottom_project_by_total_score': "N/A"})
+        if project_df is not None: print("Warning: 'Total Project Score' column missing in Project Inventory.")
+
+def pipeline_value_kpis(inputs, kpis):
+    kpis['active_pipeline_value'] = 0
+    kpis['total_potential_pipeline_value'] = 0
+    _pipeline_value_delta(kpis, None, inputs if inputs.frame('Pipeline') is not None else None)
+
+def _pipeline_value_delta(kpis, before, after):
+    for sign, inputs in ((-1, before), (1, after)):
+        if inputs is None:
+            continue
+        kpis['active_pipeline_value'] += sign * inputs['pipeline_open_value'].sum()
+        kpis['total_potential_pipeline_value'] += sign * inputs['pipeline_amo'].sum()
+    kpis['pipeline_coverage_ratio'] = (kpis['active_pipeline_value'] / REVENUE_TARGET) if REVENUE_TARGET else 0
+    kpis['pipeline_coverage_vs_target_pct'] = (kpis['pipeline_coverage_ratio'] / PIPELINE_COVERAGE_TARGET * 100) if PIPELINE_COVERAGE_TARGET else 0
+
+def pipeline_score_kpis(inputs, kpis):
+    pipeline_df = inputs.frame('Pipeline')
+    pipeline_account_col = 'Account' # Adjusted to 'Account'
+    has_pipeline_account_col = pipeline_df is not None and pipeline_account_col in pipeline_df.columns
+    band_pcts = _score_band_pcts(inputs, pipeline_df, {'Pipeline Score': 'pipeline_scores', 'Total Deal Score': 'pipeline_total_scores'}, PIPELINE_SCORE_BANDS)
+
+    if pipeline_df is not None and 'Pipeline Score' in pipeline_df.columns:
+        scores = inputs['pipeline_scores']
+        (kpis['avg_pipeline_score'], kpis['median_pipeline_score'], kpis['pipeline_score_bands_pct'],
+         kpis['top_pipeline_by_score'], kpis['bottom_pipeline_by_score']) = _score_kpis(pipeline_df, scores, pipeline_account_col, band_pcts['Pipeline Score'])
+        if not has_pipeline_account_col and not scores.empty:
+            print(f"Warning: Column '{pipeline_account_col}' not found in Pipeline data for top/bottom score calculation.")
+    else:
+        kpis.update({'avg_pipeline_score': 0, 'median_pipeline_score': 0, 'pipeline_score_bands_pct': {}, 'top_pipeline_by_score': "N/A", 'bottom_pipeline_by_score': "N/A"})
+        if pipeline_df is not None: print("Warning: 'Pipeline Score' column missing in Pipeline.")
+
+    if pipeline_df is not None and 'Total Deal Score' in pipeline_df.columns:
+        total_scores = inputs['pipeline_total_scores']
+        (kpis['avg_total_deal_score'], kpis['median_total_deal_score'], kpis['total_deal_score_bands_pct'],
+         kpis['top_pipeline_by_total_score'], kpis['bottom_pipeline_by_total_score']) = _score_kpis(pipeline_df, total_scores, pipeline_account_col, band_pcts['Total Deal Score'])
+        if not has_pipeline_account_col and not total_scores.empty:
+            print(f"Warning: Column '{pipeline_account_col}' not found in Pipeline data for top/bottom total score calculation.")
+    else:
+        kpis.update({'avg_total_deal_score': 0, 'median_total_deal_score': 0, 'total_deal_score_bands_pct': {}, 'top_pipeline_by_total_score': "N/A", 'bottom_pipeline_by_total_score': "N/A"})
+        if pipeline_df is not None: print("Warning: 'Total Deal Score' column missing in Pipeline.")
+
+def risk_kpis(inputs, kpis):
+    kpis['high_severity_risk_count'] = 0
+    kpis['high_severity_risk_impact'] = 0
+    kpis['total_risk_impact'] = 0
+    _risk_delta(kpis, None, inputs if inputs.frame('Project Risks') is not None else None)
+
+def _risk_delta(kpis, before, after):
+    for sign, inputs in ((-1, before), (1, after)):
+        if inputs is None:
+            continue
+        impact = inputs['risk_impact']
+        high_mask = inputs['risk_severity'] == 'high'
+        kpis['high_severity_risk_count'] += sign * int(high_mask.sum())
+        kpis['high_severity_risk_impact'] += sign * impact[high_mask].sum()
+        kpis['total_risk_impact'] += sign * impact.sum()
+    kpis['high_risk_impact_as_pct_of_total'] = (kpis['high_severity_risk_impact'] / kpis['total_risk_impact'] * 100) if kpis['total_risk_impact'] else 0
+
+def customer_nps_kpis(inputs, kpis):
+    project_df = inputs.frame('Project Inventory')
+    if project_df is not None and 'eNPS' in project_df.columns:
+        enps_scores = inputs['project_enps']
         kpis['avg_customer_nps'] = enps_scores.mean() if not enps_scores.empty else 0
-        kpis['customer_nps_vs_target_pct'] = (kpis['avg_customer_nps'] / CUSTOMER_NPS_TARGET * 100) if CUSTOMER_NPS_TARGET and kpis['avg_customer_nps'] is not None and kpis['avg_customer_nps'] != 0 else 0
     else:
         kpis['avg_customer_nps'] = 0
-        kpis['customer_nps_vs_target_pct'] = 0
-        if project_df is None or project_df.empty: print("Info: Project Inventory data not available for eNPS.")
-        elif 'eNPS' not in project_df.columns: print("Warning: 'eNPS' column missing in Project Inventory for eNPS.")
-
-    # Employee Satisfaction (Pulse Score from Team Utilization)
-    if util_df is not None and not util_df.empty and 'Latest Pulse Score' in util_df.columns:
-        pulse_scores = safe_to_numeric(util_df['Latest Pulse Score']).dropna()
+        if project_df is None: print("Info: Project Inventory data not available for eNPS.")
+        else: print("Warning: 'eNPS' column missing in Project Inventory for eNPS.")
+    _customer_nps_vs_target(kpis)
+
+def _customer_nps_vs_target(kpis):
+    kpis['customer_nps_vs_target_pct'] = (kpis['avg_customer_nps'] / CUSTOMER_NPS_TARGET * 100) if CUSTOMER_NPS_TARGET and kpis['avg_customer_nps'] is not None and kpis['avg_customer_nps'] != 0 else 0
+
+def _customer_nps_delta(kpis, before, after, row_count):
+    # Blank scores count as 0 (safe_to_numeric), so the mean is over every row and the row count is unchanged
+    kpis['avg_customer_nps'] += (after['project_enps'].sum() - before['project_enps'].sum()) / row_count
+    _customer_nps_vs_target(kpis)
+
+def employee_pulse_kpis(inputs, kpis):
+    util_df = inputs.frame('Team Utilization')
+    if util_df is not None and 'Latest Pulse Score' in util_df.columns:
+        pulse_scores = inputs['pulse_scores']
         kpis['avg_employee_pulse_score'] = pulse_scores.mean() if not pulse_scores.empty else 0
-        kpis['employee_pulse_vs_target_pct'] = (kpis['avg_employee_pulse_score'] / EMPLOYEE_PULSE_TARGET * 100) if EMPLOYEE_PULSE_TARGET and kpis['avg_employee_pulse_score'] is not None and kpis['avg_employee_pulse_score'] != 0 else 0
     else:
         kpis['avg_employee_pulse_score'] = 0
-        kpis['employee_pulse_vs_target_pct'] = 0
-        if util_df is None or util_df.empty: print("Info: Team Utilization data not available for Pulse Score.")
-        elif 'Latest Pulse Score' not in util_df.columns: print("Warning: 'Latest Pulse Score' column missing in Team Utilization.")
-        
-    # Deal Cycle Time
-    if pipeline_df is not None and not pipeline_df.empty and 'Opportunity Created Date' in pipeline_df.columns and 'Closed Won Date' in pipeline_df.columns:
-        pipeline_df_copy = pipeline_df.copy()
-        pipeline_df_copy['Opportunity Created Date'] = pd.to_datetime(pipeline_df_copy['Opportunity Created Date'], errors='coerce')
-        pipeline_df_copy['Closed Won Date'] = pd.to_datetime(pipeline_df_copy['Closed Won Date'], errors='coerce')
-        won_deals = pipeline_df_copy.dropna(subset=['Opportunity Created Date', 'Closed Won Date'])
-        if not won_deals.empty:
-            won_deals['Cycle Time'] = (won_deals['Closed Won Date'] - won_deals['Opportunity Created Date']).dt.days
-            cycle_times = won_deals['Cycle Time'][won_deals['Cycle Time'] >= 0] 
+        if util_df is None: print("Info: Team Utilization data not available for Pulse Score.")
+        else: print("Warning: 'Latest Pulse Score' column missing in Team Utilization.")
+    _employee_pulse_vs_target(kpis)
+
+def _employee_pulse_vs_target(kpis):
+    kpis['employee_pulse_vs_target_pct'] = (kpis['avg_employee_pulse_score'] / EMPLOYEE_PULSE_TARGET * 100) if EMPLOYEE_PULSE_TARGET and kpis['avg_employee_pulse_score'] is not None and kpis['avg_employee_pulse_score'] != 0 else 0
+
+def _employee_pulse_delta(kpis, before, after, row_count):
+    kpis['avg_employee_pulse_score'] += (after['pulse_scores'].sum() - before['pulse_scores'].sum()) / row_count
+    _employee_pulse_vs_target(kpis)
+
+def deal_cycle_kpis(inputs, kpis):
+    pipeline_df = inputs.frame('Pipeline')
+    if pipeline_df is not None and 'Opportunity Created Date' in pipeline_df.columns and 'Closed Won Date' in pipeline_df.columns:
+        cycle_days = inputs['deal_cycle_days']
+        if not cycle_days.empty:
+            cycle_times = cycle_days[cycle_days >= 0]
             kpis['avg_deal_cycle_time_days'] = cycle_times.mean() if not cycle_times.empty else 0
             kpis['median_deal_cycle_time_days'] = cycle_times.median() if not cycle_times.empty else 0
-            if 'Pursuit Tier' in won_deals.columns:
-                kpis['deal_cycle_time_by_tier'] = won_deals.groupby('Pursuit Tier')['Cycle Time'].agg(['mean', 'median']).to_dict('index')
+            if 'Pursuit Tier' in pipeline_df.columns:
+                tiers = pipeline_df.loc[cycle_days.index, 'Pursuit Tier']
+                kpis['deal_cycle_time_by_tier'] = cycle_days.rename('Cycle Time').groupby(tiers, observed=True).agg(['mean', 'median']).to_dict('index')
             else:
                 kpis['deal_cycle_time_by_tier'] = {}
         else: # No won deals with both dates
@@ -298,192 +363,389 @@ def get_satisfaction_and_efficiency_kpis(data, kpis=None):
         kpis['avg_deal_cycle_time_days'] = 0
         kpis['median_deal_cycle_time_days'] = 0
         kpis['deal_cycle_time_by_tier'] = {}
-        if pipeline_df is None or pipeline_df.empty: print("Info: Pipeline data not available for Deal Cycle Time.")
+        if pipeline_df is None: print("Info: Pipeline data not available for Deal Cycle Time.")
         else:
             if 'Opportunity Created Date' not in pipeline_df.columns: print("Warning: 'Opportunity Created Date' missing in Pipeline.")
             if 'Closed Won Date' not in pipeline_df.columns: print("Warning: 'Closed Won Date' missing in Pipeline.")
 
+def next_deal_kpis(inputs, kpis):
     # Time Between Project End and Next Deal Discussion
+    project_df = inputs.frame('Project Inventory')
+    project_name_col = 'Project Name'
     required_cols_next_deal = [project_name_col, 'Project End Date', 'Next Opp First Discussion Date']
-    if project_df is not None and not project_df.empty and all(col in project_df.columns for col in required_cols_next_deal):
-        project_df_copy = project_df.copy()
-
-        project_df_copy['Project End Date'] = pd.to_datetime(project_df_copy['Project End Date'], errors='coerce')
-        project_df_copy['Next Opp First Discussion Date'] = pd.to_datetime(project_df_copy['Next Opp First Discussion Date'], errors='coerce')
-        
-        completed_projects_with_next_opp = project_df_copy.dropna(subset=['Project End Date', 'Next Opp First Discussion Date'])
-        if not completed_projects_with_next_opp.empty:
-            valid_end_dates_mask = completed_projects_with_next_opp['Project End Date'].notna()
-            if valid_end_dates_mask.any():
-                df_calc = completed_projects_with_next_opp[valid_end_dates_mask].copy() # Use .copy() to avoid SettingWithCopyWarning
-                df_calc['Next Deal Gap'] = (df_calc['Next Opp First Discussion Date'] - df_calc['Project End Date']).dt.days
-                next_deal_gaps = df_calc['Next Deal Gap'][df_calc['Next Deal Gap'] >=0]
-                kpis['avg_next_deal_gap_days'] = next_deal_gaps.mean() if not next_deal_gaps.empty else 0
-            else:
-                kpis['avg_next_deal_gap_days'] = 0
-        else:
-            kpis['avg_next_deal_gap_days'] = 0
-        
-        ended_projects = project_df_copy[project_df_copy['Project End Date'].notna()] 
-        if not ended_projects.empty:
-            current_date_naive = pd.to_datetime('today').normalize() 
-
-            overdue_next_deal_df = ended_projects[
-                ((current_date_naive - ended_projects['Project End Date']).dt.days > NEXT_DEAL_DISCUSSION_THRESHOLD_DAYS) & 
-                ended_projects['Next Opp First Discussion Date'].isna() & 
-                (ended_projects['Project End Date'] < current_date_naive) 
-            ]
-            kpis['overdue_next_deal_discussion_count'] = len(overdue_next_deal_df)
-            # Ensure 'Project Name' column exists for the list
-            if project_name_col in overdue_next_deal_df.columns:
-                 kpis['overdue_next_deal_projects_list'] = overdue_next_deal_df[[project_name_col, 'Project End Date']].to_dict('records')
-            else:
-                 kpis['overdue_next_deal_projects_list'] = overdue_next_deal_df[['Project End Date']].to_dict('records') # Fallback if 'Project Name' is missing
-                 print(f"Warning: '{project_name_col}' column missing for overdue_next_deal_projects_list.")
-        else:
-            kpis['overdue_next_deal_discussion_count'] = 0
-            kpis['overdue_next_deal_projects_list'] = []
+    if project_df is not None and all(col in project_df.columns for col in required_cols_next_deal):
+        current_date_naive = inputs.as_of
+        end_date = inputs['project_end_date']
+        next_opp_date = project_df['Next Opp First Discussion Date']
+
+        next_deal_gap = (next_opp_date - end_date).dt.days[end_date.notna() & next_opp_date.notna()]
+        next_deal_gaps = next_deal_gap[next_deal_gap >= 0]
+        kpis['avg_next_deal_gap_days'] = next_deal_gaps.mean() if not next_deal_gaps.empty else 0
+
+        overdue_next_deal_mask = (
+            end_date.notna() &
+            ((current_date_naive - end_date).dt.days > NEXT_DEAL_DISCUSSION_THRESHOLD_DAYS) &
+            next_opp_date.isna() &
+            (end_date < current_date_naive)
+        )
+        kpis['overdue_next_deal_discussion_count'] = int(overdue_next_deal_mask.sum())
+        kpis['overdue_next_deal_projects_list'] = project_df.loc[overdue_next_deal_mask, [project_name_col, 'Project End Date']].to_dict('records')
     else: 
         kpis['avg_next_deal_gap_days'] = 0
         kpis['overdue_next_deal_discussion_count'] = 0
         kpis['overdue_next_deal_projects_list'] = []
-        if project_df is None or project_df.empty: print("Info: Project Inventory data not available for Next Deal Gap.")
+        if project_df is None: print("Info: Project Inventory data not available for Next Deal Gap.")
         else: 
             for col in required_cols_next_deal:
                 if col not in project_df.columns: print(f"Warning: Column '{col}' missing in Project Inventory for Next Deal Gap.")
 
-
+def _next_deal_batch(inputs, dates):
+    project_df = inputs.frame('Project Inventory')
+    if project_df is None or not all(col in project_df.columns for col in ['Project Name', 'Project End Date', 'Next Opp First Discussion Date']):
+        return {'overdue_next_deal_discussion_count': np.zeros(len(dates), dtype=int)}
+    end_date = inputs['project_end_date']
+    eligible = end_date.notna() & project_df['Next Opp First Discussion Date'].isna()
+    # (as_of - end).days > threshold  <=>  as_of >= end + threshold + 1 day
+    overdue_from = _date_values(end_date[eligible]) + np.timedelta64(NEXT_DEAL_DISCUSSION_THRESHOLD_DAYS + 1, 'D')
+    return {'overdue_next_deal_discussion_count': _count_at_or_before(overdue_from, dates)}
+
+def sponsor_checkin_kpis(inputs, kpis):
     # Meaningful Sponsor Check-ins
+    project_df = inputs.frame('Project Inventory')
+    project_name_col = 'Project Name'
     required_cols_checkin = [project_name_col, 'Last Sponsor Checkin Date', 'Sponsor Checkin Notes', 'Project End Date']
-    if project_df is not None and not project_df.empty and all(col in project_df.columns for col in required_cols_checkin):
-        project_df_copy = project_df.copy()
-        project_df_copy['Last Sponsor Checkin Date'] = pd.to_datetime(project_df_copy['Last Sponsor Checkin Date'], errors='coerce')
-        project_df_copy['Project End Date'] = pd.to_datetime(project_df_copy['Project End Date'], errors='coerce')
-        current_date_naive = pd.to_datetime('today').normalize()
-        
-        active_projects_df = project_df_copy[
-            project_df_copy['Project End Date'].isna() | 
-            (project_df_copy['Project End Date'] >= current_date_naive)
-        ].copy() # Use .copy() here
-        total_active_projects = len(active_projects_df)
+    if project_df is not None and all(col in project_df.columns for col in required_cols_checkin):
+        active_mask = inputs['active_project_mask']
+        total_active_projects = int(active_mask.sum())
 
         if total_active_projects > 0:
-            active_projects_df['Sponsor Checkin Notes'] = active_projects_df['Sponsor Checkin Notes'].astype(str) # Ensure string for strip
-            recent_checkins_df = active_projects_df[
-                (active_projects_df['Last Sponsor Checkin Date'].notna()) &
-                (active_projects_df['Last Sponsor Checkin Date'] >= current_date_naive - pd.Timedelta(days=SPONSOR_CHECKIN_WINDOW_DAYS)) &
-                (active_projects_df['Sponsor Checkin Notes'].str.strip() != '')
-            ]
-            kpis['recent_meaningful_checkins_count'] = len(recent_checkins_df)
+            checkin_date = project_df['Last Sponsor Checkin Date']
+            window_start = inputs.as_of - pd.Timedelta(days=SPONSOR_CHECKIN_WINDOW_DAYS)
+            has_notes = project_df['Sponsor Checkin Notes'].astype(str).str.strip() != ''
+            recent_mask = active_mask & checkin_date.notna() & (checkin_date >= window_start) & has_notes
+            kpis['recent_meaningful_checkins_count'] = int(recent_mask.sum())
             kpis['recent_meaningful_checkins_pct'] = (kpis['recent_meaningful_checkins_count'] / total_active_projects * 100)
             
-            overdue_checkin_df = active_projects_df[
-                ((active_projects_df['Last Sponsor Checkin Date'].isna()) |
-                (active_projects_df['Last Sponsor Checkin Date'] < current_date_naive - pd.Timedelta(days=SPONSOR_CHECKIN_WINDOW_DAYS)))
-            ]
-            kpis['overdue_sponsor_checkin_count'] = len(overdue_checkin_df)
-            if project_name_col in overdue_checkin_df.columns:
-                kpis['overdue_checkin_projects_list'] = overdue_checkin_df[[project_name_col, 'Last Sponsor Checkin Date']].to_dict('records')
-            else:
-                kpis['overdue_checkin_projects_list'] = overdue_checkin_df[['Last Sponsor Checkin Date']].to_dict('records')
-                print(f"Warning: '{project_name_col}' column missing for overdue_checkin_projects_list.")
-
-        else: # No active projects
-            kpis['recent_meaningful_checkins_count'] = 0
-            kpis['recent_meaningful_checkins_pct'] = 0
-            kpis['overdue_sponsor_checkin_count'] = 0
-            kpis['overdue_checkin_projects_list'] = []
+            overdue_checkin_mask = active_mask & (checkin_date.isna() | (checkin_date < window_start))
+            kpis['overdue_sponsor_checkin_count'] = int(overdue_checkin_mask.sum())
+            kpis['overdue_checkin_projects_list'] = project_df.loc[overdue_checkin_mask, [project_name_col, 'Last Sponsor Checkin Date']].to_dict('records')
+            return
+
+    kpis['recent_meaningful_checkins_count'] = 0
+    kpis['recent_meaningful_checkins_pct'] = 0
+    kpis['overdue_sponsor_checkin_count'] = 0
+    kpis['overdue_checkin_projects_list'] = []
+    if project_df is None: print("Info: Project Inventory data not available for Sponsor Check-ins.")
     else:
-        kpis['recent_meaningful_checkins_count'] = 0
-        kpis['recent_meaningful_checkins_pct'] = 0
-        kpis['overdue_sponsor_checkin_count'] = 0
-        kpis['overdue_checkin_projects_list'] = []
-        if project_df is None or project_df.empty: print("Info: Project Inventory data not available for Sponsor Check-ins.")
-        else:
-            for col in required_cols_checkin:
-                if col not in project_df.columns: print(f"Warning: Column '{col}' missing in Project Inventory for Sponsor Check-ins.")
-
-
-    # Green Project Ratio
-    required_cols_green_ratio = [project_name_col, 'Status (R/Y/G)', 'Key Issues']
-    if project_df is not None and not project_df.empty and 'Status (R/Y/G)' in project_df.columns: # Key Issues is optional for list
-        # Status (R/Y/G) already processed in get_general_and_project_kpis
+        for col in required_cols_checkin:
+            if col not in project_df.columns: print(f"Warning: Column '{col}' missing in Project Inventory for Sponsor Check-ins.")
+
+def _sponsor_checkin_batch(inputs, dates):
+    # Each condition is an interval of as_of days per project, so counts per day are sorted-array lookups:
+    # active while as_of <= end (always without an end date), recent while as_of <= checkin + window,
+    # overdue once as_of > checkin + window (always without a check-in)
+    project_df = inputs.frame('Project Inventory')
+    zeros = np.zeros(len(dates), dtype=int)
+    if project_df is None or not all(col in project_df.columns for col in ['Project Name', 'Last Sponsor Checkin Date', 'Sponsor Checkin Notes', 'Project End Date']):
+        return {'recent_meaningful_checkins_count': zeros, 'recent_meaningful_checkins_pct': zeros.astype(float), 'overdue_sponsor_checkin_count': zeros}
+    window = np.timedelta64(SPONSOR_CHECKIN_WINDOW_DAYS, 'D')
+    end_date = inputs['project_end_date']
+    checkin_date = project_df['Last Sponsor Checkin Date']
+    has_notes = project_df['Sponsor Checkin Notes'].astype(str).str.strip() != ''
+    has_end, has_checkin = end_date.notna(), checkin_date.notna()
+    end, checkin_until = _date_values(end_date), _date_values(checkin_date) + window
+
+    active = int((~has_end).sum()) + _count_at_or_after(end[has_end.to_numpy()], dates)
+
+    recent_rows = (has_checkin & has_notes).to_numpy()
+    recent_until = np.where(has_end.to_numpy(), np.minimum(end, checkin_until), checkin_until)[recent_rows]
+    recent = _count_at_or_after(recent_until, dates)
+
+    both = (has_end & has_checkin).to_numpy()
+    bounded = both & (checkin_until < end)
+    overdue = (
+        int((~has_end & ~has_checkin).sum())
+        + _count_at_or_after(end[(has_end & ~has_checkin).to_numpy()], dates)
+        + _count_before(checkin_until[(~has_end & has_checkin).to_numpy()], dates)
+        + _count_before(checkin_until[bounded], dates) - _count_before(end[bounded], dates)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recent_pct = np.where(active > 0, recent / active * 100, 0.0)
+    return {
+        'recent_meaningful_checkins_count': np.where(active > 0, recent, 0),
+        'recent_meaningful_checkins_pct': recent_pct,
+        'overdue_sponsor_checkin_count': np.where(active > 0, overdue, 0),
+    }
+
+def green_ratio_kpis(inputs, kpis):
+    project_df = inputs.frame('Project Inventory')
+    project_name_col = 'Project Name'
+    if project_df is not None and 'Status (R/Y/G)' in project_df.columns: # Key Issues is optional for list
+        # Counts come from project_status_kpis, which reads the same normalized status
         total_projects = kpis.get('total_projects', 0) 
         green_projects_count = kpis.get('green_projects_count', 0)
         
         kpis['green_project_ratio'] = (green_projects_count / total_projects) if total_projects > 0 else 0
         kpis['green_project_ratio_vs_target_pct'] = (kpis['green_project_ratio'] / GREEN_PROJECT_TARGET * 100) if GREEN_PROJECT_TARGET else 0
         
-        non_green_df = project_df[project_df['Status (R/Y/G)'].isin(['R', 'Y'])]
+        non_green_mask = inputs['project_status'].isin(['R', 'Y'])
         
         list_cols = [project_name_col, 'Status (R/Y/G)']
-        if 'Key Issues' in non_green_df.columns:
+        if 'Key Issues' in project_df.columns:
             list_cols.append('Key Issues')
-        elif 'Key Issues' not in project_df.columns : # Check original df
+        else:
             print("Info: 'Key Issues' column missing in Project Inventory for non-green projects list.")
         
-        if project_name_col in non_green_df.columns:
-            kpis['non_green_projects_list'] = non_green_df[list_cols].to_dict('records')
-        else: # If project name is missing, this list is less useful but won't error
-            kpis['non_green_projects_list'] = non_green_df[[col for col in list_cols if col != project_name_col]].to_dict('records')
+        if project_name_col not in project_df.columns: # If project name is missing, this list is less useful but won't error
+            list_cols.remove(project_name_col)
             print(f"Warning: '{project_name_col}' column missing for non_green_projects_list.")
+        kpis['non_green_projects_list'] = project_df.loc[non_green_mask, list_cols].to_dict('records')
     else:
         kpis['green_project_ratio'] = 0
         kpis['green_project_ratio_vs_target_pct'] = 0
         kpis['non_green_projects_list'] = []
-        if project_df is None or project_df.empty: print("Info: Project Inventory data not available for Green Project Ratio.")
-        elif 'Status (R/Y/G)' not in project_df.columns: print("Warning: 'Status (R/Y/G)' column missing in Project Inventory.")
+        if project_df is None: print("Info: Project Inventory data not available for Green Project Ratio.")
+        else: print("Warning: 'Status (R/Y/G)' column missing in Project Inventory.")
 
-
-    # Team Utilization
+def utilization_kpis(inputs, kpis):
+    util_df = inputs.frame('Team Utilization')
     required_cols_util = ['Role', 'Utilization (%)']
-    if util_df is not None and not util_df.empty and all(col in util_df.columns for col in required_cols_util):
-        util_df_copy = util_df.copy()
-        util_df_copy['Utilization (%)'] = safe_to_numeric(util_df_copy['Utilization (%)'])
-        
-        # Ensure 'Role' is string for .str.contains
-        util_df_copy['Role'] = util_df_copy['Role'].astype(str)
-        exec_df = util_df_copy[util_df_copy['Role'].str.contains('Executive', case=False, na=False)]
-        delivery_df = util_df_copy[~util_df_copy['Role'].str.contains('Executive', case=False, na=False)]
+    if util_df is not None and all(col in util_df.columns for col in required_cols_util):
+        utilization = inputs['utilization']
+        is_exec = inputs['is_exec_role']
+        exec_util, delivery_util = utilization[is_exec], utilization[~is_exec]
         
-        kpis['avg_exec_utilization_pct'] = exec_df['Utilization (%)'].mean() if not exec_df.empty else 0
-        kpis['avg_delivery_utilization_pct'] = delivery_df['Utilization (%)'].mean() if not delivery_df.empty else 0
-        kpis['over_utilized_execs_count'] = len(exec_df[exec_df['Utilization (%)'] > 70]) if not exec_df.empty else 0 
-        kpis['under_utilized_delivery_count'] = len(delivery_df[delivery_df['Utilization (%)'] < 70]) if not delivery_df.empty else 0 
-        kpis['over_utilized_delivery_count'] = len(delivery_df[delivery_df['Utilization (%)'] > 100]) if not delivery_df.empty else 0 
+        kpis['avg_exec_utilization_pct'] = exec_util.mean() if not exec_util.empty else 0
+        kpis['avg_delivery_utilization_pct'] = delivery_util.mean() if not delivery_util.empty else 0
+        kpis['over_utilized_execs_count'] = int((exec_util > 70).sum())
+        kpis['under_utilized_delivery_count'] = int((delivery_util < 70).sum())
+        kpis['over_utilized_delivery_count'] = int((delivery_util > 100).sum())
     else:
         kpis['avg_exec_utilization_pct'] = 0
         kpis['avg_delivery_utilization_pct'] = 0
         kpis['over_utilized_execs_count'] = 0
         kpis['under_utilized_delivery_count'] = 0
         kpis['over_utilized_delivery_count'] = 0
-        if util_df is None or util_df.empty: print("Info: Team Utilization data not available.")
+        if util_df is None: print("Info: Team Utilization data not available.")
         else:
             for col in required_cols_util:
                 if col not in util_df.columns: print(f"Warning: Column '{col}' missing in Team Utilization.")
-        
-    # Strategic Costs
-    if exec_activity_df is not None and not exec_activity_df.empty and 'Strategic Cost ($)' in exec_activity_df.columns:
-        exec_activity_df_copy = exec_activity_df.copy()
-        exec_activity_df_copy['Strategic Cost ($)'] = safe_to_numeric(exec_activity_df_copy['Strategic Cost ($)'])
-        kpis['total_strategic_cost'] = exec_activity_df_copy['Strategic Cost ($)'].sum()
-        kpis['total_strategic_activities_count'] = len(exec_activity_df_copy)
+
+def strategic_cost_kpis(inputs, kpis):
+    exec_activity_df = inputs.frame('Executive Activity')
+    if exec_activity_df is not None and 'Strategic Cost ($)' in exec_activity_df.columns:
+        kpis['total_strategic_cost'] = inputs['strategic_cost'].sum()
+        kpis['total_strategic_activities_count'] = len(exec_activity_df)
     else:
         kpis['total_strategic_cost'] = 0
         kpis['total_strategic_activities_count'] = 0
-        if exec_activity_df is None or exec_activity_df.empty: print("Info: Executive Activity data not available.")
-        elif 'Strategic Cost ($)' not in exec_activity_df.columns : print("Warning: 'Strategic Cost ($)' column missing in Executive Activity.")
-        
+        if exec_activity_df is None: print("Info: Executive Activity data not available.")
+        else: print("Warning: 'Strategic Cost ($)' column missing in Executive Activity.")
+
+def _strategic_cost_delta(kpis, before, after):
+    kpis['total_strategic_cost'] += after['strategic_cost'].sum() - before['strategic_cost'].sum()
+
+
+class Indicator:
+    """
+    One indicator: the sheet columns it reads ({worksheet: [columns]}), indicators whose kpis it reuses (`after`),
+    and an optional delta(kpis, before, after[, row_count]) that updates its kpis from IndicatorInputs over just
+    the edited rows, before and after the edit. Indicators that depend on the as_of day also have
+    batch(inputs, dates) -> {kpi: array with one value per date} for its numeric kpis.
+    """
+
+    def __init__(self, name, compute, reads, after=(), delta=None, batch=None, delta_needs_row_count=False):
+        self.name = name
+        self.compute = compute
+        self.reads = reads
+        self.after = after
+        self.delta = delta
+        self.batch = batch
+        self.delta_needs_row_count = delta_needs_row_count
+
+    @property
+    def uses_as_of(self):
+        return self.batch is not None
+
+
+# Evaluation order matters: green_ratio reuses the counts from project_status
+INDICATORS = [
+    Indicator('project_status', project_status_kpis, {'Project Inventory': ['Status (R/Y/G)', 'Revenue']}, delta=_project_status_delta),
+    Indicator('project_scores', project_score_kpis, {'Project Inventory': ['Project Health Score', 'Total Project Score', 'Project Name']}),
+    Indicator('pipeline_value', pipeline_value_kpis, {'Pipeline': ['Open Pipeline_Active Work', 'Percieved Annual AMO']}, delta=_pipeline_value_delta),
+    Indicator('pipeline_scores', pipeline_score_kpis, {'Pipeline': ['Pipeline Score', 'Total Deal Score', 'Account']}),
+    Indicator('risks', risk_kpis, {'Project Risks': ['Impact ($)', 'Severity']}, delta=_risk_delta),
+    Indicator('customer_nps', customer_nps_kpis, {'Project Inventory': ['eNPS']}, delta=_customer_nps_delta, delta_needs_row_count=True),
+    Indicator('employee_pulse', employee_pulse_kpis, {'Team Utilization': ['Latest Pulse Score']}, delta=_employee_pulse_delta, delta_needs_row_count=True),
+    Indicator('deal_cycle', deal_cycle_kpis, {'Pipeline': ['Opportunity Created Date', 'Closed Won Date', 'Pursuit Tier']}),
+    Indicator('next_deal_gap', next_deal_kpis, {'Project Inventory': ['Project Name', 'Project End Date', 'Next Opp First Discussion Date']}, batch=_next_deal_batch),
+    Indicator('sponsor_checkins', sponsor_checkin_kpis, {'Project Inventory': ['Project Name', 'Last Sponsor Checkin Date', 'Sponsor Checkin Notes', 'Project End Date']}, batch=_sponsor_checkin_batch),
+    Indicator('green_ratio', green_ratio_kpis, {'Project Inventory': ['Status (R/Y/G)', 'Project Name', 'Key Issues']}, after=('project_status',)),
+    Indicator('utilization', utilization_kpis, {'Team Utilization': ['Role', 'Utilization (%)']}),
+    Indicator('strategic_cost', strategic_cost_kpis, {'Executive Activity': ['Strategic Cost ($)']}, delta=_strategic_cost_delta),
+]
+INDICATORS_BY_NAME = {indicator.name: indicator for indicator in INDICATORS}
+
+def _columns_by_sheet(indicator_list):
+    columns = {}
+    for indicator in indicator_list:
+        for sheet, sheet_columns in indicator.reads.items():
+            columns.setdefault(sheet, set()).update(sheet_columns)
+    return columns
+
+# Every column some indicator reads, per sheet; edits to other columns never touch the kpis
+INDICATOR_COLUMNS = _columns_by_sheet(INDICATORS)
+
+
+def _run_indicators(names, data, kpis=None, inputs=None, as_of=None):
+    if kpis is None:
+        kpis = {}
+    inputs = inputs or IndicatorInputs(data, as_of=as_of)
+    for name in names:
+        INDICATORS_BY_NAME[name].compute(inputs, kpis)
     return kpis
 
+def get_general_and_project_kpis(data, kpis=None, inputs=None):
+    return _run_indicators(('project_status', 'project_scores'), data, kpis, inputs)
+
+def get_pipeline_and_risk_kpis(data, kpis=None, inputs=None):
+    return _run_indicators(('pipeline_value', 'pipeline_scores', 'risks'), data, kpis, inputs)
+
+def get_satisfaction_and_efficiency_kpis(data, kpis=None, inputs=None):
+    return _run_indicators((
+        'customer_nps', 'employee_pulse', 'deal_cycle', 'next_deal_gap', 'sponsor_checkins',
+        'green_ratio', 'utilization', 'strategic_cost',
+    ), data, kpis, inputs)
+
+
+# Results for the last few (snapshot hash, as_of day) pairs, since some indicators count days from as_of
+INDICATOR_MEMO_SIZE = 4
+_indicator_memo = OrderedDict()
+_indicator_memo_lock = threading.Lock()
+
+def get_all_indicators(data, snapshot_hash=None, as_of=None):
+    as_of = as_of_date(as_of)
+    memo_key = (snapshot_hash, as_of) if snapshot_hash else None
+    if memo_key is not None:
+        with _indicator_memo_lock:
+            if memo_key in _indicator_memo:
+                _indicator_memo.move_to_end(memo_key)
+                return dict(_indicator_memo[memo_key])
+    # No-op for snapshots (already typed at load); lets callers pass raw string frames too
+    data = sheet_schema.type_sheets(data)
+    kpis = _run_indicators([indicator.name for indicator in INDICATORS], data, as_of=as_of)
+    if memo_key is not None:
+        with _indicator_memo_lock:
+            _indicator_memo[memo_key] = dict(kpis)
+            while len(_indicator_memo) > INDICATOR_MEMO_SIZE:
+                _indicator_memo.popitem(last=False)
+    return kpis
 
-def get_all_indicators(data):
-    kpis = {}
-    kpis = get_general_and_project_kpis(data, kpis)
-    kpis = get_pipeline_and_risk_kpis(data, kpis)
-    kpis = get_satisfaction_and_efficiency_kpis(data, kpis)
+def get_indicators_over_dates(data, dates):
+    """
+    Numeric kpis as they would be on each of `dates` (e.g. every day of a fiscal year), as a DataFrame with one
+    row per date. Everything is computed once; indicators that depend on the as_of day are evaluated for all dates
+    in one vectorized pass over their date columns instead of once per date.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+    data = sheet_schema.type_sheets(data)
+    inputs = IndicatorInputs(data, as_of=dates[0] if len(dates) else None)
+    kpis = _run_indicators([indicator.name for indicator in INDICATORS], data, inputs=inputs)
+    frame = pd.DataFrame({
+        name: value for name, value in kpis.items() if isinstance(value, numbers.Real) and not isinstance(value, bool)
+    }, index=dates)
+    date_values = dates.to_numpy(dtype='datetime64[ns]')
+    for indicator in INDICATORS:
+        if indicator.uses_as_of:
+            for name, values in indicator.batch(inputs, date_values).items():
+                frame[name] = values
+    return frame
+
+
+# Stands in for blanks before comparing, so NaN/None/pd.NA (which never compare equal) match each other
+_MISSING = object()
+
+def _column_changes(old, new):
+    """Boolean Series of rows whose value differs (blank == blank); dtypes may differ, e.g. a re-typed category."""
+    if old.equals(new):
+        return pd.Series(False, index=new.index)
+    old_values = old.astype(object).where(old.notna(), _MISSING)
+    new_values = new.astype(object).where(new.notna(), _MISSING)
+    return ~old_values.eq(new_values)
+
+def changed_cells(old_df, new_df, columns=None):
+    """
+    (changed row labels, changed columns) between two versions of a sheet, looking only at `columns` if given,
+    or None when rows or columns were added, removed or reordered, in which case everything reading the sheet
+    has to be recomputed.
+    """
+    if old_df is None or new_df is None or not old_df.index.equals(new_df.index) or not old_df.columns.equals(new_df.columns):
+        return None
+    if old_df is new_df:
+        return pd.Index([]), set()
+    changed_rows = pd.Series(False, index=new_df.index)
+    changed_columns = set()
+    for col in new_df.columns if columns is None else [col for col in columns if col in new_df.columns]:
+        col_changes = _column_changes(old_df[col], new_df[col])
+        if col_changes.any():
+            changed_columns.add(col)
+            changed_rows |= col_changes
+    return new_df.index[changed_rows.to_numpy()], changed_columns
+
+def recompute_indicators(data, kpis, changed_sheets, previous_data=None, kpis_date=None, as_of=None):
+    """
+    Updates kpis after `changed_sheets` changed. With previous_data (the frames kpis were computed from) only
+    indicators reading a changed column are touched, and sums, counts and means are adjusted from the edited
+    rows' before/after values instead of rescanning the sheet. kpis_date is the as_of day kpis were computed for;
+    indicators that count days from as_of (today by default) are refreshed when it differs.
+    """
+    data = sheet_schema.type_sheets(data)
+    inputs = IndicatorInputs(data, as_of=as_of)
+    kpis = dict(kpis)
+    changes = {
+        name: changed_cells(previous_data.get(name), data.get(name), INDICATOR_COLUMNS.get(name, ()))
+        if previous_data is not None else None
+        for name in set(changed_sheets)
+    }
+    day_changed = kpis_date is not None and kpis_date != inputs.as_of.date()
+    recomputed = set()
+    for indicator in INDICATORS:
+        sheet_changes = {name: changes[name] for name in indicator.reads if name in changes}
+        touched = {
+            name: change for name, change in sheet_changes.items()
+            if change is None or change[1] & set(indicator.reads[name])
+        }
+        if not touched and not (indicator.uses_as_of and day_changed) and not recomputed & set(indicator.after):
+            continue
+        recomputed.add(indicator.name)
+        if indicator.delta is not None and _apply_delta(indicator, kpis, previous_data, data, touched):
+            continue
+        indicator.compute(inputs, kpis)
     return kpis
 
+def _apply_delta(indicator, kpis, previous_data, data, touched):
+    """True if the indicator's kpis were updated from row deltas; False means it needs a full recompute."""
+    if len(touched) != 1:
+        return False
+    (name, change), = touched.items()
+    old_df, new_df = (previous_data or {}).get(name), data.get(name)
+    if change is None or old_df is None or old_df.empty or new_df is None or new_df.empty:
+        return False
+    if any(col not in new_df.columns for col in indicator.reads[name]):
+        return False
+    rows = change[0]
+    before = IndicatorInputs({name: old_df.loc[rows]})
+    after = IndicatorInputs({name: new_df.loc[rows]})
+    try:
+        if indicator.delta_needs_row_count:
+            indicator.delta(kpis, before, after, len(new_df))
+        else:
+            indicator.delta(kpis, before, after)
+    except KeyError:
+        # kpis from before this indicator existed; the full compute overwrites every key it fills
+        return False
+    return True
+
 def get_top3_action_items(data, openai_client, data_context_string):
     if not openai_client:
         return "OpenAI client not configured. Cannot generate action items."
@@ -519,12 +781,13 @@ Return your answer as a markdown numbered list. Example:
     except Exception as e:
         return f"Error generating AI action items: {str(e)}"
 
-def get_upcoming_key_dates(data, days_ahead=7):
+def get_upcoming_key_dates(data, days_ahead=7, as_of=None):
     """
-    Scans project and pipeline data for key dates occurring within the specified number of days.
+    Scans project and pipeline data for key dates occurring within the specified number of days after as_of (today).
     """
+    data = sheet_schema.type_sheets(data)
     upcoming_events = []
-    today = datetime.now().date()
+    today = as_of_date(as_of).date()
     future_date_limit = today + timedelta(days=days_ahead)
 
     # Check Project Inventory for Project End Dates
@@ -532,7 +795,7 @@ def get_upcoming_key_dates(data, days_ahead=7):
     if project_df is not None and not project_df.empty:
         if 'Project Name' in project_df.columns and 'Project End Date' in project_df.columns:
             project_df_copy = project_df.copy()
-            project_df_copy['Project End Date'] = pd.to_datetime(project_df_copy['Project End Date'], errors='coerce').dt.date
+            project_df_copy['Project End Date'] = project_df_copy['Project End Date'].dt.date
             upcoming_ends = project_df_copy[
                 (project_df_copy['Project End Date'] >= today) &
                 (project_df_copy['Project End Date'] <= future_date_limit)
@@ -550,7 +813,7 @@ def get_upcoming_key_dates(data, days_ahead=7):
         pipeline_df_copy = pipeline_df.copy()
         # Closed Won Date
         if 'Account' in pipeline_df_copy.columns and 'Closed Won Date' in pipeline_df_copy.columns:
-            pipeline_df_copy['Closed Won Date'] = pd.to_datetime(pipeline_df_copy['Closed Won Date'], errors='coerce').dt.date
+            pipeline_df_copy['Closed Won Date'] = pipeline_df_copy['Closed Won Date'].dt.date
             upcoming_closes = pipeline_df_copy[
                 (pipeline_df_copy['Closed Won Date'] >= today) &
                 (pipeline_df_copy['Closed Won Date'] <= future_date_limit)
@@ -563,7 +826,7 @@ def get_upcoming_key_dates(data, days_ahead=7):
 
         # Next Touchpoint Date
         if 'Account' in pipeline_df_copy.columns and 'Next Touchpoint Date' in pipeline_df_copy.columns:
-            pipeline_df_copy['Next Touchpoint Date'] = pd.to_datetime(pipeline_df_copy['Next Touchpoint Date'], errors='coerce').dt.date
+            pipeline_df_copy['Next Touchpoint Date'] = pipeline_df_copy['Next Touchpoint Date'].dt.date
             upcoming_touchpoints = pipeline_df_copy[
                 (pipeline_df_copy['Next Touchpoint Date'] >= today) &
                 (pipeline_df_copy['Next Touchpoint Date'] <= future_date_limit)
@@ -0,0 +1,142 @@
+"""
+Local time series of the dashboard's KPIs, so cards can show a trend instead of only the current value.
+
+Every published snapshot's numeric indicators are appended to a SQLite file, keyed by the snapshot's timestamp
+(meta 'saved_at') and content hash. A snapshot whose hash and values match the latest recorded one (a refresh that
+found nothing new) is skipped. Values are stored one row per (metric, timestamp) in a WITHOUT ROWID table ordered
+by that key, so a range query for a handful of metrics reads contiguous index pages, and downsampling for
+sparklines (one averaged point per time bucket) happens inside SQLite.
+"""
+import math
+import numbers
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kpi_values (
+    metric TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    snapshot_id INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric, recorded_at, snapshot_id)
+) WITHOUT ROWID;
+"""
+# Dict-valued indicators (e.g. band percentages) are stored as '<indicator>.<key>'
+NESTED_SEPARATOR = '.'
+
+
+def flatten_kpis(kpis):
+    """{metric: float} for every finite numeric indicator, one level of dicts flattened."""
+    values = {}
+    for name, value in kpis.items():
+        if isinstance(value, dict):
+            for key, nested in value.items():
+                values[f"{name}{NESTED_SEPARATOR}{key}"] = nested
+        else:
+            values[name] = value
+    return {
+        name: float(value) for name, value in values.items()
+        if isinstance(value, numbers.Real) and not isinstance(value, bool) and math.isfinite(value)
+    }
+
+
+def _timestamp(when):
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    return when.timestamp()
+
+
+class KpiHistory:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        # One connection for the process (writes come from refresh threads, reads from sessions); caller holds the lock
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def record(self, kpis, snapshot_hash, recorded_at=None):
+        """Appends one snapshot's indicators; returns False if it duplicates the latest recorded snapshot."""
+        values = flatten_kpis(kpis)
+        timestamp = _timestamp(recorded_at or datetime.now())
+        with self._lock:
+            conn = self._connect()
+            latest = conn.execute("SELECT id, recorded_at, hash FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            if latest and latest[2] == (snapshot_hash or ''):
+                latest_values = dict(conn.execute(
+                    "SELECT metric, value FROM kpi_values WHERE recorded_at = ? AND snapshot_id = ?", (latest[1], latest[0])
+                ))
+                if latest_values == values:
+                    return False
+            with conn:
+                snapshot_id = conn.execute("INSERT INTO snapshots (recorded_at, hash) VALUES (?, ?)", (timestamp, snapshot_hash or '')).lastrowid
+                conn.executemany(
+                    "INSERT INTO kpi_values (metric, recorded_at, snapshot_id, value) VALUES (?, ?, ?, ?)",
+                    ((metric, timestamp, snapshot_id, value) for metric, value in values.items())
+                )
+        return True
+
+    def query(self, metrics, start=None, end=None, points=None):
+        """
+        Values of `metrics` between start and end (datetimes, inclusive) as a DataFrame indexed by timestamp with
+        one column per metric. With `points`, the range is split into that many equal time buckets and each
+        metric is averaged per bucket (indexed by the bucket's latest timestamp), which is what sparklines need.
+        """
+        metrics = list(metrics)
+        if not metrics:
+            return pd.DataFrame()
+        low = _timestamp(start) if start else float('-inf')
+        high = _timestamp(end) if end else float('inf')
+        placeholders = ', '.join('?' * len(metrics))
+        where = f"metric IN ({placeholders}) AND recorded_at BETWEEN ? AND ?"
+        with self._lock:
+            conn = self._connect()
+            if points:
+                bounds = conn.execute(f"SELECT MIN(recorded_at), MAX(recorded_at) FROM kpi_values WHERE {where}", (*metrics, low, high)).fetchone()
+                if bounds[0] is None:
+                    return pd.DataFrame(columns=metrics)
+                width = max((bounds[1] - bounds[0]) / points, 1e-9)
+                rows = conn.execute(
+                    f"SELECT metric, MIN(CAST((recorded_at - ?) / ? AS INTEGER), ?) AS bucket, MAX(recorded_at), AVG(value)"
+                    f" FROM kpi_values WHERE {where} GROUP BY metric, bucket",
+                    (bounds[0], width, points - 1, *metrics, low, high)
+                ).fetchall()
+                rows = [(metric, at, value) for metric, _, at, value in rows]
+            else:
+                rows = conn.execute(
+                    f"SELECT metric, recorded_at, value FROM kpi_values WHERE {where} ORDER BY recorded_at, snapshot_id", (*metrics, low, high)
+                ).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=metrics)
+        frame = pd.DataFrame(rows, columns=['metric', 'recorded_at', 'value'])
+        frame = frame.pivot_table(index='recorded_at', columns='metric', values='value', aggfunc='last')
+        # Local wall-clock time, matching the 'saved_at' the values were recorded under
+        frame.index = pd.DatetimeIndex([datetime.fromtimestamp(at) for at in frame.index], name='recorded_at')
+        return frame.reindex(columns=metrics).sort_index()
+
+    def trends(self, metrics, start=None, points=None):
+        """{metric: [values oldest to newest]} for sparklines; metrics without history get an empty list."""
+        frame = self.query(metrics, start=start, points=points)
+        return {metric: frame[metric].dropna().tolist() if metric in frame else [] for metric in metrics}
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            count, first, last = conn.execute("SELECT COUNT(*), MIN(recorded_at), MAX(recorded_at) FROM snapshots").fetchone()
+        return {
+            'snapshots': count,
+            'first': datetime.fromtimestamp(first).isoformat(timespec='seconds') if first else None,
+            'last': datetime.fromtimestamp(last).isoformat(timespec='seconds') if last else None,
+        }
@@ -0,0 +1,87 @@
+"""
+Per-stage timings (Sheets fetch, parsing, indicators, AI data context, OpenAI calls, page renders).
+
+Stages are timed with `perf.timer(stage, snapshot=..., page=...)` around the work. Every timing is kept in a
+rolling window per (stage, page) for the sidebar performance panel (last run, p50, p95) and written as one
+structured log line, 'Perf: {json}', that log collectors can pick up from stdout. Recording is a perf_counter
+call and a deque append, so the hooks stay in place in production.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_WINDOW = 200
+LOG_PREFIX = 'Perf:'
+# Content hashes are long; the first characters are enough to tell snapshots apart in logs and the panel
+SNAPSHOT_KEY_LENGTH = 8
+
+
+class StageTimings:
+    def __init__(self, window=DEFAULT_WINDOW, log=True):
+        self.window = window
+        self.log = log
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._last = {}
+
+    def record(self, stage, seconds, snapshot=None, page=None, **fields):
+        entry = {
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'page': page,
+            'snapshot': str(snapshot)[:SNAPSHOT_KEY_LENGTH] if snapshot else None,
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            **fields,
+        }
+        key = (stage, page)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._last[key] = entry
+        if self.log:
+            print(f"{LOG_PREFIX} {json.dumps(entry, default=str)}")
+        return entry
+
+    @contextmanager
+    def timer(self, stage, snapshot=None, page=None, **fields):
+        """Times the block; a block that raises is still recorded, with the exception type in 'error'."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            fields['error'] = type(e).__name__
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, snapshot=snapshot, page=page, **fields)
+
+    def summary(self):
+        """One row per (stage, page): runs in the window, last run, p50 and p95 (seconds), last snapshot."""
+        with self._lock:
+            items = [(key, np.array(samples), self._last[key]) for key, samples in self._samples.items()]
+        rows = []
+        for (stage, page), samples, last in items:
+            p50, p95 = np.percentile(samples, [50, 95])
+            rows.append({
+                'stage': stage, 'page': page, 'runs': len(samples), 'last': last['seconds'],
+                'p50': float(p50), 'p95': float(p95), 'snapshot': last['snapshot'], 'at': last['at'],
+            })
+        return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._last.clear()
+
+
+# Process-wide: background refreshes and every session record into the same window
+TIMINGS = StageTimings()
+timer = TIMINGS.timer
+record = TIMINGS.record
+summary = TIMINGS.summary
@@ -0,0 +1,151 @@
+"""
+Recomputes the Sheet's scorecard formulas in Python from the loaded MappingTable.
+
+In the Sheet, every scorecard answer is scored with INDEX(FILTER(MappingTable!D:D, MappingTable!A:A=<tab>,
+MappingTable!C:C=<answer>), 1), defaulting to 0, and the health score is the sum over the scorecard columns
+(see schema.md). Here MappingTable becomes one lookup array per tab, and each column is scored by mapping its
+categories once and indexing with the category codes, so every row is scored in one vectorized pass.
+"""
+import numpy as np
+import pandas as pd
+
+import banding
+import sheet_schema
+from strategic_targets import PIPELINE_SCORE_BANDS, PROJECT_SCORE_BANDS
+
+# Total = health * 0.7 + efficiency * 0.3 (Total Project Score / Total Deal Score formulas)
+HEALTH_WEIGHT = 0.7
+EFFICIENCY_WEIGHT = 0.3
+# Computed and sheet scores further apart than this are reported as mismatches
+SCORE_TOLERANCE = 0.01
+# Efficiency answers are looked up as "<effort>|<tier>", e.g. "Low|High"
+PAIR_SEPARATOR = '|'
+
+SCORECARDS = {
+    'Project Inventory': {
+        'identifier': 'Project Name',
+        'health_col': 'Project Health Score',
+        'scorecard_cols': [
+            'Timeline Health', 'Budget and Scope', 'Client Relationship Strength', 'Feedback Recency',
+            'Business Outcome Defined', 'Team Resourcing', 'Strategic Value to Client', 'Issue Resolution Hygiene',
+            'Expansion Discussion', 'Exec Engagement',
+        ],
+        'efficiency_col': 'Delivery Efficiency Score',
+        'efficiency_pair': ('Delivery Relational Effort', 'Expansion Yield Tier'),
+        'total_col': 'Total Project Score',
+        'bands': PROJECT_SCORE_BANDS,
+    },
+    'Pipeline': {
+        'identifier': 'Account',
+        'health_col': 'Pipeline Score',
+        'scorecard_cols': [
+            'Roadmap Alignment', 'Sponsor Type', 'Business Case_ROI', 'HCLS Expertise needed', 'Executor Pool Size',
+            'Snowflake Investment Level', 'IBM Growth in Account', 'Snowflake Growth in Account',
+        ],
+        'efficiency_col': 'Relational Efficiency Score',
+        'efficiency_pair': ('Pre-Sales Effort Level', 'Revenue Potential Tier'),
+        'total_col': 'Total Deal Score',
+        'bands': PIPELINE_SCORE_BANDS,
+    },
+}
+
+
+def _lookup_key(values):
+    # Sheets compares strings case-insensitively in FILTER(... = ...)
+    return values.astype('string').str.strip().str.casefold()
+
+
+def build_lookups(mapping_df):
+    """{tab: {answer (casefolded): score}} from MappingTable; the first row for an answer wins, like INDEX(..., 1)."""
+    if mapping_df is None or mapping_df.empty or not {'Tab', 'Value', 'Score'} <= set(mapping_df.columns):
+        return {}
+    mapping = pd.DataFrame({
+        'tab': mapping_df['Tab'].astype('string').str.strip(),
+        'value': _lookup_key(mapping_df['Value']),
+        'score': sheet_schema.parse_numeric(mapping_df['Score']).fillna(0),
+    }).dropna(subset=['tab', 'value']).drop_duplicates(subset=['tab', 'value'], keep='first')
+    return {tab: dict(zip(rows['value'], rows['score'])) for tab, rows in mapping.groupby('tab', sort=False)}
+
+
+def _category_codes(series):
+    categorical = sheet_schema.parse_category(series)
+    return categorical.cat.codes.to_numpy(), pd.Series(categorical.cat.categories, dtype=object)
+
+
+def _score_table(answers, lookup):
+    # One score per distinct answer plus a trailing 0 that blank answers (code -1) pick up
+    return np.append(_lookup_key(answers).map(lambda value: lookup.get(value, 0.0)).to_numpy(dtype=float), 0.0)
+
+
+def lookup_scores(series, lookup):
+    """Score for every row of a column: the lookup runs once per distinct answer, rows just index into it."""
+    codes, categories = _category_codes(series)
+    return pd.Series(_score_table(categories, lookup)[codes], index=series.index)
+
+
+def pair_scores(first, second, lookup):
+    """Scores for "<first>|<second>" answers, via a (first answers x second answers) table indexed by both codes."""
+    first_codes, first_categories = _category_codes(first)
+    second_codes, second_categories = _category_codes(second)
+    pairs = pd.Series([
+        f"{a}{PAIR_SEPARATOR}{b}" for a in first_categories for b in second_categories
+    ], dtype=object)
+    table = np.zeros((len(first_categories) + 1, len(second_categories) + 1))
+    if len(pairs):
+        table[:-1, :-1] = _score_table(pairs, lookup)[:-1].reshape(len(first_categories), len(second_categories))
+    return pd.Series(table[first_codes, second_codes], index=first.index)
+
+
+def score_sheet(worksheet_name, df, lookups):
+    """
+    Computed scores for every row of a scorecard sheet, next to the sheet's own values:
+    identifier, '<score col>' (computed), '<score col> (sheet)', 'Band', 'Mismatch' (comma-separated score columns
+    that differ by more than SCORE_TOLERANCE). Returns None for sheets without a scorecard or without a lookup.
+    """
+    card = SCORECARDS.get(worksheet_name)
+    lookup = lookups.get(worksheet_name)
+    if card is None or not lookup or df is None or df.empty:
+        return None
+    zeros = pd.Series(0.0, index=df.index)
+    health = sum((lookup_scores(df[col], lookup) for col in card['scorecard_cols'] if col in df.columns), zeros)
+    first, second = card['efficiency_pair']
+    efficiency = pair_scores(df[first], df[second], lookup) if first in df.columns and second in df.columns else zeros
+    computed = {
+        card['health_col']: health,
+        card['efficiency_col']: efficiency,
+        card['total_col']: health * HEALTH_WEIGHT + efficiency * EFFICIENCY_WEIGHT,
+    }
+
+    result = pd.DataFrame(index=df.index)
+    if card['identifier'] in df.columns:
+        result[card['identifier']] = df[card['identifier']]
+    mismatched = pd.Series('', index=df.index, dtype=object)
+    for col, values in computed.items():
+        result[col] = values
+        if col not in df.columns:
+            continue
+        sheet_values = sheet_schema.parse_numeric(df[col])
+        result[f"{col} (sheet)"] = sheet_values
+        differs = (sheet_values - values).abs() > SCORE_TOLERANCE
+        # A blank sheet score only counts as a mismatch if the scorecard says it should be non-zero
+        differs |= sheet_values.isna() & (values != 0)
+        mismatched[differs] += np.where(mismatched[differs] == '', col, ', ' + col)
+    result['Band'] = banding.band_labels(health, card['bands'])
+    result['Mismatch'] = mismatched
+    return result
+
+
+def score_all(data):
+    """{worksheet name: score_sheet result} for every scorecard sheet in a snapshot that can be scored."""
+    lookups = build_lookups(data.get('MappingTable'))
+    results = {name: score_sheet(name, data.get(name), lookups) for name in SCORECARDS}
+    return {name: result for name, result in results.items() if result is not None}
+
+
+def mismatch_summary(result):
+    """{score column: number of rows where the computed score differs from the sheet}."""
+    counts = {}
+    for mismatch in result['Mismatch']:
+        for col in filter(None, mismatch.split(', ')):
+            counts[col] = counts.get(col, 0) + 1
+    return counts
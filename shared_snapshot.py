@@ -0,0 +1,158 @@
+"""
+Process-wide, versioned data snapshots shared by every browser session.
+
+Each published snapshot bundles the worksheet DataFrames with everything derived from them
+(indicators and the AI data context string), so sessions only hold a lease on a version instead of
+their own copy. A version is dropped once it is no longer current and the last lease on it is released.
+Snapshots are shared: treat snapshot.data DataFrames as read-only and copy before modifying.
+"""
+import threading
+import weakref
+from datetime import datetime
+from types import MappingProxyType
+
+import indicators
+import perf
+
+KEY_SHEETS_MAX_ROWS = {'Project Inventory': 50, 'Pipeline': 50, 'Project Risks': 30}
+DEFAULT_CONTEXT_MAX_ROWS = 15
+
+
+def build_data_context_string(all_data):
+    data_context_parts = []
+    for name, df_sheet in all_data.items():
+        if not df_sheet.empty:
+            current_max_rows = KEY_SHEETS_MAX_ROWS.get(name, DEFAULT_CONTEXT_MAX_ROWS)
+            col_info = f"Sheet: {name}\nColumns: {', '.join(df_sheet.columns)}\n"
+            if len(df_sheet) <= current_max_rows:
+                data_context_parts.append(col_info + df_sheet.to_string(index=False) + "\n")
+            else:
+                data_context_parts.append(col_info + df_sheet.head(current_max_rows).to_string(index=False) + f"\n... (showing top {current_max_rows} of {len(df_sheet)} rows)\n")
+    return "\n".join(data_context_parts)
+
+
+class DataSnapshot:
+    __slots__ = ('version', 'data', 'indicators', 'kpis_as_of', 'data_context_string', 'meta', 'published_at', '_derived')
+
+    def __init__(self, version, data, kpis, data_context_string, meta, kpis_as_of=None):
+        self.version = version
+        self.data = MappingProxyType(dict(data))
+        self.indicators = MappingProxyType(dict(kpis))
+        # The day the as_of-dependent indicators were evaluated on, which can be older than published_at
+        self.kpis_as_of = kpis_as_of
+        self.data_context_string = data_context_string
+        self.meta = MappingProxyType(dict(meta or {}))
+        self.published_at = datetime.now()
+        self._derived = {}
+
+    def derive(self, key, build_fn):
+        """Builds a value from this snapshot once (e.g. a lookup index) and reuses it for every session."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            return self._derived.setdefault(key, build_fn())
+
+
+EMPTY_SNAPSHOT = DataSnapshot(0, {}, {}, "No data context available.", {})
+
+
+class SnapshotLease:
+    """A session's hold on one snapshot version; released explicitly or when the session is garbage collected."""
+
+    def __init__(self, registry, snapshot):
+        self.snapshot = snapshot
+        self._finalizer = weakref.finalize(self, registry._release, snapshot.version)
+
+    def release(self):
+        self._finalizer()
+
+
+class SnapshotRegistry:
+    def __init__(self, history=None):
+        # Optional kpi_history.KpiHistory; every published version's indicators are appended to it
+        self.history = history
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._refcounts = {}
+        self._current_version = None
+        self._next_version = 1
+
+    def current(self):
+        with self._lock:
+            return self._snapshots.get(self._current_version)
+
+    def publish(self, data, meta, kpis=None, as_of=None):
+        """
+        Builds indicators and the AI context for `data` (unless kpis are supplied) and makes it the current version.
+        as_of is the day indicators are evaluated on (today by default); supplied kpis must be computed for it.
+        If the content hash matches the current snapshot the derived values are reused and only the meta changes,
+        apart from indicators that depend on the as_of day, which are recomputed once the day has moved on.
+        """
+        current = self.current()
+        snapshot_hash = (meta or {}).get('hash')
+        kpis_as_of = indicators.as_of_date(as_of).date()
+        if current is not None and kpis is None and current.meta.get('hash') and current.meta.get('hash') == (meta or {}).get('hash'):
+            kpis, data_context_string = current.indicators, current.data_context_string
+            if current.kpis_as_of != kpis_as_of:
+                with perf.timer('indicators', snapshot=snapshot_hash, mode='new_day', changed_sheets=0):
+                    kpis = indicators.recompute_indicators(data, kpis, [], kpis_date=current.kpis_as_of, as_of=kpis_as_of)
+        else:
+            if kpis is None and current is not None and current.indicators:
+                # Partial refreshes reuse unchanged frames, so only indicators reading a changed sheet are recomputed
+                changed_sheets = [name for name in set(data) | set(current.data) if data.get(name) is not current.data.get(name)]
+                with perf.timer('indicators', snapshot=snapshot_hash, mode='incremental', changed_sheets=len(changed_sheets)):
+                    kpis = indicators.recompute_indicators(
+                        data, current.indicators, changed_sheets, previous_data=current.data,
+                        kpis_date=current.kpis_as_of, as_of=kpis_as_of,
+                    )
+            elif kpis is None:
+                with perf.timer('indicators', snapshot=snapshot_hash, mode='full'):
+                    kpis = indicators.get_all_indicators(data, snapshot_hash=snapshot_hash, as_of=kpis_as_of)
+            with perf.timer('data_context', snapshot=snapshot_hash):
+                data_context_string = build_data_context_string(data)
+        # Recorded before the version goes live, so anything derived from it already sees its own point
+        self._record_history(kpis, meta or {})
+
+        with self._lock:
+            snapshot = DataSnapshot(self._next_version, data, kpis, data_context_string, meta, kpis_as_of=kpis_as_of)
+            self._next_version += 1
+            previous_version = self._current_version
+            self._snapshots[snapshot.version] = snapshot
+            self._refcounts[snapshot.version] = 0
+            self._current_version = snapshot.version
+            self._drop_if_unused(previous_version)
+        return snapshot
+
+    def _record_history(self, kpis, meta):
+        if self.history is None or not kpis:
+            return
+        try:
+            self.history.record(kpis, meta.get('hash'), recorded_at=meta.get('saved_at'))
+        except Exception as e:
+            print(f"Warning: Could not record KPI history: {e}")
+
+    def acquire(self):
+        """Lease on the current snapshot, or None if nothing has been published yet."""
+        with self._lock:
+            snapshot = self._snapshots.get(self._current_version)
+            if snapshot is None:
+                return None
+            self._refcounts[snapshot.version] += 1
+        return SnapshotLease(self, snapshot)
+
+    def _release(self, version):
+        with self._lock:
+            if version not in self._refcounts:
+                return
+            self._refcounts[version] -= 1
+            self._drop_if_unused(version)
+
+    def _drop_if_unused(self, version):
+        # Caller holds the lock
+        if version is not None and version != self._current_version and self._refcounts.get(version, 0) <= 0:
+            self._snapshots.pop(version, None)
+            self._refcounts.pop(version, None)
+
+    def stats(self):
+        with self._lock:
+            return {'current_version': self._current_version, 'live_versions': dict(self._refcounts)}
@@ -0,0 +1,193 @@
+"""
+Column types for each worksheet, taken from schema.md. Sheets come back from the API as strings; type_sheets()
+parses currency, percent, score, date and enumeration columns once per load so indicators and pages work on
+float64 / datetime64 / category columns instead of re-parsing the same strings on every render.
+
+Numbers keep blanks as NaN (indicators.safe_to_numeric still treats them as 0), and percents stay on the
+sheet's 0-100 scale, e.g. '85%' -> 85.0.
+"""
+import pandas as pd
+
+import perf
+
+CURRENCY = 'currency'
+PERCENT = 'percent'
+NUMBER = 'number'
+DATE = 'date'
+CATEGORY = 'category'
+
+# Same characters indicators.safe_to_numeric strips: '$1,200', '85%', '12 hrs'
+NUMERIC_STRIP_CHARS = r'[$,%()A-Za-z]'
+
+SHEET_SCHEMAS = {
+    'Project Inventory': {
+        'Project Start Date': DATE, 'Project End Date': DATE,
+        'Next Opp First Discussion Date': DATE, 'Last Sponsor Checkin Date': DATE,
+        'Revenue': CURRENCY, 'Margin': PERCENT, 'eNPS': NUMBER,
+        'Project Health Score': NUMBER, 'Delivery Efficiency Score': NUMBER, 'Total Project Score': NUMBER,
+        'Status (R/Y/G)': CATEGORY, 'Executive Support Required': CATEGORY, 'Timeline Health': CATEGORY,
+        'Budget and Scope': CATEGORY, 'Client Relationship Strength': CATEGORY, 'Feedback Recency': CATEGORY,
+        'Business Outcome Defined': CATEGORY, 'Team Resourcing': CATEGORY, 'Strategic Value to Client': CATEGORY,
+        'Issue Resolution Hygiene': CATEGORY, 'Expansion Discussion': CATEGORY, 'Exec Engagement': CATEGORY,
+        'Health Band': CATEGORY, 'Delivery Relational Effort': CATEGORY, 'Expansion Yield Tier': CATEGORY,
+    },
+    'Project Risks': {
+        'Impact ($)': CURRENCY,
+        'Severity': CATEGORY, 'Severity (High/Medium/Low)': CATEGORY,
+    },
+    'Pipeline': {
+        'Opportunity Created Date': DATE, 'Last Touchpoint Date': DATE,
+        'Next Touchpoint Date': DATE, 'Closed Won Date': DATE,
+        # The live sheet spells it 'Percieved'; schema.md says 'Perceived'
+        'Percieved Annual AMO': CURRENCY, 'Perceived Annual AMO': CURRENCY, 'Open Pipeline_Active Work': CURRENCY,
+        'Pipeline Score': NUMBER, 'Relational Efficiency Score': NUMBER, 'Total Deal Score': NUMBER,
+        'Support Focus Type': CATEGORY, 'Horizon': CATEGORY, 'Pursuit Tier': CATEGORY, 'Deal Registered': CATEGORY,
+        'MSA/ICA Status': CATEGORY, 'Roadmap Alignment': CATEGORY, 'Sponsor Type': CATEGORY,
+        'Business Case_ROI': CATEGORY, 'HCLS Expertise needed': CATEGORY, 'Executor Pool Size': CATEGORY,
+        'Snowflake Investment Level': CATEGORY, 'IBM Growth in Account': CATEGORY,
+        'Snowflake Growth in Account': CATEGORY, 'Score Band': CATEGORY,
+        'Pre-Sales Effort Level': CATEGORY, 'Revenue Potential Tier': CATEGORY,
+    },
+    'Team Utilization': {
+        'Utilization (%)': PERCENT, 'Billable Rate ($/hr)': CURRENCY,
+        'Strategic Opportunity Cost ($/week)': CURRENCY, 'Latest Pulse Score': NUMBER,
+        'Role': CATEGORY,
+    },
+    'Talent Gaps': {
+        'Target Hire Date': DATE,
+        'Gap Impact (High/Medium/Low)': CATEGORY, 'Urgency': CATEGORY,
+    },
+    'Operational Gaps': {
+        'Severity (High/Medium/Low)': CATEGORY, 'Frequency': CATEGORY,
+    },
+    'Executive Activity': {
+        'Time Spent Weekly (hrs)': NUMBER, 'Strategic Cost ($)': CURRENCY,
+        'Type (Delivery/Sales/Ops)': CATEGORY,
+    },
+    'Do Nothing Scenario': {'Annualized Impact ($)': CURRENCY},
+    'Proposed Scenario': {'Annualized Impact ($)': CURRENCY},
+    'Scenario Comparison': {'Total Annualized Impact ($)': CURRENCY, 'Net Incremental Value ($)': CURRENCY},
+    'MappingTable': {'Score': NUMBER},
+    'Project Observations': {'Date': DATE},
+}
+
+
+def parse_numeric(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float)
+    cleaned = series.astype('string').str.replace(NUMERIC_STRIP_CHARS, '', regex=True).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce').astype(float)
+
+
+def parse_date(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors='coerce')
+
+
+def parse_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype('string').str.strip().astype('category')
+
+
+# --- Unformatted values (valueRenderOption=UNFORMATTED_VALUE, dateTimeRenderOption=SERIAL_NUMBER) ---
+# Numbers arrive as numbers and dates as day counts since Google Sheets' epoch. Percent-formatted cells come
+# back as fractions (0.85), so they are scaled to the 0-100 scale the display strings use. Cells typed in as
+# text ("$1,200", "2024-05-01") stay strings in this mode and go through the display-string parsers instead.
+SHEETS_EPOCH = pd.Timestamp('1899-12-30')
+# A percent column whose raw values go above this was typed as plain numbers (85), not as percents (0.85)
+PERCENT_FRACTION_MAX = 10
+
+
+def _split_numbers(series):
+    numbers = pd.to_numeric(series.astype(object), errors='coerce').astype(float)
+    return numbers, series.notna() & numbers.isna()
+
+
+def parse_unformatted_numeric(series, scale=1):
+    numbers, text = _split_numbers(series)
+    if scale != 1 and numbers.abs().max() <= PERCENT_FRACTION_MAX:
+        numbers = numbers * scale
+    if text.any():
+        numbers[text] = parse_numeric(series[text])
+    return numbers
+
+
+def parse_unformatted_percent(series):
+    return parse_unformatted_numeric(series, scale=100)
+
+
+def parse_serial_date(series):
+    serials, text = _split_numbers(series)
+    dates = pd.to_datetime(serials, unit='D', origin=SHEETS_EPOCH)
+    if text.any():
+        dates[text] = pd.to_datetime(series[text].astype(str), errors='coerce')
+    return dates
+
+
+PARSERS = {CURRENCY: parse_numeric, PERCENT: parse_numeric, NUMBER: parse_numeric, DATE: parse_date, CATEGORY: parse_category}
+UNFORMATTED_PARSERS = {
+    CURRENCY: parse_unformatted_numeric, PERCENT: parse_unformatted_percent, NUMBER: parse_unformatted_numeric,
+    DATE: parse_serial_date, CATEGORY: parse_category,
+}
+TYPED_CHECKS = {
+    CURRENCY: pd.api.types.is_float_dtype, PERCENT: pd.api.types.is_float_dtype, NUMBER: pd.api.types.is_float_dtype,
+    DATE: pd.api.types.is_datetime64_any_dtype, CATEGORY: lambda dtype: isinstance(dtype, pd.CategoricalDtype),
+}
+
+
+def untyped_columns(worksheet_name, df):
+    schema = SHEET_SCHEMAS.get(worksheet_name, {})
+    return [
+        col for col in df.columns
+        if col in schema and not TYPED_CHECKS[schema[col]](df[col].dtype)
+    ]
+
+
+def type_dataframe(worksheet_name, df):
+    """Returns df with its schema columns parsed; a frame that is already typed is returned as is (no copy)."""
+    if df is None or df.empty or df.columns.duplicated().any():
+        return df
+    columns = untyped_columns(worksheet_name, df)
+    if not columns:
+        return df
+    schema = SHEET_SCHEMAS[worksheet_name]
+    df = df.copy()
+    for col in columns:
+        df[col] = PARSERS[schema[col]](df[col])
+    return df
+
+
+def _raw_to_text(value):
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def raw_to_text(series):
+    """Raw cells (numbers, booleans, strings) as strings, so a column never mixes types (Parquet rejects that)."""
+    if series.map(lambda value: isinstance(value, str), na_action='ignore').fillna(True).all():
+        return series
+    return series.map(_raw_to_text, na_action='ignore').astype(object)
+
+
+def type_unformatted_dataframe(worksheet_name, df):
+    """
+    Types a frame fetched with unformatted values. Schema columns are always converted, since raw numbers may already
+    look numeric; every other column is turned back into strings like a formatted load would give.
+    """
+    schema = SHEET_SCHEMAS.get(worksheet_name, {})
+    if df is None or df.empty or df.columns.duplicated().any():
+        return df
+    df = df.copy()
+    for col in df.columns:
+        df[col] = UNFORMATTED_PARSERS[schema[col]](df[col]) if col in schema else raw_to_text(df[col])
+    return df
+
+
+def type_sheets(data):
+    with perf.timer('parse', sheets=len(data)):
+        return {name: type_dataframe(name, df) for name, df in data.items()}
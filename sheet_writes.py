@@ -0,0 +1,209 @@
+"""
+Helpers for writing edits back to Google Sheets. The bulk editor diffs the edited grid against the loaded
+snapshot cell by cell and sends every changed cell in one values batch update, instead of a
+row_values() + find() + update_cells() round trip per row.
+
+Target cells come from a RowIndex built from the loaded snapshot (identifier -> Sheet row, header -> column).
+Rows can be sorted, inserted or deleted in the Sheets UI at any time, so every write first re-reads the header and
+the identifier cell at each indexed row (one values_batch_get); rows that moved fall back to reading the
+identifier column. A write is therefore one read plus one values_batch_update call.
+"""
+from datetime import date, datetime
+
+import pandas as pd
+
+import sheets_loader
+
+HEADER_ROW = 1
+
+# Sheets the bulk editor works on: identifier column (read-only in the grid) and the columns that can be edited.
+# Score and band columns are left out on purpose; they are formulas in the Sheet.
+BULK_EDIT_SHEETS = {
+    'Project Inventory': ('Project Name', [
+        'Status (R/Y/G)', 'Key Issues', 'Next Steps', 'Executive Support Required',
+        'Last Sponsor Checkin Date', 'Sponsor Checkin Notes', 'Project End Date',
+    ]),
+    'Pipeline': ('Account', [
+        'Horizon', 'Pursuit Tier', 'Percieved Annual AMO', 'Notes', 'Help Needed', 'Actions',
+        'Next Touchpoint Date', 'Deal Registered YN',
+    ]),
+}
+
+
+def column_letters(col):
+    """1 -> 'A', 28 -> 'AB'"""
+    letters = ''
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def a1_cell(row, col):
+    return f"{column_letters(col)}{row}"
+
+
+def to_sheet_value(value):
+    """The string written with USER_ENTERED, matching how a person would type the value into the Sheet."""
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def diff_rows(original_df, edited_df, identifier_col, editable_cols):
+    """
+    Cell-level diff of an edited grid against the snapshot frame it was built from (same index).
+    Returns (changes, skipped): changes is a list of {'identifier', 'column', 'old', 'new'} with sheet-ready
+    string values; skipped lists identifiers that cannot be written safely (blank or duplicated in the snapshot).
+    """
+    columns = [col for col in editable_cols if col in original_df.columns and col in edited_df.columns]
+    identifiers = original_df[identifier_col].map(to_sheet_value)
+    duplicated = set(identifiers[identifiers.duplicated(keep=False)])
+    changes, skipped = [], []
+    for index in edited_df.index.intersection(original_df.index):
+        identifier = identifiers.at[index]
+        row_changes = []
+        for col in columns:
+            old, new = to_sheet_value(original_df.at[index, col]), to_sheet_value(edited_df.at[index, col])
+            if old != new:
+                row_changes.append({'identifier': identifier, 'column': col, 'old': old, 'new': new})
+        if not row_changes:
+            continue
+        if not identifier or identifier in duplicated:
+            skipped.append(identifier)
+            continue
+        changes.extend(row_changes)
+    return changes, skipped
+
+
+def changes_by_row(changes):
+    """{identifier: {column: new value}} in first-seen order."""
+    rows = {}
+    for change in changes:
+        rows.setdefault(change['identifier'], {})[change['column']] = change['new']
+    return rows
+
+
+def header_columns(header):
+    """{header name: 1-based column}, first occurrence wins like header.index()."""
+    columns = {}
+    for position, name in enumerate(header, start=1):
+        name = str(name).strip()
+        if name and name not in columns:
+            columns[name] = position
+    return columns
+
+
+def build_batch_update(worksheet_name, columns, row_numbers, rows):
+    """
+    values_batch_update data for {identifier: {column: value}}, given {header name: column} and
+    {identifier: sheet row number} lookups. Returns (data, missing) where missing lists identifiers or
+    columns that could not be placed.
+    """
+    data, missing = [], []
+    sheet_range = sheets_loader.a1_sheet_range(worksheet_name)
+    for identifier, values in rows.items():
+        row = row_numbers.get(identifier)
+        if row is None:
+            missing.append(identifier)
+            continue
+        for col_name, value in values.items():
+            if col_name not in columns:
+                missing.append(col_name)
+                continue
+            data.append({'range': f"{sheet_range}!{a1_cell(row, columns[col_name])}", 'values': [[value]]})
+    return data, missing
+
+
+def first_row_numbers(column_values, identifiers, header_rows=HEADER_ROW):
+    """Sheet row number of the first occurrence of each identifier in a column read with col_values()."""
+    wanted = set(identifiers)
+    rows = {}
+    for offset, value in enumerate(column_values[header_rows:], start=header_rows + 1):
+        value = str(value).strip()
+        if value in wanted and value not in rows:
+            rows[value] = offset
+    return rows
+
+
+class RowIndex:
+    """Identifier -> Sheet row and header -> column lookups for one worksheet, built from a loaded snapshot."""
+
+    def __init__(self, worksheet_name, identifier_col, header, rows):
+        self.worksheet_name = worksheet_name
+        self.identifier_col = identifier_col
+        self.header = list(header)
+        self.columns = header_columns(header)
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, worksheet_name, df, identifier_col):
+        """None if the frame does not carry Sheet row positions in its index (e.g. a non-Sheets source)."""
+        if df is None or identifier_col not in df.columns or not pd.api.types.is_integer_dtype(df.index):
+            return None
+        rows = {}
+        for position, identifier in zip(df.index, df[identifier_col].map(to_sheet_value)):
+            if identifier and identifier not in rows:
+                rows[identifier] = int(position) + HEADER_ROW + 1
+        return cls(worksheet_name, identifier_col, df.columns, rows)
+
+
+def verify_row_index(spreadsheet, row_index, identifiers):
+    """
+    One values_batch_get of the header row plus the identifier cell at each indexed row.
+    Returns (row_numbers, columns) holding only the rows and header that still match; anything missing
+    has to be looked up again.
+    """
+    identifiers = [identifier for identifier in identifiers if identifier in row_index.rows]
+    identifier_col = row_index.columns.get(row_index.identifier_col)
+    if identifier_col is None:
+        return {}, {}
+    sheet_range = sheets_loader.a1_sheet_range(row_index.worksheet_name)
+    ranges = [f"{sheet_range}!{HEADER_ROW}:{HEADER_ROW}"] + [
+        f"{sheet_range}!{a1_cell(row_index.rows[identifier], identifier_col)}" for identifier in identifiers
+    ]
+    value_ranges = spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+    if len(value_ranges) != len(ranges):
+        return {}, {}
+
+    def first_cell(value_range):
+        values = value_range.get('values') or [[]]
+        return to_sheet_value(values[0][0]) if values[0] else ''
+
+    header = (value_ranges[0].get('values') or [[]])[0]
+    columns = header_columns(header)
+    if columns.get(row_index.identifier_col) != identifier_col:
+        return {}, columns
+    row_numbers = {
+        identifier: row_index.rows[identifier]
+        for identifier, value_range in zip(identifiers, value_ranges[1:])
+        if first_cell(value_range) == identifier
+    }
+    return row_numbers, columns
+
+
+def locate_rows(spreadsheet, worksheet_name, identifier_col, identifiers, row_index=None):
+    """
+    Returns ({identifier: sheet row}, {header name: column}) as the Sheet is now. Indexed rows are checked with
+    verify_row_index (one read); identifiers that are not indexed or no longer in their indexed row are looked up
+    by reading the header and the identifier column.
+    """
+    row_numbers, columns = {}, {}
+    if row_index is not None:
+        row_numbers, columns = verify_row_index(spreadsheet, row_index, identifiers)
+
+    unresolved = [identifier for identifier in identifiers if identifier not in row_numbers]
+    if unresolved or identifier_col not in columns:
+        if row_index is not None:
+            print(f"Info: row index for '{worksheet_name}' is out of date; looking up {len(unresolved)} row(s) in the sheet.")
+        worksheet = spreadsheet.worksheet(worksheet_name)
+        columns = header_columns(worksheet.row_values(HEADER_ROW))
+        if identifier_col not in columns:
+            return {}, columns
+        column_values = worksheet.col_values(columns[identifier_col])
+        row_numbers.update(first_row_numbers(column_values, unresolved))
+    return row_numbers, columns
@@ -0,0 +1,147 @@
+"""
+One long-lived Google Sheets connection per process.
+
+The client is authorized once and its OAuth token is refreshed shortly before it expires, on a side thread,
+instead of re-running gspread.authorize on a timer. When connecting fails the connection retries in a background
+thread with exponential backoff and jitter, so a Streamlit run never sleeps waiting for Google; callers get
+None back and keep serving the last good snapshot until the connection recovers.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import gspread
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+
+import sheets_loader
+
+RECONNECT_BASE_DELAY = 2  # seconds, doubled after each failed attempt
+RECONNECT_MAX_DELAY = 5 * 60
+# Refresh the access token this long before it expires (tokens last an hour)
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def backoff_delay(failures, base=RECONNECT_BASE_DELAY, cap=RECONNECT_MAX_DELAY):
+    """Exponential backoff with jitter: somewhere between half and all of base * 2^(failures - 1), capped."""
+    delay = min(cap, base * (2 ** max(0, failures - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def open_with_service_account(credentials_file, sheet_name):
+    credentials = Credentials.from_service_account_file(credentials_file, scopes=sheets_loader.SCOPES)
+    spreadsheet = gspread.authorize(credentials).open(sheet_name)
+    # Fail here rather than on the first load if the service account cannot read the Sheet
+    spreadsheet.get_worksheet(0)
+    return spreadsheet, credentials
+
+
+def is_auth_error(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(error, RefreshError) or status == 401
+
+
+class SheetsConnection:
+    def __init__(self, credentials_file, sheet_name, open_fn=open_with_service_account):
+        self.credentials_file = credentials_file
+        self.sheet_name = sheet_name
+        self.open_fn = open_fn
+        self.last_error = None
+        self.failures = 0
+        self.next_retry_at = None
+        self.connected_at = None
+        self._spreadsheet = None
+        self._credentials = None
+        self._connected = threading.Event()
+        self._lock = threading.Lock()
+        self._connect_thread = None
+        self._token_thread = None
+
+    @property
+    def is_connected(self):
+        return self._spreadsheet is not None
+
+    def get(self, timeout=0):
+        """
+        The open spreadsheet, or None if it is not connected within `timeout` seconds (0 = don't wait).
+        (Re)connecting always happens on the background thread.
+        """
+        spreadsheet = self._spreadsheet
+        if spreadsheet is not None:
+            self._refresh_token_if_expiring()
+            return spreadsheet
+        self.connect()
+        if timeout and self._connected.wait(timeout):
+            return self._spreadsheet
+        return None
+
+    def connect(self):
+        with self._lock:
+            if self._spreadsheet is not None or (self._connect_thread and self._connect_thread.is_alive()):
+                return
+            self._connect_thread = threading.Thread(target=self._connect_loop, name='sheets-connect', daemon=True)
+            self._connect_thread.start()
+
+    def _connect_loop(self):
+        while True:
+            try:
+                spreadsheet, credentials = self.open_fn(self.credentials_file, self.sheet_name)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+                delay = backoff_delay(self.failures)
+                self.next_retry_at = datetime.now() + timedelta(seconds=delay)
+                print(f"Warning: Google Sheets connection attempt {self.failures} failed, retrying in {delay:.0f}s: {e}")
+                time.sleep(delay)
+                continue
+            with self._lock:
+                self._spreadsheet, self._credentials = spreadsheet, credentials
+                self.failures, self.last_error, self.next_retry_at = 0, None, None
+                self.connected_at = datetime.now()
+                self._connected.set()
+            return
+
+    def invalidate(self, error):
+        """Drops the connection after an auth failure so the next get() reconnects (with backoff)."""
+        if not is_auth_error(error):
+            return False
+        with self._lock:
+            self._spreadsheet = None
+            self._connected.clear()
+            self.last_error = error
+        print(f"Warning: Google Sheets credentials rejected, reconnecting: {error}")
+        self.connect()
+        return True
+
+    def _refresh_token_if_expiring(self):
+        credentials = self._credentials
+        expiry = getattr(credentials, 'expiry', None)
+        if expiry is None:
+            return
+        # google-auth keeps expiry as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if expiry - now > TOKEN_REFRESH_MARGIN:
+            return
+        with self._lock:
+            if self._token_thread and self._token_thread.is_alive():
+                return
+            self._token_thread = threading.Thread(target=self._refresh_token, args=(credentials,), name='sheets-token', daemon=True)
+            self._token_thread.start()
+
+    def _refresh_token(self, credentials):
+        try:
+            # Refreshed in place; gspread's session holds the same credentials object
+            credentials.refresh(Request())
+        except Exception as e:
+            print(f"Warning: could not refresh Google Sheets access token: {e}")
+            self.invalidate(RefreshError(str(e)))
+
+    def status(self):
+        if self.is_connected:
+            return f"connected since {self.connected_at:%H:%M}"
+        if self.next_retry_at:
+            seconds = max(0, (self.next_retry_at - datetime.now()).total_seconds())
+            return f"reconnecting (attempt {self.failures + 1} in {seconds:.0f}s): {self.last_error}"
+        return "connecting..."
@@ -0,0 +1,267 @@
+"""
+Helpers for pulling worksheet data out of Google Sheets.
+Nothing in here touches Streamlit, so these functions can be wrapped by st.cache_data
+in app.py or called from worker threads.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+
+import sheet_schema
+
+WORKSHEET_NAMES = [
+    'Project Inventory', 'Project Risks', 'Pipeline', 'Team Utilization',
+    'Talent Gaps', 'Operational Gaps', 'Executive Activity',
+    'Scenario Model Inputs', 'Do Nothing Scenario', 'Proposed Scenario',
+    'Scenario Comparison', 'MappingTable', 'Project Observations'
+]
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+
+# Default thread pool size for per-sheet loading; override with SHEETS_LOAD_WORKERS.
+DEFAULT_LOAD_WORKERS = 4
+SHEET_FETCH_RETRIES = 3
+SHEET_FETCH_RETRY_DELAY = 1  # seconds, doubled after each failed attempt
+
+# All 13 tabs fit in a single values:batchGet call; lower this to split very large tabs over several calls.
+BATCH_GET_MAX_RANGES = 20
+
+# Range read per tab to decide whether it changed since the last load. Column A catches added, removed and
+# renamed rows; a tab that is edited elsewhere can point this at a checksum cell instead
+# (e.g. a hidden cell holding =SUMPRODUCT(LEN(A2:AD1000))).
+DEFAULT_FINGERPRINT_RANGE = 'A:A'
+FINGERPRINT_RANGES = {}
+
+# FORMATTED_VALUE returns display strings ("$1,250,000", "85%") that sheet_schema parses after the load.
+# UNFORMATTED_VALUE returns raw numbers and serial-number dates, typed straight away without string cleaning.
+FORMATTED = 'FORMATTED_VALUE'
+UNFORMATTED = 'UNFORMATTED_VALUE'
+VALUE_RENDER_OPTIONS = (FORMATTED, UNFORMATTED)
+
+
+def render_for(worksheet_name, value_render):
+    """
+    Tabs without a sheet_schema entry are always read as display strings: nothing would type their raw values,
+    and pages read them as text (e.g. Scenario Model Inputs' '10%' values).
+    """
+    if value_render == UNFORMATTED and worksheet_name in sheet_schema.SHEET_SCHEMAS:
+        return UNFORMATTED
+    return FORMATTED
+
+
+def value_render_params(value_render):
+    if value_render == UNFORMATTED:
+        return {'valueRenderOption': UNFORMATTED, 'dateTimeRenderOption': 'SERIAL_NUMBER'}
+    return None
+
+
+def values_to_dataframe(all_values, worksheet_name=None, value_render=FORMATTED):
+    """Turns a list of rows (header first) into the DataFrame shape the dashboard expects."""
+    if not all_values:
+        return pd.DataFrame()
+    # The values API trims trailing empty cells, so pad every row (and the header) to the widest row
+    # the same way gspread's get_all_values() does.
+    width = max(len(row) for row in all_values)
+    padded = [list(row) + [''] * (width - len(row)) for row in all_values]
+
+    df = pd.DataFrame(padded[1:], columns=padded[0])
+    df.columns = df.columns.astype(str).str.strip()
+    # Blank rows are dropped without renumbering, so index i is still Sheet row i + 2 (used by sheet_writes.RowIndex)
+    df = df.replace('', pd.NA).dropna(how='all')
+    if value_render == UNFORMATTED:
+        df = sheet_schema.type_unformatted_dataframe(worksheet_name, df)
+    return df
+
+
+def a1_sheet_range(worksheet_name):
+    """A1 range covering a whole worksheet, quoted so names with spaces or apostrophes work."""
+    return "'" + worksheet_name.replace("'", "''") + "'"
+
+
+def fetch_all_batched(spreadsheet, worksheet_names=None, max_ranges_per_call=BATCH_GET_MAX_RANGES, value_render=FORMATTED):
+    """
+    Fetches every worksheet with values_batch_get instead of one worksheet() + get_all_values() pair per tab.
+    Returns (data, report) where data maps worksheet name -> DataFrame and report holds
+    per-sheet row counts, the number of API calls, time spent waiting on the API and the total fetch time.
+    Any API error is raised so callers can fall back to per-sheet loading.
+    """
+    worksheet_names = list(worksheet_names or WORKSHEET_NAMES)
+    start = time.perf_counter()
+    data = {}
+    rows = {}
+    api_calls = 0
+    api_seconds = 0.0
+
+    # One group per render option, since a batch call takes a single valueRenderOption
+    groups = {}
+    for name in worksheet_names:
+        groups.setdefault(render_for(name, value_render), []).append(name)
+    for render, names in groups.items():
+        for i in range(0, len(names), max_ranges_per_call):
+            chunk = names[i:i + max_ranges_per_call]
+            call_start = time.perf_counter()
+            response = spreadsheet.values_batch_get([a1_sheet_range(name) for name in chunk], params=value_render_params(render))
+            api_seconds += time.perf_counter() - call_start
+            api_calls += 1
+            value_ranges = response.get('valueRanges', [])
+            if len(value_ranges) != len(chunk):
+                raise ValueError(f"values_batch_get returned {len(value_ranges)} ranges for {len(chunk)} worksheets")
+            # valueRanges come back in the same order as the requested ranges
+            for name, value_range in zip(chunk, value_ranges):
+                df = values_to_dataframe(value_range.get('values', []), name, render)
+                data[name] = df
+                rows[name] = len(df)
+    data = {name: data[name] for name in worksheet_names}
+
+    report = {
+        'mode': 'batched',
+        'value_render': value_render,
+        'api_calls': api_calls,
+        'api_seconds': api_seconds,
+        'total_seconds': time.perf_counter() - start,
+        'rows': rows,
+    }
+    return data, report
+
+
+def fetch_worksheet(spreadsheet, worksheet_name, max_retries=SHEET_FETCH_RETRIES, retry_delay=SHEET_FETCH_RETRY_DELAY,
+                    value_render=FORMATTED):
+    """Fetches a single worksheet, retrying that sheet alone on failure. Raises the last error."""
+    value_render = render_for(worksheet_name, value_render)
+    for attempt in range(max_retries):
+        try:
+            worksheet = spreadsheet.worksheet(worksheet_name)
+            if value_render == UNFORMATTED:
+                values = worksheet.get_all_values(value_render_option=UNFORMATTED, date_time_render_option='SERIAL_NUMBER')
+            else:
+                values = worksheet.get_all_values()
+            return values_to_dataframe(values, worksheet_name, value_render)
+        except Exception:
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(retry_delay * (2 ** attempt))
+
+
+def iter_fetch_concurrent(spreadsheet, worksheet_names=None, max_workers=DEFAULT_LOAD_WORKERS,
+                          max_retries=SHEET_FETCH_RETRIES, value_render=FORMATTED):
+    """
+    Fetches worksheets on a bounded thread pool and yields (name, df, error, seconds) as each one finishes,
+    so the caller can store results and move a progress bar from its own thread.
+    A failed sheet yields an empty DataFrame and the exception instead of stopping the other fetches.
+    """
+    worksheet_names = list(worksheet_names or WORKSHEET_NAMES)
+
+    def timed_fetch(name):
+        start = time.perf_counter()
+        try:
+            return fetch_worksheet(spreadsheet, name, max_retries=max_retries, value_render=value_render), None, time.perf_counter() - start
+        except Exception as e:
+            return pd.DataFrame(), e, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(worksheet_names)))) as executor:
+        futures = {executor.submit(timed_fetch, name): name for name in worksheet_names}
+        for future in as_completed(futures):
+            df, error, seconds = future.result()
+            yield futures[future], df, error, seconds
+
+
+def fetch_all(spreadsheet, worksheet_names=None, max_workers=DEFAULT_LOAD_WORKERS, value_render=FORMATTED):
+    """
+    Batched fetch with the concurrent per-sheet loader as fallback, for callers without a progress bar.
+    Unlike the interactive loader, a sheet that still fails after its retries raises instead of coming back empty.
+    """
+    worksheet_names = list(worksheet_names or WORKSHEET_NAMES)
+    try:
+        return fetch_all_batched(spreadsheet, worksheet_names, value_render=value_render)
+    except Exception as e:
+        print(f"Warning: batched load failed, falling back to per-sheet loading: {e}")
+
+    start = time.perf_counter()
+    data = {}
+    sheet_seconds = {}
+    for name, df, error, seconds in iter_fetch_concurrent(spreadsheet, worksheet_names, max_workers=max_workers,
+                                                          value_render=value_render):
+        if error is not None:
+            raise RuntimeError(f"Error loading worksheet '{name}': {error}") from error
+        data[name] = df
+        sheet_seconds[name] = seconds
+    report = {
+        'mode': 'concurrent',
+        'value_render': value_render,
+        'api_calls': 2 * len(worksheet_names),
+        'total_seconds': time.perf_counter() - start,
+        'slowest_sheet_seconds': max(sheet_seconds.values(), default=0),
+        'rows': {name: len(data[name]) for name in worksheet_names},
+    }
+    return data, report
+
+
+def fingerprint_values(values):
+    """Row count plus a hash of the fingerprint range's contents."""
+    digest = hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+    return f"{len(values)}:{digest}"
+
+
+def fetch_fingerprints(spreadsheet, worksheet_names=None):
+    """One values_batch_get over each tab's small fingerprint range. Returns {worksheet name: fingerprint}."""
+    worksheet_names = list(worksheet_names or WORKSHEET_NAMES)
+    ranges = [f"{a1_sheet_range(name)}!{FINGERPRINT_RANGES.get(name, DEFAULT_FINGERPRINT_RANGE)}" for name in worksheet_names]
+    value_ranges = spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+    if len(value_ranges) != len(worksheet_names):
+        raise ValueError(f"values_batch_get returned {len(value_ranges)} ranges for {len(worksheet_names)} worksheets")
+    return {name: fingerprint_values(value_range.get('values', [])) for name, value_range in zip(worksheet_names, value_ranges)}
+
+
+def fetch_changed(spreadsheet, previous_data=None, previous_fingerprints=None, worksheet_names=None,
+                  max_workers=DEFAULT_LOAD_WORKERS, value_render=FORMATTED):
+    """
+    Re-downloads only the tabs whose fingerprint moved since the previous load and reuses the previous
+    DataFrames for the rest. Returns (data, fingerprints, report).
+    Fingerprints are read before the data, so an edit landing in between just causes one extra reload next time.
+    """
+    worksheet_names = list(worksheet_names or WORKSHEET_NAMES)
+    previous_data = previous_data or {}
+    previous_fingerprints = previous_fingerprints or {}
+    start = time.perf_counter()
+
+    fingerprints = fetch_fingerprints(spreadsheet, worksheet_names)
+    changed = [
+        name for name in worksheet_names
+        if name not in previous_data or fingerprints[name] != previous_fingerprints.get(name)
+    ]
+    reused = [name for name in worksheet_names if name not in changed]
+
+    fetched, fetch_report = ({}, {'api_calls': 0})
+    if changed:
+        fetched, fetch_report = fetch_all(spreadsheet, changed, max_workers=max_workers, value_render=value_render)
+
+    data = {name: fetched[name] if name in fetched else previous_data[name] for name in worksheet_names}
+    report = {
+        'mode': 'incremental',
+        'value_render': value_render,
+        'api_calls': 1 + fetch_report['api_calls'],
+        'total_seconds': time.perf_counter() - start,
+        'changed': changed,
+        'reused': reused,
+        'rows': {name: len(data[name]) for name in worksheet_names},
+    }
+    return data, fingerprints, report
+
+
+def compare_value_renders(spreadsheet, worksheet_names=None):
+    """
+    Loads every worksheet once per value render option (one batch call each) and times it through to typed
+    frames, so the display-string and unformatted paths can be compared on the real Sheet.
+    Returns {value render option: report}.
+    """
+    reports = {}
+    for value_render in VALUE_RENDER_OPTIONS:
+        start = time.perf_counter()
+        data, report = fetch_all_batched(spreadsheet, worksheet_names, value_render=value_render)
+        sheet_schema.type_sheets(data)
+        report['total_seconds'] = time.perf_counter() - start
+        report['parse_seconds'] = report['total_seconds'] - report['api_seconds']
+        reports[value_render] = report
+    return reports
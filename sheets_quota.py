@@ -0,0 +1,224 @@
+"""
+Process-wide scheduler for the Google Sheets API quota (per minute, per service account, separately for reads
+and writes). Every Sheets call made by the dashboard goes through a QuotaSpreadsheet / QuotaWorksheet proxy that
+takes a token from the matching bucket first; when tokens run short, waiting calls are served by priority so a
+user's save goes ahead of an interactive load, which goes ahead of a background refresh.
+
+The scheduler also counts calls, bytes, 429 responses and time spent waiting, for the admin panel.
+"""
+import json
+import threading
+import time
+from collections import Counter, deque
+
+READ = 'read'
+WRITE = 'write'
+
+PRIORITY_WRITE = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_WRITE: 'write', PRIORITY_INTERACTIVE: 'interactive', PRIORITY_BACKGROUND: 'background'}
+
+# Google's default per-user quota is 60 read and 60 write requests per minute; override with
+# SHEETS_READS_PER_MINUTE / SHEETS_WRITES_PER_MINUTE if the project has a higher limit.
+DEFAULT_REQUESTS_PER_MINUTE = 60
+# After a 429 every call waits this long (doubling while 429s keep coming, up to the max)
+RATE_LIMIT_PAUSE_SECONDS = 5
+RATE_LIMIT_MAX_PAUSE_SECONDS = 60
+# Opening a spreadsheet costs a Drive lookup, a metadata read and the first worksheet read
+OPEN_SPREADSHEET_COST = 3
+
+
+def is_rate_limited(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 429 or getattr(error, 'code', None) == 429
+
+
+def payload_size(payload):
+    """Approximate size in bytes of a request body or response, as JSON."""
+    if payload is None:
+        return 0
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, cost):
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+class QuotaScheduler:
+    def __init__(self, reads_per_minute=DEFAULT_REQUESTS_PER_MINUTE, writes_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        self._cond = threading.Condition()
+        self._buckets = {READ: TokenBucket(reads_per_minute), WRITE: TokenBucket(writes_per_minute)}
+        self._waiting = {READ: Counter(), WRITE: Counter()}
+        self._paused_until = 0.0
+        self._consecutive_429s = 0
+        self._recent = deque()
+        self.calls = Counter()
+        self.calls_by_priority = Counter()
+        self.errors = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, bucket, priority, cost=1):
+        """Blocks until `cost` tokens are available and no higher-priority call is waiting on the same bucket."""
+        start = time.monotonic()
+        with self._cond:
+            waiting = self._waiting[bucket]
+            waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._paused_until - now
+                    if wait <= 0 and not any(count for p, count in waiting.items() if p < priority):
+                        token_bucket = self._buckets[bucket]
+                        token_bucket.refill(now)
+                        if token_bucket.tokens >= min(cost, token_bucket.capacity):
+                            token_bucket.tokens -= cost
+                            break
+                        wait = token_bucket.seconds_until(cost)
+                    # Higher-priority waiters notify when they leave, so an open-ended wait is fine here
+                    self._cond.wait(timeout=wait if wait > 0 else None)
+            finally:
+                waiting[priority] -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        with self._cond:
+            self.wait_seconds += waited
+        return waited
+
+    def call(self, operation, bucket, priority, fn, *args, cost=1, request_body=None, **kwargs):
+        self.acquire(bucket, priority, cost)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            with self._cond:
+                self.errors[operation] += 1
+                if is_rate_limited(e):
+                    self._record_rate_limit()
+            raise
+        with self._cond:
+            self.calls[operation] += cost
+            self.calls_by_priority[PRIORITY_NAMES.get(priority, priority)] += cost
+            self.bytes_sent += payload_size(request_body)
+            self.bytes_received += payload_size(result) if isinstance(result, (dict, list)) else 0
+            self._consecutive_429s = 0
+            now = time.monotonic()
+            self._recent.append((now, cost))
+            while self._recent and now - self._recent[0][0] > 60:
+                self._recent.popleft()
+        return result
+
+    def _record_rate_limit(self):
+        # Caller holds the lock
+        self.rate_limited += 1
+        self._consecutive_429s += 1
+        pause = min(RATE_LIMIT_MAX_PAUSE_SECONDS, RATE_LIMIT_PAUSE_SECONDS * 2 ** (self._consecutive_429s - 1))
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + pause)
+        # Start from an empty bucket once the pause ends instead of bursting straight back into the limit
+        for token_bucket in self._buckets.values():
+            token_bucket.refill(now)
+            token_bucket.tokens = 0.0
+        print(f"Warning: Google Sheets rate limit hit (429), pausing Sheets calls for {pause}s.")
+
+    def wrap(self, spreadsheet, priority):
+        return QuotaSpreadsheet(spreadsheet, self, priority)
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            for token_bucket in self._buckets.values():
+                token_bucket.refill(now)
+            return {
+                'limits_per_minute': {name: b.per_minute for name, b in self._buckets.items()},
+                'tokens_available': {name: round(b.tokens, 1) for name, b in self._buckets.items()},
+                'waiting': {
+                    name: {PRIORITY_NAMES[p]: count for p, count in waiting.items() if count}
+                    for name, waiting in self._waiting.items()
+                },
+                'calls_last_minute': sum(cost for at, cost in self._recent if now - at <= 60),
+                'calls': dict(self.calls),
+                'calls_by_priority': dict(self.calls_by_priority),
+                'errors': dict(self.errors),
+                'rate_limited': self.rate_limited,
+                'paused_seconds_left': max(0.0, self._paused_until - now),
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'wait_seconds': self.wait_seconds,
+            }
+
+
+class QuotaSpreadsheet:
+    """Spreadsheet proxy for the gspread calls the dashboard makes; other attributes pass straight through."""
+
+    def __init__(self, spreadsheet, scheduler, priority):
+        self._spreadsheet = spreadsheet
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def __getattr__(self, name):
+        return getattr(self._spreadsheet, name)
+
+    def _call(self, operation, bucket, fn, *args, **kwargs):
+        return self._scheduler.call(operation, bucket, self._priority, fn, *args, **kwargs)
+
+    def worksheet(self, title):
+        return QuotaWorksheet(self._call('worksheet', READ, self._spreadsheet.worksheet, title), self._scheduler, self._priority)
+
+    def get_worksheet(self, index):
+        return QuotaWorksheet(self._call('get_worksheet', READ, self._spreadsheet.get_worksheet, index), self._scheduler, self._priority)
+
+    def values_batch_get(self, ranges, params=None):
+        return self._call('values_batch_get', READ, self._spreadsheet.values_batch_get, ranges, params=params)
+
+    def values_batch_update(self, body):
+        return self._call('values_batch_update', WRITE, self._spreadsheet.values_batch_update, body, request_body=body)
+
+
+class QuotaWorksheet:
+    def __init__(self, worksheet, scheduler, priority):
+        self._worksheet = worksheet
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def __getattr__(self, name):
+        return getattr(self._worksheet, name)
+
+    def _call(self, operation, bucket, fn, *args, **kwargs):
+        return self._scheduler.call(operation, bucket, self._priority, fn, *args, **kwargs)
+
+    def get_all_values(self, **kwargs):
+        return self._call('get_all_values', READ, self._worksheet.get_all_values, **kwargs)
+
+    def row_values(self, row, **kwargs):
+        return self._call('row_values', READ, self._worksheet.row_values, row, **kwargs)
+
+    def col_values(self, col, **kwargs):
+        return self._call('col_values', READ, self._worksheet.col_values, col, **kwargs)
+
+    def find(self, query, **kwargs):
+        return self._call('find', READ, self._worksheet.find, query, **kwargs)
+
+    def update_cells(self, cell_list, **kwargs):
+        body = [[cell.row, cell.col, cell.value] for cell in cell_list]
+        return self._call('update_cells', WRITE, self._worksheet.update_cells, cell_list, request_body=body, **kwargs)
+
+    def batch_update(self, data, **kwargs):
+        return self._call('batch_update', WRITE, self._worksheet.batch_update, data, request_body=data, **kwargs)
@@ -0,0 +1,238 @@
+"""
+On-disk snapshot of the loaded worksheets so the dashboard can start instantly after a restart
+and revalidate against Google Sheets in the background (stale-while-revalidate).
+
+Layout of the snapshot directory:
+    CURRENT                      name of the active snapshot folder (swapped atomically with os.replace)
+    snap-<hash>-<timestamp>/     one Parquet file per worksheet plus meta.json
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+CURRENT_POINTER = 'CURRENT'
+META_FILE = 'meta.json'
+KEEP_SNAPSHOTS = 2
+
+
+def content_hash(data):
+    """Stable hash of a {worksheet name: DataFrame} dict, independent of dict order."""
+    digest = hashlib.sha256()
+    for name in sorted(data):
+        df = data[name]
+        digest.update(name.encode('utf-8'))
+        digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _current_folder(directory):
+    try:
+        with open(os.path.join(directory, CURRENT_POINTER), encoding='utf-8') as f:
+            folder = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, folder) if folder else None
+
+
+def read_meta(directory):
+    folder = _current_folder(directory)
+    if not folder:
+        return None
+    try:
+        with open(os.path.join(folder, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_snapshot(data, directory, snapshot_hash=None, extra_meta=None):
+    """
+    Writes the sheets as Parquet and points CURRENT at them. Returns the snapshot meta dict.
+    If the content hash is unchanged only the timestamp (and extra_meta) in meta.json is refreshed.
+    """
+    extra_meta = extra_meta or {}
+    os.makedirs(directory, exist_ok=True)
+    snapshot_hash = snapshot_hash or content_hash(data)
+    saved_at = datetime.now().isoformat(timespec='seconds')
+
+    current_meta = read_meta(directory)
+    if current_meta and current_meta.get('hash') == snapshot_hash:
+        current_meta.update(extra_meta)
+        current_meta['saved_at'] = saved_at
+        _write_atomic(os.path.join(_current_folder(directory), META_FILE), json.dumps(current_meta, indent=2))
+        return current_meta
+
+    folder_name = f"snap-{snapshot_hash[:12]}-{int(time.time())}"
+    tmp_folder = os.path.join(directory, f".{folder_name}.{uuid.uuid4().hex}.tmp")
+    os.makedirs(tmp_folder)
+    sheets = {}
+    for i, (name, df) in enumerate(data.items()):
+        file_name = f"sheet_{i:02d}.parquet"
+        # Parquet needs unique string column names; sheet headers can repeat or be blank, so store them positionally.
+        # The index is kept: it holds each row's position in the Sheet, which the write path relies on.
+        df.set_axis([f"c{j}" for j in range(df.shape[1])], axis=1).to_parquet(os.path.join(tmp_folder, file_name))
+        sheets[name] = {'file': file_name, 'columns': list(map(str, df.columns))}
+    meta = {**extra_meta, 'hash': snapshot_hash, 'saved_at': saved_at, 'sheets': sheets}
+    with open(os.path.join(tmp_folder, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    os.replace(tmp_folder, os.path.join(directory, folder_name))
+    _write_atomic(os.path.join(directory, CURRENT_POINTER), folder_name)
+    _prune_old_snapshots(directory, keep=folder_name)
+    return meta
+
+
+def load_snapshot(directory):
+    """Returns (data, meta) for the current snapshot, or (None, None) if there is no usable snapshot."""
+    folder = _current_folder(directory)
+    meta = read_meta(directory)
+    if not folder or not meta:
+        return None, None
+    data = {}
+    try:
+        for name, sheet_meta in meta.get('sheets', {}).items():
+            df = pd.read_parquet(os.path.join(folder, sheet_meta['file']))
+            df.columns = sheet_meta['columns']
+            data[name] = df
+    except Exception as e:
+        print(f"Warning: could not read data snapshot in '{folder}': {e}")
+        return None, None
+    return data, meta
+
+
+def snapshot_age_seconds(meta):
+    if not meta or not meta.get('saved_at'):
+        return None
+    return (datetime.now() - datetime.fromisoformat(meta['saved_at'])).total_seconds()
+
+
+def _prune_old_snapshots(directory, keep):
+    folders = sorted(
+        (entry for entry in os.listdir(directory) if entry.startswith('snap-') and entry != keep),
+        key=lambda entry: os.path.getmtime(os.path.join(directory, entry)),
+        reverse=True
+    )
+    # Keep one older snapshot around so a session mid-read of it isn't pulled out from under
+    for entry in folders[KEEP_SNAPSHOTS - 1:]:
+        shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+class SnapshotRefresher:
+    """
+    Runs at most one background refresh at a time. fetch_fn receives the previous (data, meta), or (None, None),
+    and returns a fresh {worksheet name: DataFrame} dict plus extra meta to store with it; the result is written
+    to disk and published to the shared snapshot registry for sessions to pick up.
+
+    schedule() additionally runs a refresh every `interval` seconds from a daemon thread, so indicators and the
+    AI context are rebuilt off the request path and pages only ever read the published snapshot.
+    """
+
+    def __init__(self, directory, registry):
+        self.directory = directory
+        self.registry = registry
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending_fetch_fn = None
+        self.interval = None
+        self.last_refreshed_at = None
+        self.last_duration = None
+        self.next_run_at = None
+        self._schedule_thread = None
+        self._schedule_fetch_fn = None
+        self._wake = threading.Event()
+
+    @property
+    def is_running(self):
+        # Cleared by the refresh thread itself, under the lock, once it has no pending refresh left to run
+        return self._thread is not None
+
+    def start(self, fetch_fn):
+        with self._lock:
+            if self.is_running:
+                # A refresh already in flight may have read the sheets before a write; run once more after it
+                self._pending_fetch_fn = fetch_fn
+                return False
+            self._thread = threading.Thread(target=self._run, args=(fetch_fn,), name='snapshot-refresh', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, fetch_fn):
+        while fetch_fn is not None:
+            try:
+                current = self.registry.current()
+                if current is not None:
+                    previous_data, previous_meta = dict(current.data), dict(current.meta)
+                else:
+                    previous_data, previous_meta = load_snapshot(self.directory)
+                started = time.perf_counter()
+                data, extra_meta = fetch_fn(previous_data, previous_meta)
+                meta = save_snapshot(data, self.directory, extra_meta=extra_meta)
+                # Indicators and the AI context are computed here, then swapped in as one new version
+                self.registry.publish(data, meta)
+                self.last_error = None
+                self.last_duration = time.perf_counter() - started
+            except Exception as e:
+                self.last_error = e
+                print(f"Warning: background data refresh failed: {e}")
+            # Failed attempts count too, so a broken source is retried on the schedule rather than in a tight loop
+            self.last_refreshed_at = time.time()
+            with self._lock:
+                fetch_fn, self._pending_fetch_fn = self._pending_fetch_fn, None
+                if fetch_fn is None:
+                    # Idle from here on: a start() after this point runs a new thread instead of queueing behind this one
+                    self._thread = None
+
+    def schedule(self, fetch_fn, interval):
+        """Refresh every `interval` seconds (counted from the end of the last refresh). Safe to call on every run."""
+        with self._lock:
+            interval_changed = interval != self.interval
+            self._schedule_fetch_fn, self.interval = fetch_fn, interval
+            if self._schedule_thread is not None and self._schedule_thread.is_alive():
+                if interval_changed:
+                    self._wake.set()
+                return False
+            self._schedule_thread = threading.Thread(target=self._schedule_loop, name='snapshot-auto-refresh', daemon=True)
+            self._schedule_thread.start()
+            return True
+
+    def stop_schedule(self):
+        with self._lock:
+            self._schedule_fetch_fn = None
+        self._wake.set()
+
+    def _schedule_loop(self):
+        while True:
+            with self._lock:
+                fetch_fn, interval = self._schedule_fetch_fn, self.interval
+            if fetch_fn is None or not interval:
+                self.next_run_at = None
+                return
+            now = time.time()
+            # A snapshot published by a load or a save counts as a refresh, so the schedule doesn't repeat it
+            current = self.registry.current()
+            age = snapshot_age_seconds(current.meta) if current is not None else None
+            last = max(self.last_refreshed_at or 0, now - age if age is not None else 0)
+            due = last + interval
+            if now >= due and not self.is_running:
+                self.start(fetch_fn)
+                due = now + interval
+            self.next_run_at = due
+            self._wake.wait(timeout=max(1.0, due - now))
+            self._wake.clear()
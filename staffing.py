@@ -0,0 +1,169 @@
+"""
+Staff-to-project assignments from Team Utilization.
+
+'Project Assignments' holds a comma-separated list of project names per team member. assignment_table splits it
+once into one row per (team member, project), so per-project figures (team size, members, average utilization and
+pulse) come from a single groupby instead of re-splitting every team member's list for every project.
+The app builds both tables once per snapshot version.
+"""
+import numpy as np
+import pandas as pd
+
+import indicators
+import sheet_schema
+
+ASSIGNMENT_COLUMNS = ['Employee Name', 'Role', 'Project Name', 'Utilization (%)', 'Latest Pulse Score']
+
+
+def assignment_table(util_df):
+    """
+    One row per (team member, assigned project), in Team Utilization order, with 'staff_row' (the member's row
+    label in util_df). A project listed twice for the same member counts once. Missing utilization or pulse
+    columns are 0, like safe_to_numeric treats blanks.
+    """
+    if util_df is None or util_df.empty or 'Project Assignments' not in util_df.columns or 'Employee Name' not in util_df.columns:
+        return pd.DataFrame(columns=['staff_row'] + ASSIGNMENT_COLUMNS)
+    zeros = pd.Series(0.0, index=util_df.index)
+    table = pd.DataFrame({
+        'staff_row': util_df.index,
+        'Employee Name': util_df['Employee Name'].to_numpy(),
+        'Role': util_df['Role'].to_numpy() if 'Role' in util_df.columns else None,
+        'Project Name': util_df['Project Assignments'].astype('string').str.split(',').to_numpy(),
+        'Utilization (%)': (indicators.safe_to_numeric(util_df['Utilization (%)']) if 'Utilization (%)' in util_df.columns else zeros).to_numpy(),
+        'Latest Pulse Score': (indicators.safe_to_numeric(util_df['Latest Pulse Score']) if 'Latest Pulse Score' in util_df.columns else zeros).to_numpy(),
+    }).explode('Project Name', ignore_index=True)
+    table['Project Name'] = table['Project Name'].astype('string').str.strip()
+    table = table[table['Project Name'].notna() & (table['Project Name'] != '')]
+    return table.drop_duplicates(subset=['staff_row', 'Project Name']).reset_index(drop=True)
+
+
+def project_staffing(assignments):
+    """Per project name: 'Assigned Team Size', 'Assigned Team Members', 'Avg. Team Utilization %', 'Avg. Team Pulse Score'."""
+    grouped = assignments.groupby('Project Name', sort=False)
+    return pd.DataFrame({
+        'Assigned Team Size': grouped.size(),
+        'Assigned Team Members': grouped['Employee Name'].agg(lambda names: ', '.join(map(str, names))),
+        'Avg. Team Utilization %': grouped['Utilization (%)'].mean(),
+        'Avg. Team Pulse Score': grouped['Latest Pulse Score'].mean(),
+    })
+
+
+def staffing_for_projects(project_names, project_table):
+    """project_staffing rows for `project_names` (in that order); unstaffed projects get 0 / 'N/A'."""
+    rows = project_table.reindex(pd.Index(project_names.astype(str), name='Project Name'))
+    return rows.fillna({
+        'Assigned Team Size': 0, 'Assigned Team Members': 'N/A', 'Avg. Team Utilization %': 0, 'Avg. Team Pulse Score': 0,
+    }).astype({'Assigned Team Size': int})
+
+
+def staff_load(assignments):
+    """Per team member: 'Projects' (comma-separated), 'Project Count' and utilization, most projects first."""
+    grouped = assignments.groupby('staff_row', sort=False)
+    load = pd.DataFrame({
+        'Employee Name': grouped['Employee Name'].first(),
+        'Role': grouped['Role'].first(),
+        'Project Count': grouped.size(),
+        'Projects': grouped['Project Name'].agg(', '.join),
+        'Utilization (%)': grouped['Utilization (%)'].first(),
+    })
+    return load.sort_values('Project Count', ascending=False, kind='stable').reset_index(drop=True)
+
+
+# --- Forward capacity ---
+# Assignments carry no per-project allocation, so a person's current utilization is split evenly over their
+# assigned projects running this week, and every assigned project running in a later week needs the same share.
+# A week's allocation is therefore utilization * (their projects running that week) / (their projects running now),
+# which reproduces today's utilization and goes over 100% when projects that have not started yet overlap.
+DEFAULT_CAPACITY_WEEKS = 12
+MAX_CAPACITY_WEEKS = 52
+OVER_ALLOCATION_PCT = 100
+
+
+class CapacityPlan:
+    """
+    Person x week allocation for the weeks starting at `weeks` (Mondays).
+    people: one row per team member with assignments (Employee Name, Role, Utilization (%)).
+    allocation: float array (people x weeks) of allocation %.
+    projects / project_active / project_staff: project names, bool array (projects x weeks) of projects running
+    that week, and number of assigned team members per project.
+    """
+
+    def __init__(self, weeks, people, allocation, projects, project_active, project_staff):
+        self.weeks = weeks
+        self.people = people
+        self.allocation = allocation
+        self.projects = projects
+        self.project_active = project_active
+        self.project_staff = project_staff
+
+    def over_allocated(self, threshold=OVER_ALLOCATION_PCT):
+        """Team members above `threshold`% in any week: weeks over, peak allocation and the first week over."""
+        over = self.allocation > threshold
+        rows = over.any(axis=1)
+        result = self.people[rows].copy()
+        result['Weeks Over'] = over[rows].sum(axis=1)
+        result['Peak Allocation %'] = self.allocation[rows].max(axis=1)
+        result['First Week Over'] = self.weeks[over[rows].argmax(axis=1)]
+        return result.sort_values(['Peak Allocation %', 'Weeks Over'], ascending=False).reset_index(drop=True)
+
+    def unstaffed(self):
+        """Per week: number and names of running projects nobody is assigned to (weeks without any are left out)."""
+        unstaffed = self.project_active & (self.project_staff == 0)[:, None]
+        counts = unstaffed.sum(axis=0)
+        names = [', '.join(self.projects[unstaffed[:, w]]) for w in np.flatnonzero(counts)]
+        return pd.DataFrame({
+            'Week Of': self.weeks[counts > 0], 'Unstaffed Projects': counts[counts > 0], 'Projects': names,
+        })
+
+    def allocation_frame(self, rows=None):
+        """Allocation as a DataFrame (team member x week) for charts, optionally only for `rows` (a boolean mask)."""
+        people = self.people if rows is None else self.people[rows]
+        allocation = self.allocation if rows is None else self.allocation[rows]
+        return pd.DataFrame(allocation, index=people['Employee Name'].astype(str).to_numpy(), columns=self.weeks.strftime('%Y-%m-%d'))
+
+
+def week_starts(as_of=None, weeks=DEFAULT_CAPACITY_WEEKS):
+    """Mondays of the `weeks` weeks starting with the week containing as_of (today)."""
+    start = indicators.as_of_date(as_of)
+    return pd.date_range(start - pd.Timedelta(days=start.weekday()), periods=weeks, freq='7D')
+
+
+def capacity_plan(assignments, project_df, as_of=None, weeks=DEFAULT_CAPACITY_WEEKS):
+    """CapacityPlan for the next `weeks` weeks from assignment_table rows and Project Inventory date ranges."""
+    week_start = week_starts(as_of, weeks)
+    starts = week_start.to_numpy(dtype='datetime64[ns]')
+    ends = starts + np.timedelta64(7, 'D')
+
+    if project_df is None or project_df.empty or 'Project Name' not in project_df.columns:
+        project_df = pd.DataFrame(columns=['Project Name'])
+    projects = pd.Index(project_df['Project Name'].astype(str)).drop_duplicates()
+    first_rows = project_df.drop_duplicates(subset='Project Name') if len(project_df) else project_df
+    # A project runs in a week that overlaps [start, end]; a missing start has begun, a missing end is open-ended
+    project_start = _optional_dates(first_rows, 'Project Start Date')
+    project_end = _optional_dates(first_rows, 'Project End Date')
+    started = np.isnat(project_start)[:, None] | (project_start[:, None] < ends[None, :])
+    not_ended = np.isnat(project_end)[:, None] | (project_end[:, None] >= starts[None, :])
+    project_active = started & not_ended
+
+    # Assignments to projects that are not in Project Inventory have no dates and are left out
+    project_index = projects.get_indexer(assignments['Project Name'].astype(str))
+    known = project_index >= 0
+    # People in order of first appearance, which is also the order factorize numbers them in
+    people_codes, people_rows = pd.factorize(assignments['staff_row'])
+    people = assignments.drop_duplicates(subset='staff_row')[['Employee Name', 'Role', 'Utilization (%)']].reset_index(drop=True)
+
+    running = np.zeros((len(people_rows), len(week_start)))
+    np.add.at(running, people_codes[known], project_active[project_index[known]])
+    running_now = np.maximum(running[:, 0], 1)
+    utilization = people['Utilization (%)'].to_numpy(dtype=float)
+    allocation = utilization[:, None] * running / running_now[:, None]
+
+    project_staff = np.bincount(project_index[known], minlength=len(projects))
+    return CapacityPlan(week_start, people, allocation, projects, project_active, project_staff)
+
+
+def _optional_dates(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+    # Typed at load; parse_date is a no-op then
+    return sheet_schema.parse_date(df[col]).to_numpy(dtype='datetime64[ns]')
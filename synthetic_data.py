@@ -0,0 +1,268 @@
+"""
+Synthetic workbook that follows schema.md, for benchmarks and offline runs at sizes the real Sheet never reaches.
+
+generate_workbook(rows) returns all 13 tabs the dashboard loads (sheets_loader.WORKSHEET_NAMES) as the display
+strings the Sheets values API returns ('$1,250,000', '85%', '2025-03-14', '' for blanks), so the result can go
+through the same parsing as a live load. Enumerated columns draw from the options listed in schema.md, and the
+MappingTable covers every scorecard answer so scorecard.py can recompute the generated scores.
+
+The project, pipeline, risk, team, executive activity and observation tabs get `rows` rows each; the gap tabs a
+tenth of that, and the scenario tabs and MappingTable stay at their natural size.
+"""
+import numpy as np
+import pandas as pd
+
+import scorecard
+
+# Fraction of optional cells left blank
+BLANK_FRACTION = 0.05
+
+PROJECT_ENUMS = {
+    'Status (R/Y/G)': (['G', 'Y', 'R'], [0.6, 0.28, 0.12]),
+    'Executive Support Required': (['No', 'Yes'], [0.75, 0.25]),
+    'Timeline Health': (['On Track', 'Minor Delays', 'Major Delays', 'Off Track'], None),
+    'Budget and Scope': (['On Track', 'Some Risk', 'Over Budget/Scope Creep'], None),
+    'Client Relationship Strength': (['Strong Champion', 'Supportive Team', 'Neutral', 'Challenging', 'Deteriorating'], None),
+    'Feedback Recency': (['<2 weeks', '<1 month', '1-2 months', '>2 months', 'Never'], None),
+    'Business Outcome Defined': (['Clearly Defined', 'Partially Defined', 'Vague', 'None'], None),
+    'Team Resourcing': (['Yes', 'Some Gaps', 'Understaffed', 'Misaligned', 'No Core Team'], [0.5, 0.25, 0.1, 0.1, 0.05]),
+    'Strategic Value to Client': (['High', 'Medium', 'Low'], None),
+    'Issue Resolution Hygiene': (['Yes', 'Partially', 'No Process'], None),
+    'Expansion Discussion': (['Already in Motion', 'Planned', 'Mentioned', 'No'], None),
+    'Exec Engagement': (['Yes (Executive Sponsor)', 'Occasionally', 'Rarely', 'Not at All'], None),
+    'Delivery Relational Effort': (['Low', 'Medium', 'High'], None),
+    'Expansion Yield Tier': (['High', 'Medium', 'Low'], None),
+}
+PIPELINE_ENUMS = {
+    'Support Focus Type': (['Tier 1', 'Tier 2', 'Tier 3'], None),
+    'Horizon': (['Near-term', 'Mid-term', 'Long-term'], None),
+    'Pursuit Tier': (['Tier 1', 'Tier 2', 'Tier 3'], None),
+    'Deal Registered': (['Yes', 'No'], None),
+    'MSA/ICA Status': (['Signed', 'In Review', 'Not Started'], None),
+    'Roadmap Alignment': (['Yes, Strongly Aligned', 'Early Draft', 'In Discussion', 'No'], None),
+    'Sponsor Type': (['Executive Business Sponsor', 'Director-level Business Sponsor', 'IT Sponsor', 'Influencer Only', 'None'], None),
+    'Business Case_ROI': (['Quantified + Signed Off', 'Quantified Only', 'Draft in Progress', 'Discussed Conceptually', 'None'], None),
+    'HCLS Expertise needed': (['Mission Critical', 'Strongly Beneficial', 'Helpful', 'Somewhat Useful', 'Not Needed'], None),
+    'Executor Pool Size': (['5+ Qualified', '3-4 Qualified', '2 Qualified', '1 Qualified', 'None'], None),
+    'Snowflake Investment Level': (['Strategic Platform', 'Multi-Domain Strategic', 'Key Use Case', 'Trial Project', 'Not at All'], None),
+    'IBM Growth in Account': (['Growing', 'Slightly Growing', 'Neutral', 'Slightly Shrinking', 'Shrinking'], None),
+    'Snowflake Growth in Account': (['Growing', 'Slightly Growing', 'Neutral', 'Slightly Shrinking', 'Shrinking'], None),
+    'Pre-Sales Effort Level': (['Low', 'Medium', 'High'], None),
+    'Revenue Potential Tier': (['High', 'Medium', 'Low'], None),
+}
+ROLES = (['Consultant', 'Data Engineer', 'Architect', 'Delivery Lead', 'Analyst', 'Executive'], [0.3, 0.25, 0.15, 0.12, 0.12, 0.06])
+LEVELS = ['High', 'Medium', 'Low']
+SCENARIO_CATEGORIES = ['Delivery Margin', 'Attrition', 'Executive Time', 'Pipeline Conversion', 'Tooling']
+
+
+class _Generator:
+    def __init__(self, seed, start):
+        self.rng = np.random.default_rng(seed)
+        self.start = pd.Timestamp(start).normalize() if start is not None else pd.Timestamp.today().normalize()
+
+    def choice(self, options, n, weights=None):
+        # Object array of shared option strings, so enumerations cost a pointer per row
+        return np.asarray(options, dtype=object)[self.rng.choice(len(options), size=n, p=weights)]
+
+    def blanks(self, values, fraction=BLANK_FRACTION):
+        values = np.asarray(values, dtype=object)
+        values[self.rng.random(len(values)) < fraction] = ''
+        return values
+
+    def dates(self, n, low_days, high_days, blank=BLANK_FRACTION):
+        return self.blanks(self.date_strings(self.rng.integers(low_days, high_days, size=n)), blank)
+
+    def date_strings(self, days):
+        # 'YYYY-MM-DD', `days` after the start date
+        return (np.datetime64(self.start.date()) + np.asarray(days).astype('timedelta64[D]')).astype(str).astype(object)
+
+    def currency(self, values, blank=0.0):
+        return self.blanks(pd.Series(np.round(values)).map('${:,.0f}'.format).to_numpy(dtype=object), blank)
+
+    def percent(self, values):
+        return pd.Series(np.round(values)).map('{:.0f}%'.format).to_numpy(dtype=object)
+
+    def numbers(self, values, decimals=1):
+        return pd.Series(np.round(values, decimals)).map(str).to_numpy(dtype=object)
+
+    def names(self, prefix, n):
+        return (prefix + ' ' + pd.RangeIndex(1, n + 1).astype(str)).to_numpy(dtype=object)
+
+
+def _skewed_weights(count):
+    # Options are listed best first in schema.md; most answers are good ones
+    weights = np.arange(count, 0, -1, dtype=float) ** 2
+    return weights / weights.sum()
+
+
+def _enum_columns(gen, enums, n):
+    return {col: gen.choice(options, n, weights or _skewed_weights(len(options))) for col, (options, weights) in enums.items()}
+
+
+def _mapping_table():
+    """MappingTable rows scoring every scorecard answer (10 points for the best option down to 0) and every efficiency pair."""
+    rows = []
+    for tab, enums in (('Project Inventory', PROJECT_ENUMS), ('Pipeline', PIPELINE_ENUMS)):
+        card = scorecard.SCORECARDS[tab]
+        for col in card['scorecard_cols']:
+            options = enums[col][0]
+            for i, option in enumerate(options):
+                score = round(10 * (len(options) - 1 - i) / max(len(options) - 1, 1), 1)
+                rows.append((tab, col, option, score))
+        first, second = card['efficiency_pair']
+        for i, effort in enumerate(enums[first][0]):
+            for j, tier in enumerate(enums[second][0]):
+                score = round(100 * (1 - 0.4 * i / 2) * (1 - 0.6 * j / 2), 1)
+                rows.append((tab, f"{first} x {second}", f"{effort}{scorecard.PAIR_SEPARATOR}{tier}", score))
+    return pd.DataFrame({
+        'Tab': [r[0] for r in rows], 'Question': [r[1] for r in rows], 'Value': [r[2] for r in rows],
+        'Score': [str(r[3]) for r in rows], 'Key': [f"{r[1]}|{r[2]}" for r in rows],
+    })
+
+
+def _add_scores(tab, df, mapping):
+    # Scores and bands are what the Sheet's formulas would show, so the scorecard check finds no mismatches
+    card = scorecard.SCORECARDS[tab]
+    result = scorecard.score_sheet(tab, df, scorecard.build_lookups(mapping))
+    for col in (card['health_col'], card['efficiency_col'], card['total_col']):
+        df[col] = result[col].round(2).map(str).to_numpy(dtype=object)
+    band_col = 'Health Band' if tab == 'Project Inventory' else 'Score Band'
+    df[band_col] = result['Band'].map({label: 'ABC'[i] for i, label in enumerate(card['bands'])}).fillna('C').to_numpy(dtype=object)
+
+
+def generate_workbook(rows, seed=0, start=None):
+    """
+    {worksheet name: DataFrame of display strings} for every tab in sheets_loader.WORKSHEET_NAMES.
+    Dates are spread around `start` (today), so check-in windows and upcoming dates have something to find.
+    """
+    if rows < 1:
+        raise ValueError("rows must be at least 1")
+    gen = _Generator(seed, start)
+    n, small = rows, max(1, rows // 10)
+    mapping = _mapping_table()
+
+    project_names = gen.names('Project', n)
+    project_start = gen.rng.integers(-400, 200, size=n)
+    projects = pd.DataFrame({
+        'Project Name': project_names,
+        'Client': gen.choice([f'Client {i}' for i in range(1, max(2, n // 5) + 1)], n),
+        'Project Start Date': gen.date_strings(project_start),
+        'Project End Date': gen.blanks(gen.date_strings(project_start + gen.rng.integers(60, 540, size=n)), 0.1),
+        'Revenue': gen.currency(gen.rng.lognormal(12.5, 0.8, n)),
+        'Margin': gen.percent(gen.rng.normal(32, 8, n)),
+        'Key Issues': gen.blanks(gen.choice(['Resourcing gap', 'Scope creep', 'Data access delays', 'Sponsor change', 'Budget pressure'], n), 0.4),
+        'Next Steps': gen.choice(['Weekly steering', 'Re-plan sprint', 'Escalate to sponsor', 'Close out'], n),
+        'eNPS': gen.numbers(gen.rng.normal(45, 20, n), 0),
+        'Next Opp First Discussion Date': gen.dates(n, -200, 300, blank=0.6),
+        'Last Sponsor Checkin Date': gen.dates(n, -120, 0, blank=0.15),
+        'Sponsor Checkin Notes': gen.blanks(gen.choice(['Aligned on roadmap', 'Raised budget concern', 'Asked for expansion options', 'Happy with progress'], n), 0.3),
+        **_enum_columns(gen, PROJECT_ENUMS, n),
+    })
+    _add_scores('Project Inventory', projects, mapping)
+
+    amo = gen.rng.lognormal(13, 1, n)
+    pipeline = pd.DataFrame({
+        'Account': gen.names('Account', n),
+        'Opportunity Created Date': gen.dates(n, -400, 0, blank=0.02),
+        'Last Touchpoint Date': gen.dates(n, -60, 0),
+        'Next Touchpoint Date': gen.dates(n, 0, 45, blank=0.2),
+        'Closed Won Date': gen.dates(n, -200, 120, blank=0.7),
+        'Percieved Annual AMO': gen.currency(amo),
+        'Open Pipeline_Active Work': gen.currency(amo * gen.rng.uniform(0.1, 0.8, n), blank=0.1),
+        'Notes': gen.blanks(gen.choice(['Strong interest', 'Budget pending', 'Competitive bake-off', 'Waiting on security review'], n), 0.3),
+        'Help Needed': gen.blanks(gen.choice(['Executive intro', 'Solution architect', 'Pricing approval'], n), 0.5),
+        'Actions': gen.choice(['Send proposal', 'Schedule workshop', 'Follow up with sponsor'], n),
+        'Internal Pursuit Team': gen.choice(['Data & AI', 'Cloud', 'Strategy'], n),
+        'Key Client Contacts': gen.choice(['CIO', 'CDO', 'VP Analytics', 'Director IT'], n),
+        'Win Themes': gen.choice(['Speed to value', 'HCLS expertise', 'Platform depth'], n),
+        'Known Competitors': gen.blanks(gen.choice(['Accenture', 'Deloitte', 'In-house team'], n), 0.4),
+        **_enum_columns(gen, PIPELINE_ENUMS, n),
+    })
+    _add_scores('Pipeline', pipeline, mapping)
+
+    risks = pd.DataFrame({
+        'Project Name': gen.choice(project_names, n),
+        'Risk Description': gen.choice(['Key person dependency', 'Vendor delay', 'Data quality', 'Scope ambiguity'], n),
+        'Severity': gen.choice(LEVELS, n, [0.2, 0.45, 0.35]),
+        'Impact ($)': gen.currency(gen.rng.lognormal(10.5, 1, n)),
+        'Mitigation Plan': gen.choice(['Cross-train', 'Escalate', 'Add buffer', 'Clarify SOW'], n),
+        'Owner': gen.choice([f'Owner {i}' for i in range(1, 21)], n),
+    })
+
+    assignment_counts = gen.rng.integers(0, 4, size=n)
+    assignments = np.split(gen.choice(project_names, int(assignment_counts.sum())), np.cumsum(assignment_counts)[:-1])
+    team = pd.DataFrame({
+        'Employee Name': gen.names('Employee', n),
+        'Role': gen.choice(ROLES[0], n, ROLES[1]),
+        'Project Assignments': np.array([', '.join(projects_) for projects_ in assignments], dtype=object),
+        'Utilization (%)': gen.percent(np.clip(gen.rng.normal(78, 20, n), 0, 130)),
+        'Billable Rate ($/hr)': gen.currency(gen.rng.uniform(90, 320, n)),
+        'Strategic Opportunity Cost ($/week)': gen.currency(gen.rng.uniform(500, 6000, n)),
+        'Latest Pulse Score': gen.numbers(np.clip(gen.rng.normal(7.6, 1.2, n), 1, 10)),
+    })
+
+    hours = gen.rng.uniform(1, 12, n)
+    executive = pd.DataFrame({
+        'Activity': gen.choice(['Steering committee', 'Deal review', 'Hiring panel', 'Client QBR', 'Ops review'], n),
+        'Type (Delivery/Sales/Ops)': gen.choice(['Delivery', 'Sales', 'Ops'], n),
+        'Time Spent Weekly (hrs)': gen.numbers(hours),
+        'Strategic Cost ($)': gen.currency(hours * 250 * 48),
+        'Delegate to?': gen.blanks(gen.choice(['Delivery Lead', 'Account Manager', 'Ops Manager'], n), 0.5),
+    })
+
+    talent_gaps = pd.DataFrame({
+        'Skill/Role Needed': gen.choice(['Snowflake Architect', 'HL7/FHIR Engineer', 'ML Engineer', 'Engagement Manager'], small),
+        'Gap Impact (High/Medium/Low)': gen.choice(LEVELS, small),
+        'Urgency': gen.choice(['Immediate', 'Short-term', 'Long-term'], small),
+        'Target Hire Date': gen.dates(small, 0, 180, blank=0.0),
+        'Hiring Owner': gen.choice([f'Owner {i}' for i in range(1, 11)], small),
+    })
+    operational_gaps = pd.DataFrame({
+        'Operational Issue': gen.choice(['Manual timesheets', 'No resourcing forecast', 'Slow SOW approvals'], small),
+        'Severity (High/Medium/Low)': gen.choice(LEVELS, small),
+        'Frequency': gen.choice(['Daily', 'Weekly', 'As-needed'], small),
+        'Recommended Process/Solution': gen.choice(['Automate', 'Add review step', 'New tooling'], small),
+        'Owner': gen.choice([f'Owner {i}' for i in range(1, 11)], small),
+    })
+
+    do_nothing = gen.rng.uniform(2e5, 2e6, len(SCENARIO_CATEGORIES))
+    proposed = do_nothing * gen.rng.uniform(0.3, 0.9, len(SCENARIO_CATEGORIES))
+    scenario_inputs = pd.DataFrame({
+        'Assumption': ['Attrition rate', 'Average bill rate', 'Executive hours per week', 'Win rate', 'Utilization target'],
+        'Value': ['12%', '$185', '10', '35%', '80%'],
+    })
+    observation_dates = gen.dates(n, -365, 0, blank=0.0)
+
+    return {
+        'Project Inventory': projects,
+        'Project Risks': risks,
+        'Pipeline': pipeline,
+        'Team Utilization': team,
+        'Talent Gaps': talent_gaps,
+        'Operational Gaps': operational_gaps,
+        'Executive Activity': executive,
+        'Scenario Model Inputs': scenario_inputs,
+        'Do Nothing Scenario': pd.DataFrame({
+            'Category': SCENARIO_CATEGORIES, 'Calculation Details': 'Current run-rate x 12', 'Annualized Impact ($)': gen.currency(do_nothing),
+        }),
+        'Proposed Scenario': pd.DataFrame({
+            'Category': SCENARIO_CATEGORIES, 'Calculation Details': 'Projected run-rate x 12', 'Annualized Impact ($)': gen.currency(proposed),
+        }),
+        'Scenario Comparison': pd.DataFrame({
+            'Scenario': ['Do Nothing', 'Proposed'],
+            'Total Annualized Impact ($)': gen.currency(np.array([do_nothing.sum(), proposed.sum()])),
+            'Net Incremental Value ($)': gen.currency(np.array([0, do_nothing.sum() - proposed.sum()])),
+        }),
+        'MappingTable': mapping,
+        'Project Observations': pd.DataFrame({
+            'Date': observation_dates,
+            'Project': gen.choice(project_names, n),
+            'Observation': gen.choice(['Sponsor very engaged', 'Team stretched thin', 'Great demo feedback', 'Data delivery slipped'], n),
+        }),
+    }
+
+
+def to_values(df):
+    """A tab as the values API returns it: header row first, then every row as strings ('' for blanks)."""
+    return [list(df.columns)] + df.astype(object).where(df.notna(), '').to_numpy().tolist()
+
@@ -0,0 +1,82 @@
+import re
+
+import pytest
+
+import fake_gspread
+import sheets_loader
+import sheets_quota
+
+SHEETS = {
+    'Pipeline': [['Account', 'Pipeline Score'], ['Acme', '72'], ['Globex', '64']],
+    'Project Risks': [['Project Name', 'Severity'], ['Alpha', 'High']],
+}
+
+
+def test_directory_backend_persists_edits(tmp_path):
+    fake_gspread.write_directory(str(tmp_path), SHEETS)
+    spreadsheet = fake_gspread.FakeSpreadsheet.from_directory(str(tmp_path))
+    worksheet = spreadsheet.worksheet('Pipeline')
+
+    cell = worksheet.find('Globex')
+    assert (cell.row, cell.col) == (3, 1)
+    assert worksheet.find('globex', case_sensitive=False).row == 3
+    assert worksheet.find(re.compile('^Glo')).value == 'Globex'
+    assert worksheet.find('Initech') is None
+
+    worksheet.update_cells([fake_gspread.Cell(3, 2, '80')])
+    spreadsheet.values_batch_update({'data': [{'range': "'Project Risks'!B2", 'values': [['Low']]}]})
+
+    reopened = fake_gspread.FakeSpreadsheet.from_directory(str(tmp_path))
+    assert reopened.worksheet('Pipeline').row_values(3) == ['Globex', '80']
+    assert reopened.worksheet('Project Risks').batch_get(['A1:B2']) == [[['Project Name', 'Severity'], ['Alpha', 'Low']]]
+
+
+def test_injected_429_looks_rate_limited_to_the_quota_scheduler():
+    faults = fake_gspread.FaultInjector()
+    faults.fail_next(1, fake_gspread.RATE_LIMITED)
+    scheduler = sheets_quota.QuotaScheduler()
+    spreadsheet = scheduler.wrap(fake_gspread.FakeSpreadsheet(SHEETS, faults=faults), sheets_quota.PRIORITY_INTERACTIVE)
+
+    with pytest.raises(fake_gspread.FakeAPIError) as error:
+        spreadsheet.values_batch_get(["'Pipeline'"])
+    assert sheets_quota.is_rate_limited(error.value)
+    assert scheduler.stats()['rate_limited'] == 1
+    assert faults.stats()['injected'] == {429: 1}
+
+
+def test_transient_error_falls_back_to_per_sheet_loading():
+    faults = fake_gspread.FaultInjector()
+    faults.fail_next(1, fake_gspread.UNAVAILABLE)
+    spreadsheet = fake_gspread.FakeSpreadsheet(SHEETS, faults=faults)
+
+    data, report = sheets_loader.fetch_all(spreadsheet, list(SHEETS))
+    assert report['mode'] == 'concurrent'
+    assert data['Pipeline']['Account'].tolist() == ['Acme', 'Globex']
+    assert not sheets_quota.is_rate_limited(fake_gspread.FakeAPIError(fake_gspread.UNAVAILABLE))
+
+
+def test_latency_and_rates_are_applied():
+    slept = []
+    faults = fake_gspread.FaultInjector(latency=0.2, rate_limit_rate=0.5, error_rate=0.25, seed=7, sleep=slept.append)
+    spreadsheet = fake_gspread.FakeSpreadsheet(SHEETS, faults=faults)
+    failures = 0
+    for _ in range(400):
+        try:
+            spreadsheet.worksheet('Pipeline')
+        except fake_gspread.FakeAPIError:
+            failures += 1
+    assert slept == [0.2] * 400
+    injected = faults.stats()['injected']
+    assert injected[429] + injected[503] == failures
+    assert 160 < injected[429] < 240 and 60 < injected[503] < 140
+
+
+def test_directory_opener_goes_through_faults(tmp_path):
+    fake_gspread.write_directory(str(tmp_path), SHEETS)
+    faults = fake_gspread.FaultInjector()
+    faults.fail_next(1, fake_gspread.UNAVAILABLE)
+    open_fake = fake_gspread.directory_opener(str(tmp_path), faults=faults)
+    with pytest.raises(fake_gspread.FakeAPIError):
+        open_fake(None, None)
+    spreadsheet, credentials = open_fake(None, None)
+    assert credentials is None and spreadsheet.worksheet('Project Risks').row_values(2) == ['Alpha', 'High']
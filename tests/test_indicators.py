@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+import indicators
+import sheet_schema
+import synthetic_data
+
+DAY_KPIS = [
+    'overdue_next_deal_discussion_count', 'recent_meaningful_checkins_count',
+    'recent_meaningful_checkins_pct', 'overdue_sponsor_checkin_count',
+]
+
+
+def _project_inventory():
+    return sheet_schema.type_dataframe('Project Inventory', pd.DataFrame({
+        'Project Name': ['Alpha', 'Beta', 'Gamma'],
+        'Status (R/Y/G)': ['G', None, 'R'],
+    }))
+
+
+def test_changed_cells_with_blank_category():
+    old = _project_inventory()
+    edited = old.copy()
+    edited.loc[0, 'Status (R/Y/G)'] = 'R'
+    rows, columns = indicators.changed_cells(old, edited)
+    assert list(rows) == [0] and columns == {'Status (R/Y/G)'}
+
+
+def test_changed_cells_when_category_is_cleared():
+    old = _project_inventory()
+    cleared = old.copy()
+    cleared.loc[2, 'Status (R/Y/G)'] = pd.NA
+    rows, columns = indicators.changed_cells(old, cleared)
+    assert list(rows) == [2] and columns == {'Status (R/Y/G)'}
+
+
+def test_recompute_with_blank_category_matches_full_run():
+    data = sheet_schema.type_sheets(synthetic_data.generate_workbook(50, seed=3))
+    projects = data['Project Inventory']
+    projects.loc[projects.index[1], 'Status (R/Y/G)'] = pd.NA
+    kpis = indicators.get_all_indicators(data)
+
+    edited = projects.copy()
+    edited.loc[edited.index[4], 'Status (R/Y/G)'] = 'R' if edited.loc[edited.index[4], 'Status (R/Y/G)'] != 'R' else 'G'
+    edited.loc[edited.index[7], 'Status (R/Y/G)'] = pd.NA
+    new_data = {**data, 'Project Inventory': edited}
+
+    recomputed = indicators.recompute_indicators(new_data, kpis, ['Project Inventory'], previous_data=data)
+    assert recomputed == indicators.get_all_indicators(new_data)
+
+
+def test_indicators_over_dates_match_per_date_runs():
+    data = sheet_schema.type_sheets(synthetic_data.generate_workbook(80, seed=11, start='2026-10-17'))
+    projects = data['Project Inventory']
+    checkins = projects['Last Sponsor Checkin Date'].dropna()
+    deal_dates = pd.concat([projects['Project End Date'], projects['Next Opp First Discussion Date']]).dropna()
+    # From before the first check-in to past the last end / next deal date, plus the boundary days themselves
+    dates = pd.date_range(checkins.min() - pd.Timedelta(days=10), deal_dates.max() + pd.Timedelta(days=60), periods=20)
+    dates = dates.normalize().union(pd.DatetimeIndex([
+        checkins.min(), checkins.max() + pd.Timedelta(days=indicators.SPONSOR_CHECKIN_WINDOW_DAYS),
+        deal_dates.max(), projects['Project End Date'].min() + pd.Timedelta(days=indicators.NEXT_DEAL_DISCUSSION_THRESHOLD_DAYS + 1),
+    ]))
+
+    batch = indicators.get_indicators_over_dates(data, dates)
+    for day in dates:
+        expected = indicators.get_all_indicators(data, as_of=day)
+        for name in DAY_KPIS:
+            assert batch.loc[day, name] == pytest.approx(expected[name]), (day, name)
+    # The range covers days where each count is still zero and days where it has moved
+    assert all(batch[name].nunique() > 1 for name in DAY_KPIS)
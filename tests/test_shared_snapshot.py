@@ -0,0 +1,44 @@
+import pandas as pd
+
+import indicators
+import shared_snapshot
+import sheet_schema
+import synthetic_data
+
+PUBLISHED_ON = pd.Timestamp('2026-10-17')
+LATER = pd.Timestamp('2026-11-20')
+DAY_KPIS = ['overdue_sponsor_checkin_count', 'overdue_next_deal_discussion_count', 'recent_meaningful_checkins_count']
+
+
+def _workbook():
+    return sheet_schema.type_sheets(synthetic_data.generate_workbook(200, seed=5, start=PUBLISHED_ON))
+
+
+def test_edit_on_a_later_day_matches_full_run():
+    data = _workbook()
+    registry = shared_snapshot.SnapshotRegistry()
+    first = registry.publish(data, {'hash': 'v1'}, as_of=PUBLISHED_ON)
+    registry.publish(data, {'hash': 'v1'}, as_of=LATER)
+
+    risks = data['Project Risks'].copy()
+    risks.loc[risks.index[0], 'Severity'] = 'High' if risks.loc[risks.index[0], 'Severity'] != 'High' else 'Low'
+    edited = {**data, 'Project Risks': sheet_schema.type_dataframe('Project Risks', risks)}
+    snapshot = registry.publish(edited, {'hash': 'v2'}, as_of=LATER)
+
+    expected = indicators.get_all_indicators(edited, as_of=LATER)
+    assert [first.indicators[name] for name in DAY_KPIS] != [expected[name] for name in DAY_KPIS]
+    assert snapshot.kpis_as_of == LATER.date()
+    assert dict(snapshot.indicators) == expected
+
+
+def test_unchanged_data_on_a_later_day_refreshes_day_dependent_kpis():
+    data = _workbook()
+    registry = shared_snapshot.SnapshotRegistry()
+    first = registry.publish(data, {'hash': 'v1'}, as_of=PUBLISHED_ON)
+    same_day = registry.publish(data, {'hash': 'v1'}, as_of=PUBLISHED_ON)
+    later = registry.publish(data, {'hash': 'v1'}, as_of=LATER)
+
+    assert dict(same_day.indicators) == dict(first.indicators)
+    assert later.data_context_string is first.data_context_string
+    assert later.kpis_as_of == LATER.date()
+    assert dict(later.indicators) == indicators.get_all_indicators(data, as_of=LATER)
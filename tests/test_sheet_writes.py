@@ -0,0 +1,83 @@
+import pandas as pd
+
+import fake_gspread
+import sheet_writes
+
+HEADER = ['Project Name', 'Status (R/Y/G)', 'Key Issues']
+ROWS = [['Alpha', 'G', ''], ['Beta', 'Y', ''], ['Gamma', 'R', '']]
+
+
+def _spreadsheet():
+    return fake_gspread.FakeSpreadsheet({'Project Inventory': [HEADER] + [list(row) for row in ROWS]})
+
+
+def _row_index():
+    # The loaded snapshot: index = position below the header, as the Sheets loader builds it
+    df = pd.DataFrame(ROWS, columns=HEADER)
+    return sheet_writes.RowIndex.from_frame('Project Inventory', df, 'Project Name')
+
+
+def _write(spreadsheet, rows, row_index):
+    row_numbers, columns = sheet_writes.locate_rows(spreadsheet, 'Project Inventory', 'Project Name', list(rows), row_index=row_index)
+    payload, missing = sheet_writes.build_batch_update('Project Inventory', columns, row_numbers, rows)
+    spreadsheet.values_batch_update({'valueInputOption': 'USER_ENTERED', 'data': payload})
+    return missing
+
+
+def test_unchanged_sheet_is_verified_with_one_read():
+    spreadsheet = _spreadsheet()
+    row_numbers, columns = sheet_writes.locate_rows(spreadsheet, 'Project Inventory', 'Project Name', ['Beta'], row_index=_row_index())
+    assert row_numbers == {'Beta': 3} and columns['Key Issues'] == 3
+    assert spreadsheet.calls == {'values_batch_get': 1}
+
+
+def test_write_after_sort_lands_on_the_moved_row():
+    spreadsheet = _spreadsheet()
+    row_index = _row_index()
+    # Someone sorts the sheet by status in the Sheets UI after the snapshot was loaded
+    worksheet = spreadsheet.worksheet('Project Inventory')
+    worksheet.values[1:] = sorted(worksheet.values[1:], key=lambda row: row[1], reverse=True)
+
+    assert _write(spreadsheet, {'Beta': {'Key Issues': 'Vendor delay'}}, row_index) == []
+    values = spreadsheet.worksheet('Project Inventory').values
+    assert {row[0]: row[2] for row in values[1:]} == {'Alpha': '', 'Beta': 'Vendor delay', 'Gamma': ''}
+
+
+def test_write_after_row_insert_and_delete():
+    spreadsheet = _spreadsheet()
+    row_index = _row_index()
+    worksheet = spreadsheet.worksheet('Project Inventory')
+    del worksheet.values[1]
+    worksheet.values.insert(1, ['Delta', 'G', ''])
+
+    missing = _write(spreadsheet, {'Alpha': {'Key Issues': 'x'}, 'Gamma': {'Key Issues': 'y'}}, row_index)
+    assert missing == ['Alpha']
+    assert {row[0]: row[2] for row in worksheet.values[1:]} == {'Delta': '', 'Beta': '', 'Gamma': 'y'}
+
+
+def test_bulk_edit_writes_only_changed_cells_in_one_call():
+    spreadsheet = _spreadsheet()
+    original = pd.DataFrame(ROWS, columns=HEADER)
+    edited = original.copy()
+    edited.loc[0, 'Key Issues'] = 'Scope creep'
+    edited.loc[2, 'Status (R/Y/G)'] = 'Y'
+
+    changes, skipped = sheet_writes.diff_rows(original, edited, 'Project Name', ['Status (R/Y/G)', 'Key Issues'])
+    assert skipped == []
+    assert [(c['identifier'], c['column'], c['old'], c['new']) for c in changes] == [
+        ('Alpha', 'Key Issues', '', 'Scope creep'), ('Gamma', 'Status (R/Y/G)', 'R', 'Y'),
+    ]
+    spreadsheet.calls.clear()
+    assert _write(spreadsheet, sheet_writes.changes_by_row(changes), _row_index()) == []
+    assert spreadsheet.calls == {'values_batch_get': 1, 'values_batch_update': 1}
+    assert spreadsheet.worksheet('Project Inventory').values[1:] == [
+        ['Alpha', 'G', 'Scope creep'], ['Beta', 'Y', ''], ['Gamma', 'Y', ''],
+    ]
+
+
+def test_bulk_edit_skips_duplicated_identifiers():
+    original = pd.DataFrame([['Alpha', 'G', ''], ['Alpha', 'Y', '']], columns=HEADER)
+    edited = original.copy()
+    edited.loc[1, 'Key Issues'] = 'x'
+    changes, skipped = sheet_writes.diff_rows(original, edited, 'Project Name', ['Key Issues'])
+    assert changes == [] and skipped == ['Alpha']
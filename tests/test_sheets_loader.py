@@ -0,0 +1,102 @@
+import pandas as pd
+
+import fake_gspread
+import sheets_loader
+import snapshot_cache
+
+# Raw cells as UNFORMATTED_VALUE returns them: numbers as numbers, dates as serials. Scenario Model Inputs has no
+# schema, so it is always requested formatted (see test_unschemad_tabs_are_fetched_formatted) and holds display strings.
+UNFORMATTED_SHEETS = {
+    'Project Inventory': [
+        ['Project Name', 'Revenue', 'Project Start Date', 'Status (R/Y/G)', 'Key Issues', 'Headcount Note'],
+        ['Alpha', 1250000, 45292, 'G', 'Vendor delay', 12],
+        ['Beta', 830000.5, 45300, 'Y', 'None', 'TBD'],
+    ],
+    'Scenario Model Inputs': [
+        ['Parameter', 'Value'],
+        ['Growth Rate', '10%'],
+        ['Scenario', 'Aggressive'],
+        ['Budget', '$120,000'],
+    ],
+}
+
+
+class RecordingSpreadsheet(fake_gspread.FakeSpreadsheet):
+    """Remembers the render params each values_batch_get was made with."""
+
+    def __init__(self, sheets):
+        super().__init__(sheets)
+        self.batch_params = []
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_params.append((list(ranges), params))
+        return super().values_batch_get(ranges, params=params)
+
+
+def test_unschemad_tabs_are_fetched_formatted():
+    spreadsheet = RecordingSpreadsheet(UNFORMATTED_SHEETS)
+    sheets_loader.fetch_all_batched(spreadsheet, list(UNFORMATTED_SHEETS), value_render=sheets_loader.UNFORMATTED)
+    renders = {tuple(ranges): params for ranges, params in spreadsheet.batch_params}
+    assert renders[(sheets_loader.a1_sheet_range('Project Inventory'),)]['valueRenderOption'] == sheets_loader.UNFORMATTED
+    assert renders[(sheets_loader.a1_sheet_range('Scenario Model Inputs'),)] is None
+
+
+def test_unformatted_non_schema_columns_are_text():
+    data, _ = sheets_loader.fetch_all_batched(
+        fake_gspread.FakeSpreadsheet(UNFORMATTED_SHEETS), ['Project Inventory'], value_render=sheets_loader.UNFORMATTED
+    )
+    df = data['Project Inventory']
+    assert df['Revenue'].tolist() == [1250000.0, 830000.5]
+    assert df['Project Start Date'].iloc[0] == pd.Timestamp('2024-01-01')
+    assert df['Headcount Note'].tolist() == ['12', 'TBD']
+
+
+def test_unformatted_workbook_round_trips_through_snapshot(tmp_path):
+    data, _ = sheets_loader.fetch_all_batched(
+        fake_gspread.FakeSpreadsheet(UNFORMATTED_SHEETS), list(UNFORMATTED_SHEETS), value_render=sheets_loader.UNFORMATTED
+    )
+    snapshot_cache.save_snapshot(data, str(tmp_path))
+    loaded, meta = snapshot_cache.load_snapshot(str(tmp_path))
+    for name, df in data.items():
+        pd.testing.assert_frame_equal(loaded[name], df, check_dtype=False, check_categorical=False)
+
+
+def _workbook():
+    return {
+        'Pipeline': [['Account', 'Pipeline Score'], ['Acme', '72'], ['Globex', '64']],
+        'Project Risks': [['Project Name', 'Severity'], ['Alpha', 'High']],
+    }
+
+
+def test_fetch_changed_skips_unchanged_tabs():
+    spreadsheet = fake_gspread.FakeSpreadsheet(_workbook())
+    data, fingerprints, _ = sheets_loader.fetch_changed(spreadsheet, worksheet_names=list(_workbook()))
+    spreadsheet.calls.clear()
+
+    again, _, report = sheets_loader.fetch_changed(spreadsheet, data, fingerprints, worksheet_names=list(_workbook()))
+    assert report['changed'] == [] and report['reused'] == ['Pipeline', 'Project Risks']
+    assert all(again[name] is data[name] for name in data)
+    # Only the fingerprint read
+    assert spreadsheet.calls == {'values_batch_get': 1}
+
+
+def test_fetch_changed_refetches_an_edited_tab():
+    spreadsheet = fake_gspread.FakeSpreadsheet(_workbook())
+    data, fingerprints, _ = sheets_loader.fetch_changed(spreadsheet, worksheet_names=list(_workbook()))
+    spreadsheet.set_cell('Pipeline', 2, 1, 'Acme Corp')
+
+    again, _, report = sheets_loader.fetch_changed(spreadsheet, data, fingerprints, worksheet_names=list(_workbook()))
+    assert report['changed'] == ['Pipeline'] and report['reused'] == ['Project Risks']
+    assert again['Pipeline']['Account'].tolist() == ['Acme Corp', 'Globex']
+    assert again['Project Risks'] is data['Project Risks']
+
+
+def test_fetch_changed_detects_a_row_count_change():
+    spreadsheet = fake_gspread.FakeSpreadsheet(_workbook())
+    data, fingerprints, _ = sheets_loader.fetch_changed(spreadsheet, worksheet_names=list(_workbook()))
+    spreadsheet.set_cell('Project Risks', 3, 1, 'Beta')
+
+    again, new_fingerprints, report = sheets_loader.fetch_changed(spreadsheet, data, fingerprints, worksheet_names=list(_workbook()))
+    assert report['changed'] == ['Project Risks']
+    assert new_fingerprints['Project Risks'].split(':')[0] == '3'
+    assert len(again['Project Risks']) == 2
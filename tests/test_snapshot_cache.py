@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+
+import shared_snapshot
+import snapshot_cache
+
+REFRESH_TIMEOUT = 10
+
+
+def _fetch(label, done):
+    def fetch_fn(previous_data, previous_meta):
+        done.append(label)
+        return {'Pipeline': pd.DataFrame({'Account': [label]})}, {}
+    return fetch_fn
+
+
+def _wait_until_idle(refresher):
+    for _ in range(REFRESH_TIMEOUT * 100):
+        if not refresher.is_running:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("refresh did not finish")
+
+
+class _HookedLock:
+    """Lock that calls `after_release` once, the first time the refresh thread releases it."""
+
+    def __init__(self, after_release):
+        self._lock = threading.Lock()
+        self.after_release = after_release
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        if threading.current_thread().name == 'snapshot-refresh' and self.after_release:
+            callback, self.after_release = self.after_release, None
+            callback()
+
+
+def test_start_while_running_runs_once_more(tmp_path):
+    refresher = snapshot_cache.SnapshotRefresher(str(tmp_path), shared_snapshot.SnapshotRegistry())
+    release, done = threading.Event(), []
+
+    def slow_fetch(previous_data, previous_meta):
+        release.wait(REFRESH_TIMEOUT)
+        return _fetch('first', done)(previous_data, previous_meta)
+
+    assert refresher.start(slow_fetch)
+    assert not refresher.start(_fetch('second', done))
+    release.set()
+    _wait_until_idle(refresher)
+    assert done == ['first', 'second']
+
+
+def test_start_right_after_the_last_pending_check_is_not_lost(tmp_path):
+    refresher = snapshot_cache.SnapshotRefresher(str(tmp_path), shared_snapshot.SnapshotRegistry())
+    done = []
+    # A write's refresh request arriving after the thread found nothing pending, but before it exited
+    refresher._lock = _HookedLock(lambda: refresher.start(_fetch('after write', done)))
+    refresher.start(_fetch('first', done))
+    _wait_until_idle(refresher)
+    assert done == ['first', 'after write']
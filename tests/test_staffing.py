@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+import sheet_schema
+import staffing
+
+# Wednesday; the plan's weeks start on Mondays from 2026-10-12
+AS_OF = '2026-10-14'
+
+
+def _plan():
+    projects = sheet_schema.type_dataframe('Project Inventory', pd.DataFrame({
+        'Project Name': ['Apollo', 'Borealis', 'Cygnus', 'Dorado'],
+        # Running now until 2026-11-01; starting in the third week, open-ended; two weeks, unstaffed; already over
+        'Project Start Date': ['2026-09-01', '2026-10-26', '2026-11-05', '2026-06-01'],
+        'Project End Date': ['2026-11-01', '', '2026-11-12', '2026-09-30'],
+    }))
+    team = sheet_schema.type_dataframe('Team Utilization', pd.DataFrame({
+        'Employee Name': ['Ann', 'Ben', 'Cat', 'Dan'],
+        'Role': ['Consultant', 'Analyst', 'Manager', 'Consultant'],
+        # Zephyr is not in Project Inventory
+        'Project Assignments': ['Apollo, Borealis', 'Borealis', 'Apollo, Zephyr', 'Dorado'],
+        'Utilization (%)': ['80%', '50%', '60%', '30%'],
+    }))
+    return staffing.capacity_plan(staffing.assignment_table(team), projects, as_of=AS_OF, weeks=6)
+
+
+def test_allocation_scales_current_utilization_by_running_projects():
+    plan = _plan()
+    assert list(plan.weeks) == list(pd.date_range('2026-10-12', periods=6, freq='7D'))
+    np.testing.assert_allclose(plan.allocation, [
+        [80, 80, 160, 80, 80, 80],  # Apollo now, Borealis overlaps it in week three
+        [0, 0, 50, 50, 50, 50],     # nothing running this week: utilization per project once Borealis starts
+        [60, 60, 60, 0, 0, 0],      # the assignment to Zephyr (no dates) is left out
+        [0, 0, 0, 0, 0, 0],         # Dorado has ended
+    ])
+    assert list(plan.project_staff) == [2, 2, 0, 1]
+
+
+def test_over_allocated():
+    over = _plan().over_allocated()
+    assert list(over['Employee Name']) == ['Ann']
+    assert over.loc[0, 'Weeks Over'] == 1
+    assert over.loc[0, 'Peak Allocation %'] == 160
+    assert over.loc[0, 'First Week Over'] == pd.Timestamp('2026-10-26')
+    assert _plan().over_allocated(threshold=160).empty
+
+
+def test_unstaffed_weeks():
+    unstaffed = _plan().unstaffed()
+    assert list(unstaffed['Week Of']) == [pd.Timestamp('2026-11-02'), pd.Timestamp('2026-11-09')]
+    assert list(unstaffed['Unstaffed Projects']) == [1, 1]
+    assert list(unstaffed['Projects']) == ['Cygnus', 'Cygnus']